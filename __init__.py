@@ -1,20 +1,36 @@
 import bpy
+from . import diagnostics
+from . import utils
 from . import preferences
 from .ui import ui_panel
 from . import properties
+from . import colorspace
 from . import tool_properties
+from . import reclaim
 from . import operators
+from . import variants
+from . import builder
+
+# Imported on first use (operators, preferences); unregister() cleans up
+# the ones that were loaded
+LAZY_MODULES = ("watcher", "transcode", "lod", "memory_report", "archive", "bake")
 
 
 classes = (
 )
 
 def register():
+    diagnostics.register()
+    utils.register()
     properties.register()
+    colorspace.register()
     tool_properties.register()
     preferences.register()
     ui_panel.register()
+    reclaim.register()
     operators.register()
+    variants.register()
+    builder.register()
 
     
     """Registers all addon classes."""
@@ -27,11 +43,21 @@ def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
+    for name in reversed(LAZY_MODULES):
+        module = utils.get_loaded_module(name)
+        if module:
+            module.unregister()
+    builder.unregister()
+    variants.unregister()
     operators.unregister()
+    reclaim.unregister()
     ui_panel.unregister()
     preferences.unregister()
+    colorspace.unregister()
     properties.unregister()
     tool_properties.unregister()
+    utils.unregister()
+    diagnostics.unregister()
 
 
 if __name__ == "__main__":
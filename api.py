@@ -0,0 +1,338 @@
+# File: k_tools_texture_map_loader/api.py
+"""
+Context-free functions behind the operators, for pipeline scripts:
+they take the data to work on (node trees, paths, preferences) as
+arguments and never read context.space_data, so they run headless
+without context overrides.
+
+    from k_tools_texture_map_loader import api
+    mat = bpy.data.materials["Wood"]
+    loader = api.add_kt_group(mat.node_tree, 'LOADER', loader_name=mat.name)
+    result = api.load_texture_set(loader.node_tree, paths, settings={"interpolation": 'Cubic'})
+
+Wrap many calls in transaction.transaction(push=True) to get one undo step.
+"""
+
+import bpy
+import os
+from . import utils
+from . import assets
+from . import image_analysis
+from . import reclaim
+from . import colorspace
+from . import pruning
+from . import diagnostics
+from .diagnostics import logger
+
+# Map types whose alpha coverage is scanned at load time
+ALPHA_COVERAGE_MAP_TYPES = {"Diffuse", "Alpha", "Emission"}
+
+# Image Texture node settings shared by the batch tools (see TML_ToolProperties)
+BATCH_SETTINGS = ("interpolation", "projection", "projection_blend", "extension")
+
+# Kind -> source node group of the K-Tools groups
+KT_GROUP_NAMES = {
+    'MAPPING': assets.MAPPING_GROUP_NAME,
+    'LOADER': assets.MAPS_LOADER_GROUP_NAME,
+    'BSDF': assets.BSDF_GROUP_NAME,
+}
+
+
+def _get_prefs(prefs):
+    return prefs if prefs is not None else utils.get_addon_preferences(bpy.context)
+
+
+# --- Classification ---
+
+def classify_filenames(filenames, kw_map=None):
+    """
+    Map type, data type and texture set of each filename, from the
+    keyword list (the defaults if kw_map is None).
+    Returns {filename: {"map_type", "data_type", "set_name"}}; files no
+    keyword matches get map type "Unknown".
+    """
+    if kw_map is None:
+        kw_map = utils.get_keyword_map(_get_prefs(None))
+    result = {}
+    for filename in filenames:
+        map_type, data_type = utils.get_file_map_info(os.path.basename(filename), kw_map)
+        result[filename] = {
+            "map_type": map_type,
+            "data_type": data_type,
+            "set_name": utils.get_texture_set_name(os.path.basename(filename), kw_map),
+        }
+    return result
+
+
+# --- Batch settings ---
+
+def settings_from(props):
+    """Batch settings dict read from TML_ToolProperties (or any object with them)."""
+    return {name: getattr(props, name) for name in BATCH_SETTINGS}
+
+
+def apply_node_settings(node, settings):
+    """Sets the given batch settings on one Image Texture node."""
+    for name in BATCH_SETTINGS:
+        value = settings.get(name)
+        if value is None:
+            continue
+        if name == 'projection_blend' and node.projection != 'BOX':
+            continue # Só vale para projeção 'BOX'
+        if getattr(node, name) != value:
+            setattr(node, name, value)
+
+
+@diagnostics.profiled("api.apply_batch_settings")
+def apply_batch_settings(node_tree, settings):
+    """
+    Applies batch settings ({"interpolation": 'Cubic', ...}; missing or
+    None keys are left alone) to every Image Texture node of a tree.
+    Returns the number of nodes updated.
+    """
+    count = 0
+    for node in utils.find_image_nodes_in_tree(node_tree):
+        try:
+            apply_node_settings(node, settings)
+            count += 1
+        except (TypeError, ValueError) as e:
+            logger.error("Apply error on %s: %s", node.name, e)
+    return count
+
+
+# --- Loading ---
+
+@diagnostics.profiled("api.load_texture_set")
+def load_texture_set(node_tree, filepaths, prefs=None, settings=None, kw_map=None):
+    """
+    Loads image files into the matching Image Texture nodes of a tree.
+    Files are matched to nodes by map type (keywords); then the batch
+    settings (if given), the colorspace and the load options of 'prefs'
+    (the addon preferences if None) are applied.
+    Returns {"loaded": {node name: image name}, "unmatched": [filepath],
+    "errors": [message]}.
+    """
+    prefs = _get_prefs(prefs)
+    if kw_map is None:
+        kw_map = utils.get_keyword_map(prefs)
+
+    node_map = {}
+    for node in utils.find_image_nodes_in_tree(node_tree):
+        map_type = utils.get_node_map_info(node, kw_map)[0]
+        if map_type != "Unknown" and map_type not in node_map: node_map[map_type] = node
+
+    # Slots podados precisam voltar antes de receber imagens
+    prune_mode = None
+    if pruning.is_loader_tree(node_tree) and pruning.is_pruned(node_tree):
+        prune_mode = node_tree[pruning.PRUNED_PROP]["mode"]
+        pruning.restore_tree(node_tree)
+    if prefs.prune_unused_slots != 'OFF':
+        prune_mode = prefs.prune_unused_slots
+
+    precision_map = utils.get_precision_map(prefs)
+    result = {"loaded": {}, "unmatched": [], "errors": []}
+    diagnostics.count("load.files", len(filepaths))
+    for filepath in filepaths:
+        filename = os.path.basename(filepath)
+        map_type, data_type = utils.get_file_map_info(filename, kw_map)
+        target_node = node_map.get(map_type) if map_type != "Unknown" else None
+        if not target_node: result["unmatched"].append(filepath); continue
+        try: new_image = bpy.data.images.load(filepath)
+        except Exception as e: result["errors"].append(f"Load error: {filename}. {e}"); continue
+        # Slot colapsado: religar a imagem antes de trocá-la (como restore_tree)
+        image_analysis.restore_constant_node(target_node, reload_image=False)
+        if target_node.image and target_node.image != new_image:
+            reclaim.track_replaced(target_node.image) # Imagem anterior pode ficar órfã
+        target_node.image = new_image
+        if map_type == "Normal" and prefs.normal_convention_mode != 'OFF':
+            use_pixels = prefs.normal_convention_mode == 'FILENAME_PIXELS'
+            if image_analysis.convert_directx_normal(target_node, use_pixels=use_pixels):
+                reclaim.track_replaced(new_image) # Original DirectX
+                new_image = target_node.image
+        if settings: apply_node_settings(target_node, settings)
+        colorspace.apply_colorspace(new_image, data_type, prefs)
+        if image_analysis.apply_precision_policy(target_node, precision_map.get(map_type, 'KEEP')):
+            reclaim.track_replaced(new_image) # Original em float
+            new_image = target_node.image
+        if prefs.analyze_alpha_coverage and map_type in ALPHA_COVERAGE_MAP_TYPES:
+            image_analysis.apply_alpha_coverage(new_image, map_type)
+        result["loaded"][target_node.name] = new_image.name
+        if prefs.collapse_constant_maps:
+            image_analysis.collapse_constant_node(target_node)
+        if prefs.transcode_cache and target_node.image == new_image:
+            from . import transcode # Só quando usado
+            transcode.queue_image(new_image, prefs) # Em segundo plano
+    if prune_mode and pruning.is_loader_tree(node_tree):
+        pruning.prune_tree(node_tree, prune_mode)
+    return result
+
+
+# --- K-Tools groups ---
+
+def add_kt_group(node_tree, kind, location=(0.0, 0.0), loader_name=""):
+    """
+    Adds a K-Tools group node ('MAPPING', 'LOADER' or 'BSDF') to a tree,
+    loading the group from the asset file if needed. Each Loader gets its
+    own copy of the group, named after 'loader_name' (e.g. the material).
+    Returns the new node, or None if the group could not be loaded.
+    """
+    if kind == 'LOADER':
+        node_group = assets.append_maps_loader_group(loader_name)
+    else:
+        node_group = assets.ensure_node_group(KT_GROUP_NAMES[kind], link=False)
+    if not node_group:
+        logger.error("Failed to load/find node group: %s", KT_GROUP_NAMES[kind])
+        return None
+
+    node = node_tree.nodes.new('ShaderNodeGroup')
+    node.node_tree = node_group
+    node.name = node_group.name
+    node.label = node_group.name.split(':')[-1].strip()
+    node.location = location
+    return node
+
+
+# "Loader Output Name": ("BSDF Input Name", "Internal Image Node Name"),
+SOCKET_MAP_CONNECT = {
+    "Base Color":        ("Base Color",        "Diffuse"),
+    "Metalness":         ("Metalness",         "Metalness"),
+    "Roughness":         ("Roughness",         "Roughness"),
+    "Alpha":             ("Alpha",             "Alpha"),
+    "Normal":            ("Normal",            "Normal"),
+    "Displacement":      ("Displacement",      "Displacement"),
+    "Transmission":      ("Transmission",      "Transmission"),
+    "Ambient Occlusion": ("Ambient Occlusion", "AmbientOcclusion"),
+    "Emission":          ("Emission",          "Emission"),
+    "Subsurface Weight": ("Subsurface Weight", "Subsurface Weight"),
+}
+
+MAPPING_LOADER_SOCKET_MAP = {
+    "Vector": "Vector",               # Saída Mapping : Entrada Loader (AJUSTE NOME ENTRADA LOADER SE NECESSÁRIO)
+    "Rotation Angle": "Rotation Angle", # Saída Mapping : Entrada Loader (AJUSTE AMBOS NOMES SE NECESSÁRIO)
+}
+
+def get_kt_group_kind(node):
+    """
+    Identifies a K-Tools group node.
+    Returns 'MAPPING', 'LOADER', 'BSDF' or None.
+    """
+    if node.type != 'GROUP' or not node.node_tree:
+        return None
+    tree_name = node.node_tree.name
+    if tree_name.startswith(assets.MAPS_LOADER_GROUP_NAME):
+        return 'LOADER'
+    if tree_name.startswith(assets.BSDF_GROUP_NAME):
+        return 'BSDF'
+    if tree_name.startswith(assets.MAPPING_GROUP_NAME):
+        return 'MAPPING'
+    return None
+
+
+def link_mapping_to_loader(links, mapping_node, loader_node):
+    """
+    Links Mapping -> Loader sockets that are not linked yet.
+    Returns the number of links created.
+    """
+    _, map_outputs = utils.get_socket_index_table(mapping_node)
+    load_inputs, _ = utils.get_socket_index_table(loader_node)
+
+    created = 0
+    for map_out_name, load_in_name in MAPPING_LOADER_SOCKET_MAP.items():
+        out_idx = map_outputs.get(map_out_name)
+        in_idx = load_inputs.get(load_in_name)
+        if out_idx is None or in_idx is None: continue
+
+        in_sock = loader_node.inputs[in_idx]
+        if in_sock.is_linked: continue # Não sobrescrever
+
+        links.new(mapping_node.outputs[out_idx], in_sock)
+        created += 1
+    return created
+
+
+def link_loader_to_bsdf(links, loader_node, bsdf_node, skip_opaque_alpha=False):
+    """
+    Links Loader -> BSDF sockets whose internal image node has an image
+    and whose BSDF input is not linked yet. With 'skip_opaque_alpha', an
+    Alpha map that is white everywhere is not wired.
+    Returns the number of links created.
+    """
+    _, load_outputs = utils.get_socket_index_table(loader_node)
+    bsdf_inputs, _ = utils.get_socket_index_table(bsdf_node)
+    loader_nodes = loader_node.node_tree.nodes # Árvore interna do loader
+
+    created = 0
+    for loader_out_name, (bsdf_in_name, internal_img_node_name) in SOCKET_MAP_CONNECT.items():
+        out_idx = load_outputs.get(loader_out_name)
+        in_idx = bsdf_inputs.get(bsdf_in_name)
+        if out_idx is None or in_idx is None: continue
+
+        in_sock = bsdf_node.inputs[in_idx]
+        if in_sock.is_linked: continue # Não sobrescrever
+
+        # Pular se nó interno não existe ou não tem imagem (nem valor constante)
+        internal_img_node = loader_nodes.get(internal_img_node_name)
+        if not internal_img_node:
+            continue
+        if (not internal_img_node.image and
+                not image_analysis.has_constant_replacement(loader_node.node_tree, internal_img_node_name)):
+            continue
+        if (skip_opaque_alpha and loader_out_name == "Alpha" and internal_img_node.image and
+                image_analysis.is_opacity_map_full(internal_img_node.image)):
+            continue # Transparência inútil (mapa todo branco)
+
+        links.new(loader_node.outputs[out_idx], in_sock)
+        created += 1
+    return created
+
+
+def _nearest_node(node, candidates):
+    """Returns the candidate closest to 'node' in the editor (or None)."""
+    if not candidates:
+        return None
+    if len(candidates) == 1:
+        return candidates[0]
+    return min(candidates, key=lambda c: (c.location - node.location).length_squared)
+
+
+def connect_kt_groups_in_tree(node_tree, skip_opaque_alpha=False):
+    """
+    Finds every K-Tools group instance in a material tree and wires
+    Mapping -> Loader -> BSDF. Each Loader is paired with the nearest
+    Mapping and BSDF instance.
+    Returns the number of links created.
+    """
+    buckets = {'MAPPING': [], 'LOADER': [], 'BSDF': []}
+    for node in node_tree.nodes:
+        kind = get_kt_group_kind(node)
+        if kind:
+            buckets[kind].append(node)
+
+    if not buckets['LOADER']:
+        return 0
+
+    links = node_tree.links
+    created = 0
+    for loader_node in buckets['LOADER']:
+        mapping_node = _nearest_node(loader_node, buckets['MAPPING'])
+        bsdf_node = _nearest_node(loader_node, buckets['BSDF'])
+        if mapping_node:
+            created += link_mapping_to_loader(links, mapping_node, loader_node)
+        if bsdf_node:
+            created += link_loader_to_bsdf(links, loader_node, bsdf_node, skip_opaque_alpha)
+    return created
+
+
+def connect_kt_groups(node_tree, mapping_node=None, loader_node=None, bsdf_node=None, skip_opaque_alpha=False):
+    """
+    Wires the given K-Tools group nodes of a tree (Mapping > Loader >
+    BSDF); either end may be None. Existing links are kept.
+    Returns {"mapping_loader": links created, "loader_bsdf": links created}.
+    """
+    links = node_tree.links
+    result = {"mapping_loader": 0, "loader_bsdf": 0}
+    if mapping_node:
+        result["mapping_loader"] = link_mapping_to_loader(links, mapping_node, loader_node)
+    if bsdf_node:
+        result["loader_bsdf"] = link_loader_to_bsdf(links, loader_node, bsdf_node, skip_opaque_alpha)
+    return result
@@ -0,0 +1,162 @@
+# File: k_tools_texture_map_loader/archive.py
+
+import bpy
+import os
+from . import utils
+from . import api
+from . import reclaim
+from . import diagnostics
+from .diagnostics import logger
+
+EXTRACT_CHUNK = 1 << 20
+
+# zip path -> ((mtime_ns, size), [ZipInfo of the image members])
+_directory_cache = {}
+# Items of the texture set enum: Blender needs the strings kept alive
+_set_items = []
+
+
+def read_directory(zip_path):
+    """
+    Image members of a zip archive, read from its central directory only:
+    names, sizes and CRCs come from the index at the end of the file and
+    nothing is decompressed. Returns a list of ZipInfo.
+    """
+    import zipfile # Só quando usado
+
+    extensions = {ext.lower() for ext in bpy.path.extensions_image}
+    with zipfile.ZipFile(zip_path) as zf:
+        return [info for info in zf.infolist()
+                if not info.is_dir() and os.path.splitext(info.filename)[1].lower() in extensions]
+
+
+def get_directory(zip_path):
+    """read_directory, cached per archive until its mtime or size changes."""
+    st = os.stat(zip_path)
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _directory_cache.get(zip_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    infos = read_directory(zip_path)
+    _directory_cache[zip_path] = (signature, infos)
+    return infos
+
+
+def classify_members(infos, kw_map):
+    """
+    Groups zip members into texture sets, per folder inside the archive
+    (like the Material Builder does for directories).
+    Returns {set key: {"name", "folder", "members": {map_type: member name},
+    "bytes"}}; the key is 'folder/set name'.
+    """
+    by_folder = {}
+    for info in infos:
+        folder, filename = info.filename.rpartition("/")[::2]
+        by_folder.setdefault(folder, {})[filename] = info
+
+    sets = {}
+    for folder, members in by_folder.items():
+        for set_name, files in utils.group_files_into_sets(sorted(members), kw_map).items():
+            key = f"{folder}/{set_name}" if folder else set_name
+            sets[key] = {
+                "name": set_name,
+                "folder": folder,
+                "members": {map_type: members[filename].filename for map_type, filename in files.items()},
+                "bytes": sum(members[filename].file_size for filename in files.values()),
+            }
+    return sets
+
+
+def list_archive_sets(zip_path, kw_map):
+    """Texture sets of a zip archive (see classify_members), without extracting it."""
+    return classify_members(get_directory(zip_path), kw_map)
+
+
+def get_cache_path(root, info):
+    """Cache path of a member: keyed by CRC + size, keeping its filename for the classification."""
+    folder = os.path.join(root, f"{info.CRC:08x}_{info.file_size}")
+    return os.path.join(folder, os.path.basename(info.filename))
+
+
+@diagnostics.profiled("archive.extract")
+def extract_members(zip_path, member_names, root=None):
+    """
+    Extracts zip members into the content-addressed cache, streaming each
+    one in chunks (never held whole in memory). Members already cached are
+    reused; the same content under another name is linked or copied from
+    the cache instead of decompressed again. zipfile checks the CRC while
+    reading. Returns {member name: cached path}.
+    """
+    import shutil # Só quando usado
+    import zipfile
+
+    root = root or utils.get_cache_dir("archives")
+    paths = {}
+    extracted = 0
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in member_names:
+            info = zf.getinfo(name)
+            path = get_cache_path(root, info)
+            paths[name] = path
+            if os.path.exists(path):
+                continue
+            folder = os.path.dirname(path)
+            os.makedirs(folder, exist_ok=True)
+            partial = path + ".part"
+            same_content = [f for f in os.listdir(folder) if not f.endswith(".part")]
+            if same_content:
+                source = os.path.join(folder, same_content[0])
+                try:
+                    os.link(source, partial)
+                except OSError:
+                    shutil.copyfile(source, partial)
+            else:
+                with zf.open(info) as src, open(partial, "wb") as dst:
+                    shutil.copyfileobj(src, dst, EXTRACT_CHUNK)
+                extracted += 1
+            os.replace(partial, path) # Atômico: nunca há arquivo pela metade no cache
+    diagnostics.count("archive.extracted", extracted)
+    logger.debug("Archive: %d member(s), %d extracted from '%s'", len(paths), extracted, zip_path)
+    return paths
+
+
+def load_archive_set(node_tree, zip_path, set_key, prefs=None, settings=None, kw_map=None):
+    """
+    Loads one texture set of a zip archive into a tree: only its members
+    are extracted (to the cache), then api.load_texture_set runs on them.
+    Returns the load_texture_set result.
+    """
+    prefs = prefs or utils.get_addon_preferences(bpy.context)
+    if kw_map is None:
+        kw_map = utils.get_keyword_map(prefs)
+    entry = list_archive_sets(zip_path, kw_map).get(set_key)
+    if entry is None:
+        raise KeyError(f"No texture set '{set_key}' in {zip_path}")
+    paths = extract_members(zip_path, entry["members"].values())
+    return api.load_texture_set(node_tree, list(paths.values()), prefs, settings, kw_map)
+
+
+def texture_set_items(self, context):
+    """Items of the texture set enum of the Load from Zip operator."""
+    import zipfile # Só quando usado
+
+    _set_items.clear()
+    path = bpy.path.abspath(self.filepath)
+    if path.lower().endswith(".zip") and os.path.isfile(path):
+        kw_map = utils.get_keyword_map(utils.get_addon_preferences(context))
+        try:
+            sets = list_archive_sets(path, kw_map)
+        except (OSError, zipfile.BadZipFile) as e:
+            logger.warning("Archive: could not read '%s': %s", path, e)
+            sets = {}
+        for key, entry in sorted(sets.items()):
+            _set_items.append((key, f"{entry['name']} ({len(entry['members'])} maps)",
+                               f"{entry['folder'] or '/'}: {utils.format_bytes(entry['bytes'])}"))
+    if not _set_items:
+        _set_items.append(('NONE', "No Texture Sets", "Select a zip archive with texture files"))
+    return _set_items
+
+
+def unregister():
+    _directory_cache.clear()
+    _set_items.clear()
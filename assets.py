@@ -2,6 +2,8 @@
 
 import bpy
 import os
+from . import diagnostics
+from .diagnostics import logger
 
 MAPS_LOADER_GROUP_NAME = "K-Tools: Maps Loader"
 MAPPING_GROUP_NAME = "K-Tools: Mapping"
@@ -14,16 +16,17 @@ def get_asset_filepath():
     addon_dir = os.path.dirname(__file__)
     return os.path.join(addon_dir, ASSET_FOLDER_NAME, ASSET_FILENAME)
 
+@diagnostics.profiled("assets.load_node_group")
 def load_node_group(filepath, group_name, link=False):
     """
     Loads a specific node group from a .blend file, handling potential renaming.
     Returns the loaded node group object or None.
     """
     if not os.path.exists(filepath):
-        print(f"TML Asset Error: File not found at '{filepath}'")
+        logger.error("Asset file not found at '%s'", filepath)
         return None
     if not os.path.isfile(filepath):
-        print(f"TML Asset Error: Path is not a file: '{filepath}'")
+        logger.error("Asset path is not a file: '%s'", filepath)
         return None
 
     # --- Refined Loading Logic ---
@@ -34,7 +37,7 @@ def load_node_group(filepath, group_name, link=False):
     # If linking, existing is fine. If appending, we still load to get a fresh copy source.
     existing_group = bpy.data.node_groups.get(group_name)
     if existing_group and link: # If linking and it exists, we are done
-         print(f"TML Asset: Using existing linked group '{group_name}'")
+         logger.debug("Using existing linked group '%s'", group_name)
          return existing_group
 
     # Load the library
@@ -44,10 +47,10 @@ def load_node_group(filepath, group_name, link=False):
                 data_to.node_groups = [group_name]
                 group_found_in_blend = True
             else:
-                print(f"TML Asset Error: Node group '{group_name}' not found inside '{filepath}'")
+                logger.error("Node group '%s' not found inside '%s'", group_name, filepath)
                 return None
     except Exception as e:
-        print(f"TML Asset Error: Failed to load library '{filepath}'. Error: {e}")
+        logger.error("Failed to load library '%s'. Error: %s", filepath, e)
         return None
 
     if not group_found_in_blend:
@@ -65,11 +68,11 @@ def load_node_group(filepath, group_name, link=False):
             # Sort by suffix number (highest is likely the newest)
             potential_matches.sort(key=lambda ng: int(ng.name.split('.')[-1]) if ng.name.split('.')[-1].isdigit() else -1, reverse=True)
             loaded_group = potential_matches[0] # Take the one with the highest suffix
-            print(f"TML Asset: Found loaded group with suffix: '{loaded_group.name}'")
+            logger.debug("Found loaded group with suffix: '%s'", loaded_group.name)
 
 
     if not loaded_group:
-        print(f"TML Asset Error: Group '{group_name}' load initiated but object not found in bpy.data after.")
+        logger.error("Group '%s' load initiated but object not found in bpy.data after.", group_name)
 
     # print(f"TML Asset: Successfully loaded '{loaded_group.name if loaded_group else 'None'}'") # Debug
     return loaded_group
@@ -115,7 +118,7 @@ def append_maps_loader_group(material_name=""):
     source_group = ensure_node_group(base_name, link=False)
 
     if not source_group:
-        print(f"TML Asset Error: Could not ensure presence of source group '{base_name}' for copying.")
+        logger.error("Could not ensure presence of source group '%s' for copying.", base_name)
         return None
 
     # --- Create Unique Name ---
@@ -139,5 +142,5 @@ def append_maps_loader_group(material_name=""):
     if new_group.library:
         new_group.library = None
 
-    print(f"TML Asset: Created unique copy '{new_name}' from '{source_group.name}'")
+    logger.info("Created unique copy '%s' from '%s'", new_name, source_group.name)
     return new_group
@@ -0,0 +1,264 @@
+# File: k_tools_texture_map_loader/atlas.py
+
+import bpy
+import os
+from . import utils
+from . import api
+from . import image_analysis
+from . import reclaim
+from . import diagnostics
+from .diagnostics import logger
+
+# Mapping node inserted between the K-Tools Mapping and each atlased Loader
+ATLAS_NODE_NAME = "TML Atlas UV"
+
+# Fill of the atlas areas no set covers, per map type (RGBA)
+EMPTY_FILL = {
+    "Normal": (0.5, 0.5, 1.0, 1.0),
+}
+
+
+def _next_power_of_two(value):
+    return 1 << max(0, int(value) - 1).bit_length()
+
+
+def pack_rects(sizes, padding=0, max_size=8192):
+    """
+    Skyline (bottom-left) packer. 'sizes' is a list of (width, height);
+    every rect gets 'padding' pixels on each side. The skyline is a
+    height per atlas column; candidate positions are the skyline steps
+    and each candidate's resting height is a NumPy max over its columns.
+    Returns (atlas_width, atlas_height, positions), positions[i] being
+    the (x, y) of the padded rect i, or None if it did not fit.
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    padded = [(w + 2 * padding, h + 2 * padding) for w, h in sizes]
+    if not padded:
+        return 0, 0, []
+    area = sum(w * h for w, h in padded)
+    width = max(_next_power_of_two(area ** 0.5), _next_power_of_two(max(w for w, _ in padded)))
+    width = min(width, max_size)
+
+    skyline = np.zeros(width, dtype=np.int64)
+    positions = [None] * len(padded)
+    # Mais altos primeiro: menos buracos sob o skyline
+    order = sorted(range(len(padded)), key=lambda i: (padded[i][1], padded[i][0]), reverse=True)
+    for i in order:
+        w, h = padded[i]
+        if w > width:
+            continue
+        steps = np.flatnonzero(np.diff(skyline, prepend=-1))
+        steps = steps[steps <= width - w]
+        rest = sliding_window_view(skyline, w)[steps].max(axis=1)
+        best = np.lexsort((steps, rest))[0] # Menor altura, depois menor x
+        x, y = int(steps[best]), int(rest[best])
+        if y + h > max_size:
+            continue
+        skyline[x:x + w] = y + h
+        positions[i] = (x, y)
+
+    height = _next_power_of_two(int(skyline.max()) or 1)
+    return width, min(height, max_size), positions
+
+
+def _srgb_to_linear_array(pixels):
+    import numpy as np
+    return np.where(pixels <= 0.04045, pixels / 12.92, ((pixels + 0.055) / 1.055) ** 2.4)
+
+
+def _fit_pixels(image, width, height, to_linear):
+    """Image pixels as (height, width, 4), resampled (nearest) if needed."""
+    import numpy as np
+
+    pixels = image_analysis.read_pixels(image, max_samples=0)
+    if pixels is None:
+        return None
+    src_h, src_w, channels = pixels.shape
+    if (src_w, src_h) != (width, height):
+        rows = (np.arange(height) * src_h // height)
+        cols = (np.arange(width) * src_w // width)
+        pixels = pixels[rows][:, cols]
+
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    if channels < 3:
+        rgba[..., :3] = pixels[..., :1]
+        if channels == 2: rgba[..., 3] = pixels[..., 1]
+    else:
+        rgba[..., :channels] = pixels
+    if to_linear:
+        rgba[..., :3] = _srgb_to_linear_array(rgba[..., :3])
+    return rgba
+
+
+def is_atlased(loader_node):
+    vector_in = loader_node.inputs.get("Vector")
+    return bool(vector_in and vector_in.is_linked
+                and vector_in.links[0].from_node.name.startswith(ATLAS_NODE_NAME))
+
+
+def collect_sets(materials, kw_map, max_set_size):
+    """
+    Texture sets that can go into an atlas: one per Maps Loader tree,
+    {tree name: {"tree", "loaders": [(material, node)], "images": {node name: (map type, image)}}}.
+    Sets with an image larger than 'max_set_size', tiled or generated
+    images, already atlased, or whose Loader tree is also used outside
+    these materials (it would sample the whole atlas there) are skipped.
+    """
+    sets = {}
+    for mat in materials:
+        if mat.library:
+            continue
+        for node in mat.node_tree.nodes:
+            if api.get_kt_group_kind(node) != 'LOADER':
+                continue
+            tree = node.node_tree
+            entry = sets.get(tree.name_full)
+            if entry is None:
+                images = {}
+                for image_node in utils.find_image_nodes_in_tree(tree):
+                    image = image_node.image
+                    if image:
+                        map_type = utils.get_node_map_info(image_node, kw_map)[0]
+                        images[image_node.name] = (map_type, image)
+                entry = sets[tree.name_full] = {"tree": tree, "loaders": [], "images": images}
+            entry["loaders"].append((mat, node))
+
+    usable = {}
+    for name, entry in sets.items():
+        images = entry["images"]
+        if not images or any(image.source != 'FILE' for _, image in images.values()):
+            continue
+        if any(is_atlased(loader) for _, loader in entry["loaders"]):
+            continue
+        tree = entry["tree"]
+        if tree.users - int(tree.use_fake_user) > len(entry["loaders"]):
+            continue # Usado por materiais fora do escopo ou dentro de outro grupo
+        # Ler size decodifica a imagem, mas ela será lida de qualquer forma
+        sizes = [tuple(image.size) for _, image in images.values()]
+        if any(w == 0 or h == 0 or w > max_set_size or h > max_set_size for w, h in sizes):
+            continue
+        entry["size"] = (max(w for w, _ in sizes), max(h for _, h in sizes))
+        usable[name] = entry
+    return usable
+
+
+def _pack_atlas(pixels, path, is_float, colorspace_name):
+    """
+    Creates the atlas image packed into the .blend, nothing written to
+    disk: the build runs inside an undo step, and undo cannot remove
+    files. 'path' is where unpacking writes it.
+    """
+    height, width = pixels.shape[:2]
+    name = os.path.splitext(os.path.basename(path))[0]
+    image = bpy.data.images.new(name, width, height, alpha=True, float_buffer=is_float)
+    image.colorspace_settings.name = colorspace_name
+    image.pixels.foreach_set(pixels.ravel())
+    image.filepath_raw = path
+    image.file_format = 'OPEN_EXR' if is_float else 'PNG'
+    image.pack() # Codificado no formato acima
+    return image
+
+
+def _insert_atlas_mapping(mat, loader_node, offset, scale):
+    """
+    Feeds the Loader's Vector input through a Mapping node that squeezes
+    the UVs into the set's sub-rectangle (whatever drove the input before
+    still does, through it).
+    """
+    tree = mat.node_tree
+    vector_in = loader_node.inputs.get("Vector")
+    if vector_in is None:
+        return False
+    node = tree.nodes.new('ShaderNodeMapping')
+    node.name = ATLAS_NODE_NAME
+    node.label = "Atlas UV"
+    node.vector_type = 'POINT'
+    node.location = (loader_node.location.x - 200, loader_node.location.y - 300)
+    node.inputs['Location'].default_value = (offset[0], offset[1], 0.0)
+    node.inputs['Scale'].default_value = (scale[0], scale[1], 1.0)
+
+    if vector_in.is_linked:
+        source = vector_in.links[0].from_socket
+    else:
+        uv_node = tree.nodes.new('ShaderNodeTexCoord')
+        uv_node.location = (node.location.x - 200, node.location.y)
+        source = uv_node.outputs['UV']
+    tree.links.new(source, node.inputs['Vector'])
+    tree.links.new(node.outputs['Vector'], vector_in)
+    return True
+
+
+@diagnostics.profiled("atlas.build")
+def build_atlas(sets, directory, atlas_name, padding=8, bleed=4, max_size=8192):
+    """
+    Packs the sets into one atlas per map type (same rectangle for every
+    map of a set), packs the atlases into the .blend (their paths point
+    into 'directory', where unpacking writes them), assigns them to the
+    Loaders' image nodes and inserts the sub-rectangle Mapping in front
+    of each Loader. 'bleed' pixels of the padding repeat the set's edge
+    pixels so mipmaps do not pull in the neighbours.
+    Returns (atlased_set_names, skipped_set_names, atlas_paths).
+    """
+    import numpy as np
+
+    names = sorted(sets)
+    bleed = min(bleed, padding)
+    width, height, positions = pack_rects([sets[n]["size"] for n in names], padding, max_size)
+    placed = [(n, pos) for n, pos in zip(names, positions) if pos is not None]
+    skipped = [n for n, pos in zip(names, positions) if pos is None]
+    if not placed:
+        return [], skipped, []
+
+    # Nó interno -> imagens de origem, por slot do Loader
+    slots = {}
+    for name, _ in placed:
+        for node_name, (map_type, image) in sets[name]["images"].items():
+            slots.setdefault(node_name, (map_type, []))[1].append((name, image))
+
+    atlas_images = {}
+    paths = []
+    for node_name, (map_type, sources) in sorted(slots.items()):
+        is_float = any(image.is_float for _, image in sources)
+        reference = next((image for _, image in sources if image.is_float == is_float))
+        colorspace_name = reference.colorspace_settings.name
+        atlas = np.empty((height, width, 4), dtype=np.float32)
+        atlas[:] = EMPTY_FILL.get(map_type, (0.0, 0.0, 0.0, 1.0))
+
+        rects = dict(placed)
+        for set_name, image in sources:
+            w, h = sets[set_name]["size"]
+            # Imagens de bytes sRGB num atlas float: converter para linear
+            to_linear = is_float and not image.is_float and not image.colorspace_settings.is_data
+            pixels = _fit_pixels(image, w, h, to_linear)
+            if pixels is None:
+                continue
+            if bleed:
+                pixels = np.pad(pixels, ((bleed, bleed), (bleed, bleed), (0, 0)), mode='edge')
+            x, y = rects[set_name]
+            x += padding - bleed
+            y += padding - bleed
+            atlas[y:y + pixels.shape[0], x:x + pixels.shape[1]] = pixels
+
+        ext = ".exr" if is_float else ".png"
+        path = os.path.join(directory, f"{atlas_name}_{bpy.path.clean_name(node_name)}{ext}")
+        atlas_images[node_name] = _pack_atlas(atlas, path, is_float, colorspace_name)
+        paths.append(path)
+        logger.info("Atlas '%s': %dx%d, %d set(s)", path, width, height, len(sources))
+
+    for set_name, (x, y) in placed:
+        entry = sets[set_name]
+        w, h = entry["size"]
+        offset = ((x + padding) / width, (y + padding) / height)
+        scale = (w / width, h / height)
+        for node in utils.find_image_nodes_in_tree(entry["tree"]):
+            atlas_image = atlas_images.get(node.name)
+            if atlas_image and node.image and node.image != atlas_image:
+                reclaim.track_replaced(node.image)
+                node.image = atlas_image
+        for mat, loader_node in entry["loaders"]:
+            _insert_atlas_mapping(mat, loader_node, offset, scale)
+
+    diagnostics.count("atlas.sets", len(placed))
+    return [n for n, _ in placed], skipped, paths
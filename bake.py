@@ -0,0 +1,357 @@
+# File: k_tools_texture_map_loader/bake.py
+
+import bpy
+import os
+from . import utils
+from . import api
+from . import colorspace
+from . import reclaim
+from . import transaction
+from . import diagnostics
+from .diagnostics import logger
+
+# Files of a flattened set: map type token -> suffix ('Wood_BaseColor.png')
+BAKED_SUFFIXES = {"BaseColor": "_BaseColor.png", "ORM": "_ORM.png", "Normal": "_Normal.png"}
+
+# Loader slots fed by the ORM channels (the Loader has no packed slot)
+ORM_CHANNELS = (("AmbientOcclusion", "Red"), ("Roughness", "Green"), ("Metalness", "Blue"))
+
+POLL_INTERVAL = 1.0 # Segundos entre verificações dos bakes
+
+_pool = None
+_pool_workers = 0
+# future -> (material name, temp dir with the file copy, replace network)
+_jobs = {}
+_temp_dirs = set()
+
+# Runs inside 'blender -b <copy>.blend': bakes one material on the CPU
+# with Cycles. The DIFFUSE color pass is weighted by (1 - metallic) and
+# (1 - transmission), so both are zeroed on every Principled BSDF before
+# the base color bake. Metalness has no bake pass: its source is routed
+# into Base Color and baked as diffuse color. AO is the network's own AO
+# map (what feeds the K-Tools BSDF 'Ambient Occlusion' input), baked
+# through an Emission shader; without one the channel is white.
+WORKER_SCRIPT = """
+import bpy, sys
+import numpy as np
+mat_name, ob_name, base_path, size, samples, margin, threads = sys.argv[sys.argv.index("--") + 1:]
+size, samples, margin, threads = int(size), int(samples), int(margin), int(threads)
+mat = bpy.data.materials[mat_name]
+ob = bpy.data.objects[ob_name]
+scene = bpy.context.scene
+scene.render.engine = 'CYCLES'
+scene.cycles.device = 'CPU'
+scene.cycles.samples = samples
+scene.render.threads_mode = 'FIXED'
+scene.render.threads = threads
+scene.render.bake.margin = margin
+if ob.name not in bpy.context.view_layer.objects:
+    scene.collection.objects.link(ob)
+ob.hide_viewport = False
+ob.hide_set(False)
+for other in bpy.context.view_layer.objects:
+    other.select_set(other == ob)
+bpy.context.view_layer.objects.active = ob
+if ob.mode != 'OBJECT':
+    bpy.ops.object.mode_set(mode='OBJECT')
+discard = bpy.data.images.new("TML Discard", 8, 8)
+
+def bake(pass_type, non_color, **kwargs):
+    image = bpy.data.images.new("TML " + pass_type, size, size)
+    if non_color:
+        image.colorspace_settings.is_data = True
+    for slot in ob.material_slots:
+        if not slot.material or not slot.material.use_nodes:
+            continue
+        nodes = slot.material.node_tree.nodes
+        node = nodes.get("TML Bake Target") or nodes.new('ShaderNodeTexImage')
+        node.name = "TML Bake Target"
+        node.image = image if slot.material == mat else discard
+        nodes.active = node
+    bpy.ops.object.bake(type=pass_type, margin=margin, use_clear=True, **kwargs)
+    return image
+
+def save(image, path):
+    image.filepath_raw = path
+    image.file_format = 'PNG'
+    image.save()
+
+def channel(image):
+    pixels = np.empty(size * size * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels[0::4]
+
+def unlink(tree, socket):
+    for link in list(socket.links):
+        tree.links.remove(link)
+
+# Metallic/Transmission zerados: o passe DIFFUSE COLOR não escurece metal nem vidro
+metal_sources = []
+for tree in [mat.node_tree] + list(bpy.data.node_groups):
+    for node in tree.nodes:
+        if node.type != 'BSDF_PRINCIPLED':
+            continue
+        metal = node.inputs['Metallic']
+        source = metal.links[0].from_socket if metal.is_linked else metal.default_value
+        metal_sources.append((tree, node, source))
+        for socket in (metal, node.inputs['Transmission Weight']):
+            unlink(tree, socket)
+            socket.default_value = 0.0
+
+save(bake('DIFFUSE', False, pass_filter={'COLOR'}), base_path + "_BaseColor.png")
+save(bake('NORMAL', True, normal_space='TANGENT'), base_path + "_Normal.png")
+rough = channel(bake('ROUGHNESS', True))
+
+for tree, node, source in metal_sources:
+    base = node.inputs['Base Color']
+    unlink(tree, base)
+    if isinstance(source, float):
+        base.default_value = (source,) * 3 + (1.0,)
+    else:
+        tree.links.new(source, base)
+metal = channel(bake('DIFFUSE', True, pass_filter={'COLOR'}))
+
+tree = mat.node_tree
+ao_link = next((l for l in tree.links if l.to_socket.name == "Ambient Occlusion"), None)
+output = next((n for n in tree.nodes if n.type == 'OUTPUT_MATERIAL' and n.is_active_output), None)
+if ao_link and output:
+    emission = tree.nodes.new('ShaderNodeEmission')
+    tree.links.new(ao_link.from_socket, emission.inputs['Color'])
+    unlink(tree, output.inputs['Surface'])
+    tree.links.new(emission.outputs[0], output.inputs['Surface'])
+    ao = channel(bake('EMIT', True))
+else:
+    ao = np.ones(size * size, dtype=np.float32)
+
+orm = bpy.data.images.new("TML ORM", size, size)
+orm.colorspace_settings.is_data = True
+pixels = np.ones(size * size * 4, dtype=np.float32)
+pixels[0::4], pixels[1::4], pixels[2::4] = ao, rough, metal
+orm.pixels.foreach_set(pixels)
+save(orm, base_path + "_ORM.png")
+"""
+
+
+def find_bake_object(material):
+    """A mesh object with UVs using the material, or None."""
+    for ob in bpy.data.objects:
+        if ob.type != 'MESH' or ob.library or not ob.data.uv_layers:
+            continue
+        if any(slot.material == material for slot in ob.material_slots):
+            return ob
+    return None
+
+
+def get_baked_paths(directory, material, taken=None):
+    """
+    Paths of a material's flattened set. The prefix keeps no separators,
+    so no word of the material name is classified as a map keyword.
+    """
+    prefix = utils.NAME_SPLIT_RE.sub("", bpy.path.clean_name(material.name)) or "Material"
+    if taken is not None:
+        unique, index = prefix, 1
+        while unique.lower() in taken:
+            unique = f"{prefix}{index}"
+            index += 1
+        taken.add(unique.lower())
+        prefix = unique
+    base = os.path.join(bpy.path.abspath(directory), prefix)
+    return {key: base + suffix for key, suffix in BAKED_SUFFIXES.items()}
+
+
+def _bake_job(binary, blend_path, mat_name, ob_name, paths, size, samples, margin, threads):
+    """Worker thread: runs one background Blender. No bpy data access here."""
+    import subprocess # Só quando usado
+
+    base_path = paths["BaseColor"][:-len(BAKED_SUFFIXES["BaseColor"])]
+    os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    cmd = [binary, "-b", blend_path, "--factory-startup", "--python-expr", WORKER_SCRIPT,
+           "--", mat_name, ob_name, base_path, str(size), str(samples), str(margin), str(threads)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0 or not all(os.path.exists(p) for p in paths.values()):
+        raise RuntimeError(f"bake failed ({proc.returncode}): {(proc.stderr or proc.stdout).strip()[-300:]}")
+    return paths
+
+
+def _route_orm(loader_tree, image):
+    """Feeds the Loader's AO, Roughness and Metalness slots from the ORM channels."""
+    for node_name, channel in ORM_CHANNELS:
+        node = loader_tree.nodes.get(node_name)
+        if not node or node.type != 'TEX_IMAGE':
+            continue
+        node.image = image
+        separate = loader_tree.nodes.new('ShaderNodeSeparateColor')
+        separate.name = f"TML ORM {channel}"
+        separate.location = (node.location.x + 300, node.location.y)
+        for link in list(node.outputs['Color'].links):
+            loader_tree.links.new(separate.outputs[channel], link.to_socket)
+            loader_tree.links.remove(link)
+        loader_tree.links.new(node.outputs['Color'], separate.inputs['Color'])
+
+
+def replace_with_baked(material, paths, prefs=None):
+    """
+    Replaces a material's node network with one Maps Loader (base color,
+    normal, and the ORM channels), wired Mapping > Loader > BSDF like the
+    template material (builder.get_template_material). The new Mapping
+    keeps its defaults: the old one's tiling is already in the bake. The
+    images of the removed network are handed to reclaim. Returns error
+    messages.
+    """
+    prefs = prefs or utils.get_addon_preferences(bpy.context)
+    tree = material.node_tree
+    output = next((n for n in tree.nodes if n.type == 'OUTPUT_MATERIAL' and n.is_active_output), None)
+    for node in utils.iter_image_nodes_recursive(tree):
+        reclaim.track_replaced(node.image)
+    for node in list(tree.nodes):
+        if node != output:
+            tree.nodes.remove(node)
+    if not output:
+        output = tree.nodes.new('ShaderNodeOutputMaterial')
+    output.location = (800, 0)
+
+    mapping = api.add_kt_group(tree, 'MAPPING', (-400, 0))
+    loader = api.add_kt_group(tree, 'LOADER', (0, 0), loader_name=material.name)
+    bsdf = api.add_kt_group(tree, 'BSDF', (400, 0))
+    if not (mapping and loader and bsdf):
+        return [f"Failed to load the K-Tools node groups ({material.name})."]
+    result = api.load_texture_set(loader.node_tree, [paths["BaseColor"], paths["Normal"]], prefs)
+    try:
+        orm = bpy.data.images.load(paths["ORM"])
+    except RuntimeError as e:
+        result["errors"].append(f"Load error: {paths['ORM']}. {e}")
+    else:
+        colorspace.apply_colorspace(orm, 'UTILITY', prefs)
+        _route_orm(loader.node_tree, orm)
+    api.connect_kt_groups(tree, mapping_node=mapping, loader_node=loader, bsdf_node=bsdf)
+    if bsdf.outputs:
+        tree.links.new(bsdf.outputs[0], output.inputs['Surface'])
+    return result["errors"]
+
+
+@diagnostics.profiled("bake.flatten")
+def bake_materials(materials, directory, size=2048, samples=16, margin=16, workers=0, replace=True, wait=None):
+    """
+    Bakes each material's network to a flattened set (base color, ORM,
+    normal) in a pool of background Blender processes rendering with
+    Cycles on the CPU, so it runs on GPU-less headless nodes. The
+    processes open a temporary copy of the current file. With 'replace',
+    each baked material is rebuilt around a single Maps Loader.
+
+    The bakes run without blocking: a timer applies them as they finish.
+    With 'wait' (the default in background mode, where timers do not run
+    after the script) the call blocks and applies them before returning.
+    Returns (queued material names, error messages).
+    """
+    import tempfile # Só quando usado
+
+    if wait is None:
+        wait = bpy.app.background
+    errors = []
+    jobs = []
+    taken = set()
+    for mat in materials:
+        if any(job[0] == mat.name for job in _jobs.values()):
+            errors.append(f"{mat.name}: already baking.")
+            continue
+        ob = find_bake_object(mat)
+        if not ob:
+            errors.append(f"{mat.name}: no mesh object with UVs uses it.")
+            continue
+        jobs.append((mat.name, ob.name, get_baked_paths(directory, mat, taken)))
+    if not jobs:
+        return [], errors
+
+    cpus = os.cpu_count() or 2
+    workers = workers or max(1, min(4, cpus // 4))
+    threads = max(1, cpus // workers) # Processos dividem os núcleos
+    temp_dir = tempfile.mkdtemp(prefix="tml_bake_")
+    blend_path = os.path.join(temp_dir, "bake.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True, check_existing=False)
+    _temp_dirs.add(temp_dir)
+
+    pool = _get_pool(min(workers, len(jobs)))
+    for name, ob_name, paths in jobs:
+        future = pool.submit(_bake_job, bpy.app.binary_path, blend_path, name, ob_name, paths,
+                             size, samples, margin, threads)
+        _jobs[future] = (name, temp_dir, replace)
+    diagnostics.count("bake.queued", len(jobs))
+
+    if wait:
+        from concurrent.futures import wait as wait_futures # Só quando usado
+        wait_futures(list(_jobs))
+        errors.extend(_apply_finished())
+    elif not bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.register(_poll, first_interval=POLL_INTERVAL)
+    return [job[0] for job in jobs], errors
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        from concurrent.futures import ThreadPoolExecutor # Só quando usado
+        if _pool is not None:
+            _pool.shutdown(wait=False) # Jobs em andamento terminam normalmente
+        # Cada thread só espera seu processo Blender
+        _pool = ThreadPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def _apply_finished():
+    """
+    Applies the finished bakes on the main thread (one undo step) and
+    removes the temporary copies no job uses any more. Returns errors.
+    """
+    import shutil # Só quando usado
+
+    done = [future for future in _jobs if future.done()]
+    if not done:
+        return []
+    errors = []
+    prefs = utils.get_addon_preferences(bpy.context)
+    replaced = False
+    with transaction.transaction("Bake to Flat Texture Set", push=True):
+        for future in done:
+            name, temp_dir, replace = _jobs.pop(future)
+            try:
+                paths = future.result()
+            except (OSError, RuntimeError) as e:
+                errors.append(f"{name}: {e}")
+                logger.warning("Bake: '%s' failed: %s", name, e)
+                continue
+            diagnostics.count("bake.materials")
+            logger.info("Bake: '%s' -> %s", name, paths["BaseColor"])
+            mat = bpy.data.materials.get(name)
+            if replace and mat:
+                errors.extend(replace_with_baked(mat, paths, prefs))
+                replaced = True
+        if replaced and prefs and prefs.reclaim_replaced_images != 'OFF':
+            reclaim.reclaim(prefs.reclaim_replaced_images)
+
+    in_use = {job[1] for job in _jobs.values()}
+    for temp_dir in {d for d in _temp_dirs if d not in in_use}:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        _temp_dirs.discard(temp_dir)
+    return errors
+
+
+def _poll():
+    """Timer: applies the finished bakes."""
+    for message in _apply_finished():
+        logger.warning("Bake: %s", message)
+    return POLL_INTERVAL if _jobs else None
+
+
+def get_pending_count():
+    return len(_jobs)
+
+
+def unregister():
+    global _pool
+    if bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.unregister(_poll)
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    _jobs.clear()
@@ -0,0 +1,374 @@
+# File: k_tools_texture_map_loader/benchmarks/run_benchmarks.py
+"""
+Reproducible benchmarks for classification, loading and batch operations.
+
+Inside Blender (headless):
+    blender -b --factory-startup --python benchmarks/run_benchmarks.py -- --sizes 10,100,1000
+
+Outside Blender (pure-Python parts, against a stub 'bpy'):
+    python benchmarks/run_benchmarks.py --sizes 10,100,1000,10000
+
+Results are written as JSON (--output) and can be compared with a
+previous run (--compare).
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.dirname(BENCH_DIR)
+ADDON_NAME = "k_tools_texture_map_loader"
+
+sys.path.insert(0, BENCH_DIR)
+
+try:
+    import bpy
+    IN_BLENDER = bool(getattr(bpy.app, "binary_path", ""))
+except ImportError:
+    import stub_bpy
+    bpy = stub_bpy.install()
+    IN_BLENDER = False
+
+import synthetic
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000",
+                        help="Comma-separated node/file counts (10 to 10000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--output", default=os.path.join(os.getcwd(), "bench_results.json"),
+                        help="JSON file for the results")
+    parser.add_argument("--compare", default="", help="Previous JSON results to compare with")
+    parser.add_argument("--enable-budget-ms", type=float, default=25.0,
+                        help="Fail (exit code 1) if enabling the addon (import + register) takes longer on average")
+    parser.add_argument("--data-dir", default="",
+                        help="Where the synthetic texture folders are written (default: temp dir)")
+    return parser.parse_args(argv)
+
+
+def import_addon():
+    """
+    Returns the addon package: the enabled one when running inside
+    Blender, otherwise imported from this checkout.
+    """
+    for name, module in list(sys.modules.items()):
+        if name == ADDON_NAME or name.endswith("." + ADDON_NAME):
+            return module
+
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME, os.path.join(ADDON_DIR, "__init__.py"),
+        submodule_search_locations=[ADDON_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = module
+    start = time.perf_counter()
+    spec.loader.exec_module(module)
+    module._bench_import_ms = (time.perf_counter() - start) * 1000.0
+    return module
+
+
+def feature_module(addon, name):
+    """A module the addon imports on first use (relink, watcher, lod...)."""
+    return importlib.import_module(f"{addon.__name__}.{name}")
+
+
+def measure(func, repeat, setup=None):
+    """Runs func 'repeat' times; returns min/mean/max in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+        "max_ms": max(samples),
+    }
+
+
+class _FakeOperator:
+    """'self' stand-in for calling Operator.execute directly."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+        self.messages = []
+
+    def report(self, level, message):
+        self.messages.append((level, message))
+
+
+def measure_enable(addon, repeat):
+    """
+    Times the import of the package and register() (together, what
+    enabling the addon costs) and unregister(). Skipped when the addon is
+    already enabled in this Blender session.
+    """
+    if addon.__name__ in bpy.context.preferences.addons:
+        return None
+
+    register_samples = []
+    unregister_samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        addon.register()
+        register_samples.append((time.perf_counter() - start) * 1000.0)
+        start = time.perf_counter()
+        addon.unregister()
+        unregister_samples.append((time.perf_counter() - start) * 1000.0)
+
+    import_ms = getattr(addon, "_bench_import_ms", None) or 0.0
+    return {
+        "import_ms": import_ms,
+        "enable_ms": import_ms + statistics.fmean(register_samples),
+        "register_mean_ms": statistics.fmean(register_samples),
+        "register_max_ms": max(register_samples),
+        "unregister_mean_ms": statistics.fmean(unregister_samples),
+    }
+
+
+def measure_shader_compile(addon, repeat):
+    """
+    Inside Blender only: times an EEVEE render of a fresh copy of the
+    Loader material (Mapping > Loader > BSDF), so each run compiles its
+    shader, with the empty slots kept and pruned in each mode.
+    None without Blender, the bundled node groups or a GPU.
+    """
+    if not IN_BLENDER:
+        return None
+    template = addon.builder.get_template_material()
+    if not template:
+        return None
+    scene = bpy.context.scene
+    scene.render.engine = 'BLENDER_EEVEE_NEXT'
+    scene.render.resolution_x = scene.render.resolution_y = 64
+    mesh = bpy.data.meshes.new("TML_Bench_Compile")
+    mesh.from_pydata([(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)], [], [(0, 1, 2, 3)])
+    ob = bpy.data.objects.new("TML_Bench_Compile", mesh)
+    scene.collection.objects.link(ob)
+    camera = bpy.data.objects.new("TML_Bench_Camera", bpy.data.cameras.new("TML_Bench_Camera"))
+    camera.location = (0.0, 0.0, 4.0)
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+
+    materials = []
+    results = {}
+    try:
+        for mode in ('OFF', 'MUTE', 'STRIP'):
+            def setup(mode=mode):
+                mat = template.copy()
+                for node in mat.node_tree.nodes:
+                    if addon.api.get_kt_group_kind(node) == 'LOADER':
+                        node.node_tree = node.node_tree.copy() # Podado sem tocar no template
+                addon.api.connect_kt_groups_in_tree(mat.node_tree)
+                if mode != 'OFF':
+                    for tree in addon.pruning.iter_loader_trees(mat):
+                        addon.pruning.prune_tree(tree, mode)
+                mesh.materials.clear()
+                mesh.materials.append(mat)
+                materials.append(mat)
+            results[mode.lower()] = measure(lambda _: bpy.ops.render.render(), repeat, setup)
+    except RuntimeError as e:
+        print(f"shader_compile: skipped ({e})")
+        return None
+    finally:
+        for mat in materials:
+            loaders = list(addon.pruning.iter_loader_trees(mat))
+            bpy.data.materials.remove(mat)
+            for loader in loaders:
+                bpy.data.node_groups.remove(loader)
+        bpy.data.objects.remove(ob)
+        bpy.data.meshes.remove(mesh)
+        bpy.data.cameras.remove(camera.data)
+    return results
+
+
+def peak_rss_kb():
+    """Peak resident memory of this process (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def make_tree(size):
+    if IN_BLENDER:
+        mat = synthetic.make_blender_tree(bpy, size)
+        return mat.node_tree, mat
+    return synthetic.make_stub_tree(size), None
+
+
+def discard_tree(tree, material):
+    if IN_BLENDER and material:
+        bpy.data.materials.remove(material)
+    for image in list(bpy.data.images):
+        if image.name.startswith("Set"):
+            bpy.data.images.remove(image)
+
+
+def run_size(addon, size, repeat, data_root):
+    utils = addon.utils
+    operators = addon.operators
+    ui_panel = addon.ui.ui_panel
+
+    prefs = synthetic.make_prefs(addon.preferences.DEFAULT_KEYWORDS)
+    folder = os.path.join(data_root, f"textures_{size}")
+    filenames = synthetic.make_texture_folder(folder, size)
+    kw_map = utils.build_keyword_map(prefs)
+    results = {}
+
+    results["build_keyword_map"] = measure(lambda _: utils.build_keyword_map(prefs), repeat)
+    results["get_keyword_map"] = measure(lambda _: utils.get_keyword_map(prefs), repeat)
+
+    def classify(_):
+        for filename in filenames:
+            utils.get_file_map_info(filename, kw_map)
+    results["get_file_map_info"] = measure(classify, repeat)
+
+    relink = feature_module(addon, "relink")
+    watcher = feature_module(addon, "watcher")
+    archive = feature_module(addon, "archive")
+    lod = feature_module(addon, "lod")
+
+    watched_dirs = {folder: set(filenames)}
+    results["relink_index"] = measure(lambda _: relink.FileIndex(folder, kw_map), repeat)
+    results["watcher_scan"] = measure(lambda _: watcher.scan_signatures(watched_dirs), repeat)
+
+    zip_path = synthetic.make_texture_zip(os.path.join(data_root, f"textures_{size}.zip"), folder, filenames)
+    results["archive_classify"] = measure(
+        lambda _: archive.classify_members(archive.read_directory(zip_path), kw_map), repeat)
+
+    bounds, matrices, projection = synthetic.make_lod_scene(size)
+    results["lod_projection"] = measure(lambda _: lod.projected_sizes(bounds, matrices, projection), repeat)
+
+    tree, material = make_tree(size)
+    context = synthetic.make_context(addon.__name__, prefs, tree, material)
+    try:
+        results["get_sorted_image_nodes"] = measure(
+            lambda _: utils.get_sorted_image_nodes(tree, context), repeat)
+
+        def load(_):
+            op = _FakeOperator(
+                directory=folder,
+                files=[synthetic.StubNode(name=f) for f in filenames],
+            )
+            operators.TML_OT_LoadTextureSet.execute(op, context)
+        results["TML_OT_LoadTextureSet"] = measure(load, repeat)
+
+        def scripted_batch(_):
+            # Several loads in a row as a script would run them: one undo step
+            with addon.transaction.transaction("Benchmark Batch", push=True):
+                for _ in range(3):
+                    load(None)
+        results["transaction_batch_load"] = measure(scripted_batch, repeat)
+
+        # Memória do processo em volta de um lote real (o passo de undo
+        # só é empilhado com interface; em background conta só o lote)
+        before = addon.diagnostics.get_process_memory()
+        scripted_batch(None)
+        after = addon.diagnostics.get_process_memory()
+        batch_memory = {
+            "before_kb": before // 1024 if before is not None else None,
+            "after_kb": after // 1024 if after is not None else None,
+            "undo_pushed": IN_BLENDER and not bpy.app.background,
+        }
+
+        results["TML_OT_ApplyBatchSettings"] = measure(
+            lambda _: operators.TML_OT_ApplyBatchSettings.execute(_FakeOperator(), context), repeat)
+
+        def draw(_):
+            panel = _FakeOperator(layout=synthetic.RecordingLayout())
+            ui_panel.TML_PT_MainPanel.draw(panel, context)
+        results["panel_draw"] = measure(draw, repeat)
+    finally:
+        discard_tree(tree, material)
+
+    return results, batch_memory
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nComparison with {baseline_path} (mean, current / baseline):")
+    for size, benches in current["results"].items():
+        base_benches = baseline.get("results", {}).get(size, {})
+        for name, stats in benches.items():
+            base = base_benches.get(name)
+            if not base or not base["mean_ms"]:
+                continue
+            ratio = stats["mean_ms"] / base["mean_ms"]
+            print(f"  {size:>6} {name:<28} {ratio:6.2f}x")
+
+
+def main():
+    args = parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    addon = import_addon()
+
+    data_root = args.data_dir or os.path.join(tempfile.gettempdir(), "tml_bench")
+    os.makedirs(data_root, exist_ok=True)
+
+    report = {
+        "mode": "blender" if IN_BLENDER else "stub",
+        "blender_version": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+
+    enable = measure_enable(addon, args.repeat)
+    over_budget = False
+    if enable:
+        over_budget = enable["enable_ms"] > args.enable_budget_ms
+        enable["budget_ms"] = args.enable_budget_ms
+        enable["within_budget"] = not over_budget
+        report["enable"] = enable
+        print(f"enable: import {enable['import_ms']:.3f} ms + register mean {enable['register_mean_ms']:.3f} ms "
+              f"(budget {args.enable_budget_ms:.1f} ms){'  OVER BUDGET' if over_budget else ''}")
+    else:
+        print("enable: skipped (addon already enabled in this session)")
+
+    report["memory"] = {"peak_rss_kb_before": peak_rss_kb()}
+    for size in sizes:
+        results, batch_memory = run_size(addon, size, args.repeat, data_root)
+        report["results"][str(size)] = results
+        report["memory"][f"batch_{size}"] = batch_memory
+        print(f"{size:>6} batch memory {batch_memory['before_kb']} -> {batch_memory['after_kb']} KB"
+              f"{' (with undo step)' if batch_memory['undo_pushed'] else ''}")
+        for name, stats in results.items():
+            print(f"{size:>6} {name:<28} mean {stats['mean_ms']:9.3f} ms  (min {stats['min_ms']:.3f}, max {stats['max_ms']:.3f})")
+
+    shader_compile = measure_shader_compile(addon, args.repeat)
+    if shader_compile:
+        report["shader_compile"] = shader_compile
+        for mode, stats in shader_compile.items():
+            print(f"shader_compile {mode:<6} mean {stats['mean_ms']:9.3f} ms  (min {stats['min_ms']:.3f}, max {stats['max_ms']:.3f})")
+
+    report["memory"]["peak_rss_kb_after"] = peak_rss_kb()
+    print(f"memory: peak RSS {report['memory']['peak_rss_kb_before']} -> {report['memory']['peak_rss_kb_after']} KB")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
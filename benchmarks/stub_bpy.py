@@ -0,0 +1,302 @@
+# File: k_tools_texture_map_loader/benchmarks/stub_bpy.py
+"""
+Minimal stand-in for the 'bpy', 'bpy_extras' and 'mathutils' modules so
+the pure-Python parts of the addon can be imported and benchmarked
+outside Blender. Only what the addon touches at import time and in the
+benchmarked code paths is provided.
+"""
+
+import math
+import os
+import sys
+import types
+
+
+class _Property:
+    """Mimics bpy.props._PropertyDeferred (function + keywords)."""
+
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+
+    def __repr__(self):
+        return f"<stub {self.function.__name__} {self.keywords}>"
+
+
+def _make_prop(name):
+    def prop(**keywords):
+        return _Property(prop, keywords)
+    prop.__name__ = name
+    return prop
+
+
+class _StubBase:
+    """Base for bpy.types stand-ins; instances accept any attribute."""
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class _TypesModule(types.ModuleType):
+    """bpy.types: every attribute is a (cached) empty class."""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        cls = type(name, (_StubBase,), {})
+        setattr(self, name, cls)
+        return cls
+
+
+class Vector:
+    """Tiny 2D/3D vector, enough for node placement code."""
+
+    def __init__(self, values=(0.0, 0.0)):
+        self._v = [float(v) for v in values]
+
+    def __getitem__(self, i):
+        return self._v[i]
+
+    def __len__(self):
+        return len(self._v)
+
+    def __iter__(self):
+        return iter(self._v)
+
+    def __sub__(self, other):
+        return Vector([a - b for a, b in zip(self._v, other)])
+
+    def __add__(self, other):
+        return Vector([a + b for a, b in zip(self._v, other)])
+
+    @property
+    def x(self):
+        return self._v[0]
+
+    @x.setter
+    def x(self, value):
+        self._v[0] = float(value)
+
+    @property
+    def y(self):
+        return self._v[1]
+
+    @y.setter
+    def y(self, value):
+        self._v[1] = float(value)
+
+    @property
+    def length(self):
+        return math.sqrt(sum(v * v for v in self._v))
+
+    @property
+    def length_squared(self):
+        return sum(v * v for v in self._v)
+
+    def copy(self):
+        return Vector(self._v)
+
+
+class IDCollection:
+    """bpy.data collection stand-in (ordered, name-addressable)."""
+
+    def __init__(self):
+        self._items = {}
+
+    def get(self, name, default=None):
+        return self._items.get(name, default)
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self._items.values())[key]
+        return self._items[key]
+
+    def add(self, item):
+        base = item.name
+        name = base
+        count = 1
+        while name in self._items:
+            name = f"{base}.{count:03d}"
+            count += 1
+        item.name = name
+        item.name_full = name
+        self._items[name] = item
+        return item
+
+    def remove(self, item, **kwargs):
+        self._items.pop(item.name, None)
+
+    def clear(self):
+        self._items.clear()
+
+
+class StubImage(_StubBase):
+    _uid = 0
+
+    def __init__(self, name, filepath=""):
+        StubImage._uid += 1
+        super().__init__(
+            name=name,
+            name_full=name,
+            filepath=filepath,
+            filepath_raw=filepath,
+            session_uid=StubImage._uid,
+            size=(4, 4),
+            channels=4,
+            depth=32,
+            is_float=False,
+            has_data=False,
+            packed_file=None,
+            library=None,
+            users=0,
+            alpha_mode='STRAIGHT',
+            use_half_precision=False,
+            source='FILE',
+            colorspace_settings=_StubBase(name="sRGB", is_data=False),
+        )
+
+    # ID custom properties
+    def __contains__(self, key):
+        return key in self.__dict__.setdefault("_idprops", {})
+
+    def __getitem__(self, key):
+        return self.__dict__.setdefault("_idprops", {})[key]
+
+    def __setitem__(self, key, value):
+        self.__dict__.setdefault("_idprops", {})[key] = value
+
+    def get(self, key, default=None):
+        return self.__dict__.setdefault("_idprops", {}).get(key, default)
+
+    def reload(self):
+        pass
+
+    def buffers_free(self):
+        self.has_data = False
+
+
+class StubImages(IDCollection):
+
+    def load(self, filepath, check_existing=False):
+        if not os.path.exists(filepath):
+            raise RuntimeError(f"Error: Cannot read file '{filepath}'")
+        if check_existing:
+            for image in self:
+                if image.filepath == filepath:
+                    return image
+        return self.add(StubImage(os.path.basename(filepath), filepath))
+
+
+def install():
+    """Registers the stub modules in sys.modules. Returns the bpy stub."""
+    if "bpy" in sys.modules:
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+
+    props = types.ModuleType("bpy.props")
+    for name in ("StringProperty", "BoolProperty", "IntProperty", "FloatProperty",
+                 "EnumProperty", "PointerProperty", "CollectionProperty",
+                 "FloatVectorProperty", "IntVectorProperty"):
+        setattr(props, name, _make_prop(name))
+
+    bpy_types = _TypesModule("bpy.types")
+    # Colorspaces of Blender's default OCIO config
+    colorspaces = [types.SimpleNamespace(identifier=name) for name in (
+        "ACES2065-1", "ACEScg", "AgX Base sRGB", "Display P3", "Filmic Log", "Filmic sRGB",
+        "Linear CIE-XYZ D65", "Linear Rec.709", "Linear Rec.2020", "Non-Color", "sRGB")]
+    bpy_types.ColorManagedInputColorspaceSettings.bl_rna = types.SimpleNamespace(
+        properties={"name": types.SimpleNamespace(enum_items=colorspaces)})
+
+    utils = types.ModuleType("bpy.utils")
+    utils.register_class = lambda cls: None
+    utils.unregister_class = lambda cls: None
+    utils.extension_path_user = lambda package, path="", create=False: os.path.join(
+        os.path.expanduser("~"), ".cache", "tml_stub", path)
+
+    path = types.ModuleType("bpy.path")
+    path.abspath = lambda p, **kwargs: os.path.abspath(p) if p else p
+    path.relpath = lambda p, **kwargs: p
+    path.basename = os.path.basename
+    path.extensions_image = frozenset({
+        ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".exr", ".hdr", ".tga",
+        ".bmp", ".webp", ".dds",
+    })
+
+    app = types.ModuleType("bpy.app")
+    app.version = (4, 2, 0)
+    app.version_string = "stub"
+    app.background = True
+    app.binary_path = ""
+    timers = types.ModuleType("bpy.app.timers")
+    timers.register = lambda func, first_interval=0, persistent=False: None
+    timers.unregister = lambda func: None
+    timers.is_registered = lambda func: False
+    app.timers = timers
+    handlers = types.ModuleType("bpy.app.handlers")
+    for name in ("load_post", "load_pre", "save_pre", "save_post", "render_pre",
+                 "render_post", "render_cancel", "render_complete",
+                 "depsgraph_update_post", "undo_post", "redo_post"):
+        setattr(handlers, name, [])
+    handlers.persistent = lambda func: func
+    app.handlers = handlers
+
+    data = types.SimpleNamespace(
+        filepath="",
+        images=StubImages(),
+        materials=IDCollection(),
+        node_groups=IDCollection(),
+        objects=IDCollection(),
+        libraries=IDCollection(),
+    )
+
+    context = types.SimpleNamespace(
+        preferences=types.SimpleNamespace(addons={}, edit=types.SimpleNamespace(use_global_undo=True)),
+        scene=None,
+        window_manager=None,
+    )
+
+    ops = types.SimpleNamespace()
+
+    bpy.props = props
+    bpy.types = bpy_types
+    bpy.utils = utils
+    bpy.path = path
+    bpy.app = app
+    bpy.data = data
+    bpy.context = context
+    bpy.ops = ops
+
+    bpy_extras = types.ModuleType("bpy_extras")
+    io_utils = types.ModuleType("bpy_extras.io_utils")
+    io_utils.ExportHelper = type("ExportHelper", (), {})
+    io_utils.ImportHelper = type("ImportHelper", (), {})
+    bpy_extras.io_utils = io_utils
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = Vector
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.props": props,
+        "bpy.types": bpy_types,
+        "bpy.utils": utils,
+        "bpy.path": path,
+        "bpy.app": app,
+        "bpy.app.timers": timers,
+        "bpy.app.handlers": handlers,
+        "bpy_extras": bpy_extras,
+        "bpy_extras.io_utils": io_utils,
+        "mathutils": mathutils,
+    })
+    return bpy
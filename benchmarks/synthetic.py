@@ -0,0 +1,228 @@
+# File: k_tools_texture_map_loader/benchmarks/synthetic.py
+"""
+Synthetic data for the benchmarks: tiny on-disk images, image node
+trees (real in Blender, stubbed outside) and fake contexts.
+"""
+
+import os
+import struct
+import types
+import zlib
+
+# Name fragments used for the generated files / node labels, one per
+# map type, plus an unrecognised one to exercise the 'Unknown' path.
+MAP_TOKENS = [
+    "BaseColor", "Metallic", "Roughness", "Opacity", "Normal",
+    "Height", "Transmission", "AO", "Emissive", "SSS", "Misc",
+]
+
+
+def write_png(filepath, width=4, height=4, rgba=(128, 128, 255, 255)):
+    """Writes a tiny solid-colour 8-bit RGBA PNG."""
+    def chunk(tag, payload):
+        body = tag + payload
+        return struct.pack(">I", len(payload)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(rgba) * width
+    raw = row * height
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    with open(filepath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", header))
+        f.write(chunk(b"IDAT", zlib.compress(raw)))
+        f.write(chunk(b"IEND", b""))
+
+
+def make_texture_folder(root, file_count):
+    """
+    Fills 'root' with 'file_count' tiny PNGs named like
+    'Set0001_BaseColor.png', cycling through MAP_TOKENS.
+    Returns the list of filenames.
+    """
+    os.makedirs(root, exist_ok=True)
+    filenames = []
+    tokens = len(MAP_TOKENS)
+    for i in range(file_count):
+        name = f"Set{i // tokens:05d}_{MAP_TOKENS[i % tokens]}.png"
+        path = os.path.join(root, name)
+        if not os.path.exists(path):
+            write_png(path)
+        filenames.append(name)
+    return filenames
+
+
+def make_texture_zip(zip_path, folder, filenames):
+    """Zips the files of make_texture_folder (deflated), one subfolder per 100 files."""
+    import zipfile
+
+    if os.path.exists(zip_path):
+        return zip_path
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, name in enumerate(filenames):
+            zf.write(os.path.join(folder, name), f"pack/{i // 100:03d}/{name}")
+    return zip_path
+
+
+# --- Stub node trees ---
+
+class StubNode(types.SimpleNamespace):
+    pass
+
+
+class StubNodes(list):
+
+    def get(self, name, default=None):
+        for node in self:
+            if node.name == name:
+                return node
+        return default
+
+
+class StubNodeTree(types.SimpleNamespace):
+    pass
+
+
+def _new_image_node(index, label):
+    return StubNode(
+        type='TEX_IMAGE',
+        name=f"Image Texture.{index:05d}",
+        label=label,
+        image=None,
+        interpolation='Linear',
+        projection='FLAT',
+        projection_blend=0.0,
+        extension='REPEAT',
+        mute=False,
+        location=(0.0, 0.0),
+        tml_props=types.SimpleNamespace(ui_expanded=True, previous_image_name="", constant_image_path=""),
+    )
+
+
+def make_stub_tree(node_count, name="TML_Bench"):
+    nodes = StubNodes(
+        _new_image_node(i, MAP_TOKENS[i % len(MAP_TOKENS)]) for i in range(node_count)
+    )
+    variants = types.SimpleNamespace(variants=[], active_index=-1)
+    tree = StubNodeTree(name=name, nodes=nodes, links=[], type='SHADER', tml_variants=variants)
+    for node in nodes:
+        node.id_data = tree
+    return tree
+
+
+def make_blender_tree(bpy, node_count, name="TML_Bench"):
+    """Creates a material with 'node_count' labelled Image Texture nodes."""
+    mat = bpy.data.materials.new(name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    for i in range(node_count):
+        node = nodes.new('ShaderNodeTexImage')
+        node.label = MAP_TOKENS[i % len(MAP_TOKENS)]
+        node.location = ((i % 50) * 300.0, -(i // 50) * 300.0)
+    return mat
+
+
+# --- Fake preferences / context ---
+
+def make_prefs(default_keywords):
+    """Addon preferences stand-in populated from DEFAULT_KEYWORDS."""
+    keyword_list = [
+        types.SimpleNamespace(map_type=map_type, keywords=", ".join(keywords), data_type=data_type)
+        for map_type, (keywords, data_type) in default_keywords.items()
+    ]
+    return types.SimpleNamespace(
+        keyword_list=keyword_list,
+        color_space_color="sRGB",
+        color_space_utility="Non-Color",
+        normal_convention_mode='FILENAME',
+        collapse_constant_maps=False,
+        analyze_alpha_coverage=False,
+        reclaim_replaced_images='OFF',
+        prune_unused_slots='OFF',
+        transcode_cache=False,
+    )
+
+
+def make_lod_scene(object_count, seed=7):
+    """
+    Inputs of lod.projected_sizes for 'object_count' unit cubes spread
+    in front of a 50 mm camera (1920 px wide): (bounds, matrices, projection).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    cube = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype=np.float64)
+    bounds = np.repeat(cube[None], object_count, axis=0)
+    matrices = np.repeat(np.eye(4)[None], object_count, axis=0)
+    matrices[:, :3, 3] = rng.uniform((-50, -50, -500), (50, 50, -2), size=(object_count, 3))
+    projection = {
+        "world_to_camera": np.eye(4),
+        "scale": 50.0 / 36.0 * 1920,
+        "ortho": False,
+        "clip_start": 0.1,
+        "max_pixels": 1920,
+    }
+    return bounds, matrices, projection
+
+
+def make_tool_props():
+    return types.SimpleNamespace(
+        search_mode='FULL_MATERIAL',
+        interpolation='Cubic',
+        projection='FLAT',
+        projection_blend=0.5,
+        extension='REPEAT',
+        global_config_exp=True,
+    )
+
+
+def make_context(addon_name, prefs, node_tree, material=None):
+    """
+    Fake Shader Editor context: the node tree is both the viewed and the
+    edited tree, so the target resolves to it in 'FULL_MATERIAL' mode.
+    """
+    space = types.SimpleNamespace(
+        type='NODE_EDITOR',
+        tree_type='ShaderNodeTree',
+        edit_tree=node_tree,
+        node_tree=node_tree,
+        path=[],
+    )
+    return types.SimpleNamespace(
+        space_data=space,
+        scene=types.SimpleNamespace(tml_tool_props=make_tool_props()),
+        preferences=types.SimpleNamespace(
+            addons={addon_name: types.SimpleNamespace(preferences=prefs)}
+        ),
+        material=material,
+        active_node=None,
+        selected_nodes=[],
+        selected_objects=[],
+        area=None,
+    )
+
+
+class RecordingLayout:
+    """
+    UILayout stand-in for drawing panels headless: every call is counted
+    and returns another layout.
+    """
+
+    def __init__(self, counter=None):
+        object.__setattr__(self, "_counter", counter if counter is not None else [0])
+        object.__setattr__(self, "enabled", True)
+        object.__setattr__(self, "alignment", 'EXPAND')
+
+    def __getattr__(self, name):
+        counter = self._counter
+
+        def call(*args, **kwargs):
+            counter[0] += 1
+            return RecordingLayout(counter)
+        return call
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+
+    @property
+    def calls(self):
+        return self._counter[0]
@@ -0,0 +1,217 @@
+# File: k_tools_texture_map_loader/builder.py
+
+import bpy
+import os
+from bpy.props import StringProperty, BoolProperty
+from bpy.types import Operator
+from . import utils
+from . import assets
+from . import api
+from . import transaction
+from . import diagnostics
+from .diagnostics import logger
+
+TEMPLATE_MATERIAL_NAME = "K-Tools: Template"
+SCAN_MAX_WORKERS = 8
+
+
+def _scan_directory(dirpath, extensions):
+    """
+    Lists one directory. Returns (image_files, subdirectories).
+    Runs in a worker thread: no bpy access here.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in extensions:
+                    files.append(entry.name)
+    except OSError as e:
+        logger.warning("Builder: could not scan '%s': %s", dirpath, e)
+    return files, subdirs
+
+
+def scan_texture_folder(root, recursive=True):
+    """
+    Scans a folder (and optionally its subfolders) for image files.
+    Directories are listed in parallel threads, level by level.
+    Returns {dirpath: [filenames]}.
+    """
+    from concurrent.futures import ThreadPoolExecutor # Só quando usado
+
+    extensions = {ext.lower() for ext in bpy.path.extensions_image}
+    result = {}
+    pending = [root]
+
+    with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as pool:
+        while pending:
+            listings = pool.map(lambda d: (d, _scan_directory(d, extensions)), pending)
+            pending = []
+            for dirpath, (files, subdirs) in listings:
+                if files:
+                    result[dirpath] = sorted(files)
+                if recursive:
+                    pending.extend(subdirs)
+    return result
+
+
+def get_template_material():
+    """
+    Builds the prewired template material (Mapping > Loader > BSDF >
+    Output). Every new material is a copy of it, which is much cheaper
+    than creating and linking the nodes one by one.
+    """
+    template = bpy.data.materials.get(TEMPLATE_MATERIAL_NAME)
+    if template:
+        return template
+
+    mapping_group = assets.ensure_node_group(assets.MAPPING_GROUP_NAME, link=False)
+    loader_group = assets.ensure_node_group(assets.MAPS_LOADER_GROUP_NAME, link=False)
+    bsdf_group = assets.ensure_node_group(assets.BSDF_GROUP_NAME, link=False)
+    if not (mapping_group and loader_group and bsdf_group):
+        return None
+
+    template = bpy.data.materials.new(TEMPLATE_MATERIAL_NAME)
+    template.use_nodes = True
+    tree = template.node_tree
+    tree.nodes.clear()
+
+    nodes = []
+    for x, group in ((-400, mapping_group), (0, loader_group), (400, bsdf_group)):
+        node = tree.nodes.new('ShaderNodeGroup')
+        node.node_tree = group
+        node.name = group.name
+        node.label = group.name.split(':')[-1].strip()
+        node.location = (x, 0)
+        nodes.append(node)
+    mapping_node, loader_node, bsdf_node = nodes
+
+    output_node = tree.nodes.new('ShaderNodeOutputMaterial')
+    output_node.location = (800, 0)
+
+    api.link_mapping_to_loader(tree.links, mapping_node, loader_node)
+    if bsdf_node.outputs:
+        tree.links.new(bsdf_node.outputs[0], output_node.inputs['Surface'])
+    return template
+
+
+def build_material(template, set_name, dirpath, files_by_type, kw_map, prefs, tool_props):
+    """
+    Creates one material for a texture set from the template: gives it
+    a unique Maps Loader, loads the images and wires Loader > BSDF.
+    Returns (material, loaded_count, error_messages).
+    """
+    mat = template.copy()
+    mat.name = set_name
+    tree = mat.node_tree
+
+    loader_node = next((n for n in tree.nodes if api.get_kt_group_kind(n) == 'LOADER'), None)
+    bsdf_node = next((n for n in tree.nodes if api.get_kt_group_kind(n) == 'BSDF'), None)
+    if not loader_node:
+        return mat, 0, [f"Template has no Maps Loader ({set_name})."]
+
+    loader_group = assets.append_maps_loader_group(mat.name)
+    if not loader_group:
+        return mat, 0, [f"Could not create a Maps Loader for '{set_name}'."]
+    loader_node.node_tree = loader_group
+    loader_node.name = loader_group.name
+
+    filepaths = [os.path.join(dirpath, f) for f in files_by_type.values()]
+    result = api.load_texture_set(loader_group, filepaths, prefs, api.settings_from(tool_props), kw_map)
+
+    if bsdf_node:
+        api.link_loader_to_bsdf(tree.links, loader_node, bsdf_node, prefs.analyze_alpha_coverage)
+    return mat, len(result["loaded"]), result["errors"]
+
+
+class TML_OT_BuildMaterialsFromFolder(Operator):
+    """
+    Scans a folder, groups the files into texture sets and builds one
+    wired material per set.
+    """
+    bl_idname = "tml.build_materials_from_folder"
+    bl_label = "Build Materials from Folder"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(subtype='DIR_PATH') # type: ignore
+    filter_folder: BoolProperty(default=True, options={'HIDDEN'}) # type: ignore
+
+    recursive: BoolProperty(
+        name="Include Subfolders",
+        description="Also scan the subfolders of the chosen folder",
+        default=True,
+    ) # type: ignore
+
+    assign_to_active: BoolProperty(
+        name="Assign First to Active Object",
+        description="Append the first built material to the active object",
+        default=False,
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.build_materials_from_folder")
+    @transaction.batch_method
+    def execute(self, context):
+        root = bpy.path.abspath(self.directory)
+        if not os.path.isdir(root):
+            self.report({'ERROR'}, f"Not a folder: {root}")
+            return {'CANCELLED'}
+
+        prefs = utils.get_addon_preferences(context)
+        if not prefs: self.report({'ERROR'}, "Prefs error."); return {'CANCELLED'}
+        kw_map = utils.get_keyword_map(prefs)
+        tool_props = context.scene.tml_tool_props
+
+        listing = scan_texture_folder(root, recursive=self.recursive)
+        jobs = []
+        for dirpath, filenames in sorted(listing.items()):
+            for set_name, files_by_type in sorted(utils.group_files_into_sets(filenames, kw_map).items()):
+                files_by_type.pop("Unknown", None)
+                if files_by_type:
+                    jobs.append((set_name, dirpath, files_by_type))
+
+        if not jobs:
+            self.report({'WARNING'}, "No texture sets found.")
+            return {'CANCELLED'}
+
+        template = get_template_material()
+        if not template:
+            self.report({'ERROR'}, "Failed to load the K-Tools node groups.")
+            return {'CANCELLED'}
+
+        built = []
+        loaded_total = 0
+        try:
+            for set_name, dirpath, files_by_type in jobs:
+                mat, loaded_count, errors = build_material(template, set_name, dirpath, files_by_type, kw_map, prefs, tool_props)
+                for message in errors: self.report({'WARNING'}, message)
+                built.append(mat)
+                loaded_total += loaded_count
+        finally:
+            bpy.data.materials.remove(template)
+
+        ob = context.active_object
+        if self.assign_to_active and built and ob and hasattr(ob.data, "materials"):
+            ob.data.materials.append(built[0])
+
+        self.report({'INFO'}, f"Built {len(built)} material(s) with {loaded_total} texture(s).")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+classes = (
+    TML_OT_BuildMaterialsFromFolder,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,191 @@
+# File: k_tools_texture_map_loader/colorspace.py
+
+import bpy
+import os
+import zlib
+from bpy.app.handlers import persistent
+from . import diagnostics
+from .diagnostics import logger
+
+# Equivalent colorspace names across OCIO configs (Blender default,
+# ACES 1.x studio configs, ACES 2 / OCIO 2 built-in configs). The first
+# name that exists in the active config is used.
+COLORSPACE_ALIASES = (
+    ("sRGB", "sRGB - Texture", "Utility - sRGB - Texture", "Input - Generic - sRGB - Texture",
+     "srgb_tx", "srgb_texture", "sRGB Encoded Rec.709 (sRGB)"),
+    ("Non-Color", "Raw", "Utility - Raw", "raw", "Data", "Generic Data", "data"),
+    ("Linear Rec.709", "Linear", "Linear Rec.709 (sRGB)", "Utility - Linear - sRGB",
+     "lin_rec709", "lin_srgb", "scene_linear"),
+    ("ACEScg", "ACES - ACEScg", "acescg"),
+    ("Filmic sRGB", "Filmic Log"),
+)
+
+# Fallback group when a preference name has no equivalent at all
+DATA_TYPE_FALLBACK = {
+    'COLOR': COLORSPACE_ALIASES[0],
+    'UTILITY': COLORSPACE_ALIASES[1],
+}
+
+# ID properties written on the images the addon manages
+DATA_TYPE_PROP = "tml_data_type"
+CONFIG_PROP = "tml_ocio"
+TARGET_PROP = "tml_colorspace" # Último colorspace aplicado pelo addon
+
+_names = None # frozenset of valid names of the active config
+_names_lower = {} # lower case -> valid name
+_config_key = ""
+_config_env = None
+_resolved = {} # (name, data_type) -> valid name or None
+_applied_targets = {} # data_type -> last resolved target
+
+
+def _load_config():
+    """Enumerates the colorspaces of the active OCIO config (once)."""
+    global _names, _names_lower, _config_key, _config_env
+    env = os.environ.get("OCIO", "")
+    if _names is not None and env == _config_env:
+        return
+    items = bpy.types.ColorManagedInputColorspaceSettings.bl_rna.properties["name"].enum_items
+    names = [item.identifier for item in items]
+    _names = frozenset(names)
+    _names_lower = {name.lower(): name for name in names}
+    _config_key = format(zlib.crc32("\n".join(names).encode("utf-8")), "08x")
+    _config_env = env
+    _resolved.clear()
+    logger.debug("Colorspace: %d names in the active config (%s)", len(names), _config_key)
+
+
+def get_colorspace_names():
+    _load_config()
+    return _names
+
+
+def get_config_key():
+    """Short hash identifying the active config's colorspace list."""
+    _load_config()
+    return _config_key
+
+
+def search_colorspaces(self, context, edit_text):
+    """StringProperty 'search' callback listing the valid names."""
+    text = edit_text.lower()
+    return sorted(name for name in get_colorspace_names() if text in name.lower())
+
+
+def _first_valid(group):
+    for alias in group:
+        valid = _names_lower.get(alias.lower())
+        if valid:
+            return valid
+    return None
+
+
+def resolve_colorspace(name, data_type='COLOR'):
+    """
+    Returns the colorspace of the active config matching 'name': the
+    name itself, a case-insensitive match, an alias, or the default for
+    the data type. None if nothing fits.
+    """
+    _load_config()
+    key = (name, data_type)
+    if key in _resolved:
+        return _resolved[key]
+
+    result = None
+    if name:
+        result = _names_lower.get(name.lower())
+        if result is None:
+            for group in COLORSPACE_ALIASES:
+                if any(alias.lower() == name.lower() for alias in group):
+                    result = _first_valid(group)
+                    break
+    if result is None:
+        result = _first_valid(DATA_TYPE_FALLBACK.get(data_type, ()))
+        if result:
+            logger.warning("Color space '%s' not in the active config, using '%s'.", name, result)
+        else:
+            logger.warning("Color space '%s' not in the active config.", name)
+    _resolved[key] = result
+    return result
+
+
+def get_target_colorspace(prefs, data_type):
+    name = prefs.color_space_color if data_type == 'COLOR' else prefs.color_space_utility
+    target = resolve_colorspace(name, data_type)
+    _applied_targets[data_type] = target
+    return target
+
+
+def apply_colorspace(image, data_type, prefs):
+    """
+    Sets an image's colorspace from the preferences and marks the image
+    as managed (data type + config), for the batch re-apply passes.
+    Returns True if the colorspace changed.
+    """
+    if image.library:
+        return False
+    target = get_target_colorspace(prefs, data_type)
+    image[DATA_TYPE_PROP] = data_type
+    image[CONFIG_PROP] = _config_key
+    if target:
+        image[TARGET_PROP] = target
+    if not target or image.colorspace_settings.name == target:
+        return False
+    image.colorspace_settings.name = target
+    return True
+
+
+@diagnostics.profiled("colorspace.reapply")
+def reapply_colorspaces(prefs, previous=None):
+    """
+    Re-applies the colorspace of every managed image in one pass.
+    previous=None: only images tagged with another config are updated
+    (file made under a different OCIO config). Otherwise only images
+    still set to the colorspace last applied to them are updated, so
+    manual overrides are kept; 'previous' ({data_type: old target}) is
+    the fallback for images tagged without it. Returns the count.
+    """
+    config_key = get_config_key()
+    targets = {dt: get_target_colorspace(prefs, dt) for dt in DATA_TYPE_FALLBACK}
+    count = 0
+    for image in bpy.data.images:
+        data_type = image.get(DATA_TYPE_PROP)
+        if data_type not in targets or image.library:
+            continue
+        if previous is None:
+            if image.get(CONFIG_PROP) == config_key:
+                continue
+        elif image.colorspace_settings.name != image.get(TARGET_PROP, previous.get(data_type)):
+            continue
+        if apply_colorspace(image, data_type, prefs):
+            count += 1
+    if count:
+        logger.info("Colorspace: re-applied %d image(s).", count)
+    return count
+
+
+def on_preferences_changed(prefs):
+    """
+    Update callback of the colorspace preferences: walks every image
+    tagged with DATA_TYPE_PROP, even if nothing was applied this session.
+    """
+    reapply_colorspaces(prefs, dict(_applied_targets))
+
+
+@persistent
+def _on_load_post(*args):
+    addon = bpy.context.preferences.addons.get(__package__)
+    if addon:
+        reapply_colorspaces(addon.preferences)
+
+
+def register():
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    _resolved.clear()
+    _applied_targets.clear()
@@ -0,0 +1,258 @@
+# File: k_tools_texture_map_loader/diagnostics.py
+
+import bpy
+import functools
+import logging
+import os
+import sys
+import time
+from bpy.props import StringProperty
+from bpy.types import Operator
+from bpy_extras.io_utils import ExportHelper
+
+# --- Leveled Logger ---
+logger = logging.getLogger(__package__)
+logger.propagate = False
+
+LOG_LEVEL_ITEMS = [
+    ('DEBUG', "Debug", "Log everything, including per-node details (slow)"),
+    ('INFO', "Info", "Log summaries of every operation"),
+    ('WARNING', "Warning", "Log warnings and errors only"),
+    ('ERROR', "Error", "Log errors only"),
+]
+DEFAULT_LOG_LEVEL = 'WARNING'
+
+
+def setup_logging(level=DEFAULT_LOG_LEVEL):
+    """
+    Installs the console handler (once) and sets the log level.
+    """
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("TML %(levelname)s: %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+
+
+# --- Timing / Counters ---
+# name -> [calls, total_seconds, max_seconds]
+_timings = {}
+# name -> value
+_counters = {}
+_enabled = False
+
+
+def set_enabled(flag):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    return _enabled
+
+
+def add_timing(name, seconds):
+    entry = _timings.get(name)
+    if entry is None:
+        _timings[name] = [1, seconds, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+
+def count(name, amount=1):
+    """Increments a counter. No-op while profiling is disabled."""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class timed:
+    """
+    Context manager that records the duration of a block.
+    Costs a single flag check while profiling is disabled.
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.start is not None:
+            add_timing(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def profiled(name):
+    """
+    Decorator that records the duration of every call under 'name'.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_timing(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def profiled_method(name):
+    """
+    Same as 'profiled' for Blender callbacks (Operator.execute,
+    Panel.draw). Blender checks the argument count of these methods when
+    registering, so the wrapper keeps the exact (self, context) signature.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, context):
+            if not _enabled:
+                return func(self, context)
+            start = time.perf_counter()
+            try:
+                return func(self, context)
+            finally:
+                add_timing(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def get_process_memory():
+    """
+    Current resident memory of the Blender process in bytes (undo
+    memfile steps live there too), or None where it cannot be read.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes # Só quando usado
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (field, ctypes.c_size_t) for field in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                    "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def reset():
+    _timings.clear()
+    _counters.clear()
+
+
+def snapshot():
+    """
+    Returns the collected stats as a JSON-friendly dict. Timings are
+    sorted by total time, slowest first.
+    """
+    timings = [
+        {
+            "name": name,
+            "calls": calls,
+            "total_ms": total * 1000.0,
+            "mean_ms": (total / calls) * 1000.0 if calls else 0.0,
+            "max_ms": worst * 1000.0,
+        }
+        for name, (calls, total, worst) in _timings.items()
+    ]
+    timings.sort(key=lambda t: t["total_ms"], reverse=True)
+    return {"timings": timings, "counters": dict(sorted(_counters.items()))}
+
+
+def export_json(filepath):
+    import json # Só quando exporta
+
+    data = snapshot()
+    data["blender_version"] = bpy.app.version_string
+    data["blend_file"] = bpy.data.filepath
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def draw_stats(layout, limit=10):
+    """Draws the slowest entries into a UI layout."""
+    data = snapshot()
+    if not data["timings"] and not data["counters"]:
+        layout.label(text="No samples yet.")
+        return
+
+    col = layout.column(align=True)
+    for entry in data["timings"][:limit]:
+        row = col.row()
+        row.label(text=entry["name"])
+        row.label(text=f"{entry['calls']}x")
+        row.label(text=f"{entry['total_ms']:.1f} ms")
+        row.label(text=f"max {entry['max_ms']:.1f} ms")
+    for name, value in list(data["counters"].items())[:limit]:
+        row = col.row()
+        row.label(text=name)
+        row.label(text=str(value))
+
+
+class TML_OT_ExportProfile(Operator, ExportHelper):
+    """Export the collected timings and counters as JSON."""
+    bl_idname = "tml.export_profile"
+    bl_label = "Export Profile"
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'}) # type: ignore
+
+    @profiled_method("op.export_profile")
+    def execute(self, context):
+        try:
+            export_json(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write profile: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Profile written to {self.filepath}")
+        return {'FINISHED'}
+
+
+class TML_OT_ResetProfile(Operator):
+    """Clear the collected timings and counters."""
+    bl_idname = "tml.reset_profile"
+    bl_label = "Reset Profile"
+
+    @profiled_method("op.reset_profile")
+    def execute(self, context):
+        reset()
+        return {'FINISHED'}
+
+
+classes = (
+    TML_OT_ExportProfile,
+    TML_OT_ResetProfile,
+)
+
+def register():
+    setup_logging()
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
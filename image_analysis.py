@@ -0,0 +1,720 @@
+# File: k_tools_texture_map_loader/image_analysis.py
+
+import bpy
+import hashlib
+import os
+import struct
+from . import utils
+from . import diagnostics
+from .diagnostics import logger
+
+# ID property naming how a cached copy (tml_source_path) was derived
+DERIVED_PROP = "tml_derived"
+
+# NumPy ships with Blender; it is imported on first use so enabling the
+# addon does not pay for it.
+
+# Pixel statistics are computed on at most this many sampled pixels
+MAX_SAMPLED_PIXELS = 512 * 512
+
+NORMAL_DX_TOKENS = {"dx", "directx", "normaldx", "nrmdx", "nordx"}
+NORMAL_GL_TOKENS = {"gl", "opengl", "normalgl", "normlgl", "nrmgl", "norgl"}
+
+# Below this |correlation| the pixel heuristic gives no answer
+NORMAL_CORRELATION_THRESHOLD = 0.05
+
+# (path, mtime_ns, size) -> 'DIRECTX' / 'OPENGL' / None
+_convention_cache = {}
+
+
+def get_file_signature(image):
+    """
+    Returns (absolute_path, mtime_ns, size) of an image's source file,
+    or None for generated, packed or missing images.
+    """
+    if not image or image.source not in {'FILE', 'SEQUENCE', 'TILED'} or image.packed_file:
+        return None
+    path = os.path.normpath(bpy.path.abspath(image.filepath, library=image.library))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def read_pixels(image, max_samples=MAX_SAMPLED_PIXELS):
+    """
+    Reads an image into a (height, width, channels) float32 array and
+    returns a strided view holding at most ~max_samples pixels.
+    Returns None if the image has no pixel data.
+    """
+    import numpy as np
+
+    width, height = image.size
+    channels = image.channels
+    if not width or not height or not channels:
+        return None
+
+    buf = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(buf)
+    pixels = buf.reshape(height, width, channels)
+    diagnostics.count("analysis.pixels_read", width * height)
+
+    if max_samples:
+        stride = max(1, int((width * height / max_samples) ** 0.5))
+        pixels = pixels[::stride, ::stride]
+    return pixels
+
+
+# --- File headers ---
+
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+# Color type -> channels when a tRNS chunk adds transparency
+PNG_TRNS_CHANNELS = {0: 2, 2: 4, 3: 4}
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _read_png_header(f):
+    """
+    IHDR, plus the chunks up to the first IDAT: a tRNS chunk makes a
+    gray, RGB or palette PNG transparent (cutouts, foliage).
+    """
+    head = f.read(29)
+    if len(head) < 29 or head[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    width, height, bits, color_type = struct.unpack(">IIBB", head[16:26])
+    channels = PNG_CHANNELS.get(color_type, 4)
+    if color_type in PNG_TRNS_CHANNELS:
+        f.seek(4, os.SEEK_CUR) # CRC do IHDR
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            length, kind = struct.unpack(">I4s", chunk)
+            if kind == b"tRNS":
+                channels = PNG_TRNS_CHANNELS[color_type]
+                break
+            if kind in {b"IDAT", b"IEND"}:
+                break
+            f.seek(length + 4, os.SEEK_CUR)
+    return width, height, channels, bits
+
+
+def _read_jpeg_header(f):
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        length = struct.unpack(">H", f.read(2))[0]
+        if marker[1] in JPEG_SOF_MARKERS:
+            bits, height, width, channels = struct.unpack(">BHHB", f.read(6))
+            return width, height, channels, bits
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+EXR_HEADER_BYTES = 65536
+# chlist pixel types: UINT, HALF, FLOAT
+EXR_PIXEL_BITS = {0: 32, 1: 16, 2: 32}
+
+
+def _iter_exr_attributes(head):
+    """(name, type, value bytes) of the attributes of an OpenEXR header."""
+    if head[:4] != EXR_MAGIC:
+        return
+    pos = 8
+    try:
+        while pos < len(head) and head[pos] != 0:
+            name_end = head.index(b"\0", pos)
+            type_end = head.index(b"\0", name_end + 1)
+            size = struct.unpack_from("<i", head, type_end + 1)[0]
+            value = type_end + 5
+            yield head[pos:name_end], head[name_end + 1:type_end], head[value:value + size]
+            pos = value + size
+    except (ValueError, struct.error):
+        return
+
+
+def _read_exr_header(f):
+    """Size from dataWindow; channels and bits from the chlist."""
+    window = None
+    channels = []
+    for name, _, value in _iter_exr_attributes(f.read(EXR_HEADER_BYTES)):
+        if name == b"dataWindow" and len(value) >= 16:
+            window = struct.unpack_from("<iiii", value)
+        elif name == b"channels":
+            pos = 0
+            while pos < len(value) and value[pos] != 0:
+                name_end = value.index(b"\0", pos)
+                channels.append(struct.unpack_from("<i", value, name_end + 1)[0])
+                pos = name_end + 17 # pixel type, pLinear + reservados, x/y sampling
+    if not window or not channels:
+        return None
+    xmin, ymin, xmax, ymax = window
+    bits = max(EXR_PIXEL_BITS.get(t, 32) for t in channels)
+    return xmax - xmin + 1, ymax - ymin + 1, len(channels), bits
+
+
+TIFF_WIDTH, TIFF_HEIGHT, TIFF_BITS, TIFF_SAMPLES = 256, 257, 258, 277
+TIFF_TYPE_SIZES = {3: ("H", 2), 4: ("I", 4)} # SHORT, LONG
+
+
+def _read_tiff_header(f):
+    """Width, height, samples and bits per sample from the first IFD (classic TIFF)."""
+    head = f.read(8)
+    if len(head) < 8 or head[:2] not in {b"II", b"MM"}:
+        return None
+    order = "<" if head[:2] == b"II" else ">"
+    magic, offset = struct.unpack(order + "HI", head[2:8])
+    if magic != 42:
+        return None # BigTIFF (43) não suportado
+    f.seek(offset)
+    count = struct.unpack(order + "H", f.read(2))[0]
+    entries = f.read(12 * count)
+    tags = {TIFF_SAMPLES: 1, TIFF_BITS: 1}
+    for i in range(count):
+        tag, kind, values, field = struct.unpack_from(order + "HHI4s", entries, 12 * i)
+        if tag not in {TIFF_WIDTH, TIFF_HEIGHT, TIFF_BITS, TIFF_SAMPLES} or kind not in TIFF_TYPE_SIZES:
+            continue
+        code, size = TIFF_TYPE_SIZES[kind]
+        if values * size > 4: # Valores fora da entrada: ler só o primeiro
+            f.seek(struct.unpack(order + "I", field)[0])
+            field = f.read(size)
+        tags[tag] = struct.unpack_from(order + code, field)[0]
+    if TIFF_WIDTH not in tags or TIFF_HEIGHT not in tags:
+        return None
+    return tags[TIFF_WIDTH], tags[TIFF_HEIGHT], tags[TIFF_SAMPLES], tags[TIFF_BITS]
+
+
+HEADER_READERS = {
+    ".png": _read_png_header,
+    ".jpg": _read_jpeg_header,
+    ".jpeg": _read_jpeg_header,
+    ".exr": _read_exr_header,
+    ".tif": _read_tiff_header,
+    ".tiff": _read_tiff_header,
+}
+
+
+def read_image_header(path):
+    """
+    (width, height, channels, bits per channel) read from the file header
+    without decoding, for PNG, JPEG, OpenEXR and TIFF. None for other
+    formats.
+    """
+    reader = HEADER_READERS.get(os.path.splitext(path)[1].lower())
+    if not reader:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return reader(f)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+EXR_COMPRESSIONS = ("NONE", "RLE", "ZIPS", "ZIP", "PIZ", "PXR24", "B44", "B44A", "DWAA", "DWAB")
+
+
+def read_exr_compression(path):
+    """
+    Compression of an OpenEXR file ('PIZ', 'ZIP'...), read from the
+    header attributes without decoding. None if unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(EXR_HEADER_BYTES)
+    except OSError:
+        return None
+    for name, _, value in _iter_exr_attributes(head):
+        if name == b"compression" and value:
+            code = value[0]
+            return EXR_COMPRESSIONS[code] if code < len(EXR_COMPRESSIONS) else None
+    return None
+
+
+def detect_normal_convention_from_name(filename):
+    """
+    Returns 'DIRECTX', 'OPENGL' or None from filename tokens.
+    """
+    name_only = os.path.splitext(os.path.basename(filename))[0]
+    for part in utils.NAME_SPLIT_RE.split(name_only.lower()):
+        if part in NORMAL_DX_TOKENS:
+            return 'DIRECTX'
+        if part in NORMAL_GL_TOKENS:
+            return 'OPENGL'
+    return None
+
+
+def estimate_normal_convention(image):
+    """
+    Guesses the Y convention of a tangent-space normal map from its
+    pixels. A normal map baked from a height field is integrable: with
+    Blender's bottom-up rows, dR/dy and dG/dx have the same sign for
+    OpenGL maps and opposite signs for DirectX maps.
+    Returns 'DIRECTX', 'OPENGL' or None when inconclusive.
+    """
+    import numpy as np
+
+    pixels = read_pixels(image)
+    if pixels is None or pixels.shape[0] < 3 or pixels.shape[1] < 3 or pixels.shape[2] < 2:
+        return None
+
+    red = pixels[..., 0]
+    green = pixels[..., 1]
+    dr_dy = np.diff(red, axis=0)[:, :-1]
+    dg_dx = np.diff(green, axis=1)[:-1, :]
+
+    denom = np.sqrt(np.mean(dr_dy * dr_dy) * np.mean(dg_dx * dg_dx))
+    if denom < 1e-12:
+        return None # Mapa plano
+    correlation = float(np.mean(dr_dy * dg_dx) / denom)
+
+    if correlation > NORMAL_CORRELATION_THRESHOLD:
+        return 'OPENGL'
+    if correlation < -NORMAL_CORRELATION_THRESHOLD:
+        return 'DIRECTX'
+    return None
+
+
+@diagnostics.profiled("analysis.normal_convention")
+def get_normal_convention(image, use_pixels=False):
+    """
+    Returns 'DIRECTX', 'OPENGL' or None for a normal map image, from its
+    filename and optionally from its pixels. Results are cached per
+    source path + mtime.
+    """
+    convention = detect_normal_convention_from_name(image.filepath or image.name)
+    if convention or not use_pixels:
+        return convention
+
+    signature = get_file_signature(image)
+    if signature and signature in _convention_cache:
+        return _convention_cache[signature]
+
+    convention = estimate_normal_convention(image)
+    if signature:
+        _convention_cache[signature] = convention
+    return convention
+
+
+def _cache_key(signature):
+    return hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:16]
+
+
+@diagnostics.profiled("analysis.flip_green")
+def get_opengl_copy(image):
+    """
+    Returns an OpenGL version of a DirectX normal map: the green channel
+    is flipped in NumPy and the result is saved once in the cache
+    folder, keyed by source path + mtime. Later calls reuse the cached
+    file (and the loaded image, if any).
+    Returns None for images without a source file.
+    """
+    import numpy as np
+
+    signature = get_file_signature(image)
+    if not signature:
+        logger.warning("Cannot convert '%s': no source file.", image.name)
+        return None
+
+    stem = os.path.splitext(os.path.basename(signature[0]))[0]
+    ext = ".exr" if image.is_float else ".png"
+    cached_path = os.path.join(utils.get_cache_dir("normal_gl"), f"{stem}_{_cache_key(signature)}_GL{ext}")
+
+    if not os.path.exists(cached_path):
+        pixels = read_pixels(image, max_samples=0)
+        if pixels is None:
+            return None
+        height, width, channels = pixels.shape
+        pixels[..., 1] = 1.0 - pixels[..., 1]
+
+        baked = bpy.data.images.new(f"{stem}_GL", width, height,
+                                    alpha=channels == 4, float_buffer=image.is_float)
+        try:
+            if channels != 4:
+                # Imagens novas são sempre RGBA
+                rgba = np.ones((height, width, 4), dtype=np.float32)
+                rgba[..., :channels] = pixels
+                pixels = rgba
+            baked.pixels.foreach_set(pixels.ravel())
+            baked.filepath_raw = cached_path
+            baked.file_format = 'OPEN_EXR' if image.is_float else 'PNG'
+            baked.save()
+        finally:
+            bpy.data.images.remove(baked)
+        logger.info("Baked OpenGL normal map '%s'", cached_path)
+
+    gl_image = bpy.data.images.load(cached_path, check_existing=True)
+    gl_image.colorspace_settings.name = image.colorspace_settings.name
+    gl_image["tml_source_path"] = signature[0]
+    gl_image[DERIVED_PROP] = 'NORMAL_GL'
+    return gl_image
+
+
+def convert_directx_normal(node, use_pixels=False):
+    """
+    Replaces the image of a normal-map node by its OpenGL copy when it is
+    detected as DirectX. Returns True if the node was changed.
+    """
+    image = node.image
+    if not image or "tml_source_path" in image:
+        return False # Sem imagem ou já convertida
+    if get_normal_convention(image, use_pixels=use_pixels) != 'DIRECTX':
+        return False
+    gl_image = get_opengl_copy(image)
+    if not gl_image:
+        return False
+    node.image = gl_image
+    return True
+
+
+# --- Constant maps ---
+
+# Name suffix of the value node that replaces a constant image
+CONSTANT_NODE_SUFFIX = " Constant"
+CONSTANT_ALPHA_SUFFIX = CONSTANT_NODE_SUFFIX + " Alpha"
+
+# Default max (max - min) per channel for a map to count as constant
+CONSTANT_TOLERANCE = 2.0 / 255.0
+
+# (path, mtime_ns, size) -> (mins, maxs)
+_range_cache = {}
+
+
+@diagnostics.profiled("analysis.channel_range")
+def get_channel_range(image):
+    """
+    Returns (mins, maxs): per-channel minimum and maximum of an image,
+    computed over every pixel with NumPy. Cached per source path + mtime.
+    Returns None if the image has no pixel data.
+    """
+    signature = get_file_signature(image)
+    if signature and signature in _range_cache:
+        return _range_cache[signature]
+
+    pixels = read_pixels(image, max_samples=0)
+    if pixels is None:
+        return None
+    flat = pixels.reshape(-1, pixels.shape[-1])
+    result = (tuple(flat.min(axis=0).tolist()), tuple(flat.max(axis=0).tolist()))
+
+    if signature:
+        _range_cache[signature] = result
+    return result
+
+
+def _srgb_to_linear(value):
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def get_constant_value(image, tolerance=CONSTANT_TOLERANCE):
+    """
+    Returns the (r, g, b, a) value of an image that is flat within
+    'tolerance' on every channel, in scene-linear space, or None.
+    """
+    channel_range = get_channel_range(image)
+    if not channel_range:
+        return None
+    mins, maxs = channel_range
+    if any(hi - lo > tolerance for lo, hi in zip(mins, maxs)):
+        return None
+
+    mean = [(lo + hi) * 0.5 for lo, hi in zip(mins, maxs)]
+    if len(mean) < 3:
+        mean = [mean[0]] * 3 + mean[1:] # Grayscale (+ alpha)
+    rgb = mean[:3]
+    alpha = mean[3] if len(mean) > 3 else 1.0
+
+    # Byte images come back in their own colorspace; value nodes are linear
+    if not image.is_float and not image.colorspace_settings.is_data:
+        rgb = [_srgb_to_linear(c) for c in rgb]
+    return (rgb[0], rgb[1], rgb[2], alpha)
+
+
+def replace_with_constant(node, value):
+    """
+    Disconnects an Image Texture node and feeds its outgoing links from a
+    value node instead (RGB for 'Color', Value for 'Alpha'). The image is
+    unassigned; its source path is kept in the node's tml_props.
+    Returns the image that was removed from the node, or None if the node
+    feeds nothing (left untouched: there is no value node to restore from).
+    """
+    tree = node.id_data
+    links = tree.links
+    image = node.image
+
+    color_links = [l for l in node.outputs['Color'].links]
+    alpha_links = [l for l in node.outputs['Alpha'].links]
+    if not color_links and not alpha_links:
+        return None
+
+    if color_links:
+        rgb_node = tree.nodes.new('ShaderNodeRGB')
+        rgb_node.name = node.name + CONSTANT_NODE_SUFFIX
+        rgb_node.label = rgb_node.name
+        rgb_node.location = (node.location.x, node.location.y - 40)
+        rgb_node.outputs[0].default_value = value
+        for link in color_links:
+            links.new(rgb_node.outputs[0], link.to_socket)
+
+    if alpha_links:
+        value_node = tree.nodes.new('ShaderNodeValue')
+        value_node.name = node.name + CONSTANT_ALPHA_SUFFIX
+        value_node.label = value_node.name
+        value_node.location = (node.location.x, node.location.y - 240)
+        value_node.outputs[0].default_value = value[3]
+        for link in alpha_links:
+            links.new(value_node.outputs[0], link.to_socket)
+
+    # links.new() already replaced the old links (one link per input)
+    node.tml_props.constant_image_path = image.filepath if image else ""
+    node.image = None
+    return image
+
+
+def has_constant_replacement(tree, node_name):
+    nodes = tree.nodes
+    return (nodes.get(node_name + CONSTANT_NODE_SUFFIX) is not None
+            or nodes.get(node_name + CONSTANT_ALPHA_SUFFIX) is not None)
+
+
+def restore_constant_node(node, reload_image=True):
+    """
+    Undoes replace_with_constant: the links fed by the value nodes go back
+    to the Image Texture outputs and the value nodes are removed. With
+    'reload_image', a node left without an image gets the original one
+    back (tml_props.constant_image_path). Returns True if restored.
+    """
+    tree = node.id_data
+    restored = False
+    for suffix, output in ((CONSTANT_NODE_SUFFIX, 'Color'), (CONSTANT_ALPHA_SUFFIX, 'Alpha')):
+        value_node = tree.nodes.get(node.name + suffix)
+        if value_node is None:
+            continue
+        for link in list(value_node.outputs[0].links):
+            tree.links.new(node.outputs[output], link.to_socket)
+        tree.nodes.remove(value_node)
+        restored = True
+    if not restored:
+        return False
+
+    path = node.tml_props.constant_image_path
+    node.tml_props.constant_image_path = ""
+    if reload_image and not node.image and path:
+        try:
+            node.image = bpy.data.images.load(path, check_existing=True)
+        except RuntimeError as e:
+            logger.warning("Could not reload '%s' into '%s': %s", path, node.name, e)
+    return True
+
+
+def collapse_constant_node(node, tolerance=CONSTANT_TOLERANCE):
+    """
+    Replaces a node's image by a value node if the image is constant.
+    Returns the number of bytes reclaimed (0 if nothing changed or the
+    image is still used elsewhere).
+    """
+    image = node.image
+    if not image or has_constant_replacement(node.id_data, node.name):
+        return 0
+    if not (node.outputs['Color'].is_linked or node.outputs['Alpha'].is_linked):
+        return 0 # Nada a substituir: nem lê os pixels
+    value = get_constant_value(image, tolerance)
+    if value is None:
+        return 0
+
+    replace_with_constant(node, value)
+    logger.info("Replaced constant image '%s' in '%s' with %s", image.name, node.name, value)
+    if image.users == 0:
+        reclaimed = utils.get_image_memory_bytes(image)
+        image.buffers_free()
+        return reclaimed
+    return 0
+
+
+# --- Alpha coverage ---
+
+# Below 1 - epsilon a pixel is not fully opaque (half an 8-bit step)
+ALPHA_OPAQUE_EPSILON = 0.5 / 255.0
+
+
+def is_alpha_channel_opaque(image):
+    """
+    True if the image has no alpha channel or its alpha is 1 everywhere.
+    The channel count comes from the file header when possible (a PNG
+    tRNS chunk counts as alpha), so RGB files are never decoded; otherwise
+    uses the cached per-channel range (path + mtime), which reads every
+    pixel.
+    """
+    signature = get_file_signature(image)
+    header = read_image_header(signature[0]) if signature else None
+    has_alpha = header[2] in {2, 4} if header else image.channels == 4
+    if not has_alpha:
+        return True
+    channel_range = get_channel_range(image)
+    if not channel_range:
+        return False
+    return channel_range[0][3] >= 1.0 - ALPHA_OPAQUE_EPSILON
+
+
+def is_opacity_map_full(image):
+    """
+    True if an Alpha/Opacity map is white (fully opaque) everywhere,
+    i.e. wiring it would never make anything transparent.
+    """
+    channel_range = get_channel_range(image)
+    if not channel_range:
+        return False
+    return min(channel_range[0]) >= 1.0 - ALPHA_OPAQUE_EPSILON
+
+
+def apply_alpha_coverage(image, map_type):
+    """
+    Load-time coverage scan: color maps whose alpha is fully opaque get
+    alpha_mode 'NONE'; opacity maps are analysed so the result is cached
+    for the Loader > BSDF wiring. Returns True if the image is opaque.
+    """
+    if map_type == "Alpha":
+        return is_opacity_map_full(image)
+    if is_alpha_channel_opaque(image):
+        if image.alpha_mode != 'NONE':
+            image.alpha_mode = 'NONE'
+        return True
+    return False
+
+
+# --- Bit depth ---
+
+# Formats always decoded to float buffers / never decoded to float
+FLOAT_EXTENSIONS = {".exr", ".hdr"}
+BYTE_EXTENSIONS = {".jpg", ".jpeg", ".bmp", ".tga", ".webp"}
+
+
+def is_float_source(image, signature):
+    """
+    True if the image file decodes to a float buffer. Answered from the
+    extension or the PNG header when possible; other formats (TIFF) are
+    decoded to find out.
+    """
+    path = signature[0]
+    ext = os.path.splitext(path)[1].lower()
+    if ext in FLOAT_EXTENSIONS:
+        return True
+    if ext in BYTE_EXTENSIONS:
+        return False
+    header = read_image_header(path)
+    if header:
+        return header[3] > 8
+    return image.is_float
+
+
+@diagnostics.profiled("analysis.to_8bit")
+def get_8bit_copy(image):
+    """
+    Returns an 8-bit PNG copy of a float data map (roughness, AO...),
+    saved once in the cache folder keyed by source path + mtime, like
+    get_opengl_copy. Returns None for images without a source file.
+    """
+    import numpy as np
+
+    signature = get_file_signature(image)
+    if not signature:
+        return None
+
+    stem = os.path.splitext(os.path.basename(signature[0]))[0]
+    cached_path = os.path.join(utils.get_cache_dir("8bit"), f"{stem}_{_cache_key(signature)}_8bit.png")
+
+    if not os.path.exists(cached_path):
+        pixels = read_pixels(image, max_samples=0)
+        if pixels is None:
+            return None
+        height, width, channels = pixels.shape
+        rgba = np.ones((height, width, 4), dtype=np.float32)
+        if channels < 3:
+            rgba[..., :3] = pixels[..., :1] # Grayscale
+            if channels == 2: rgba[..., 3] = pixels[..., 1]
+        else:
+            rgba[..., :channels] = pixels
+        np.clip(rgba, 0.0, 1.0, out=rgba)
+
+        baked = bpy.data.images.new(f"{stem}_8bit", width, height, alpha=channels in {2, 4}, float_buffer=False)
+        try:
+            baked.colorspace_settings.is_data = True # Valores gravados sem transformação
+            baked.pixels.foreach_set(rgba.ravel())
+            baked.filepath_raw = cached_path
+            baked.file_format = 'PNG'
+            baked.save()
+        finally:
+            bpy.data.images.remove(baked)
+        logger.info("Baked 8-bit copy '%s'", cached_path)
+
+    byte_image = bpy.data.images.load(cached_path, check_existing=True)
+    byte_image.colorspace_settings.name = image.colorspace_settings.name
+    byte_image["tml_source_path"] = signature[0]
+    byte_image[DERIVED_PROP] = 'BYTE'
+    return byte_image
+
+
+def regenerate_derived(image):
+    """
+    Rebuilds a cached copy (OpenGL normal or 8-bit copy) after its source
+    file changed: the source is reloaded, converted again (the cache key
+    includes the mtime) and every user of the old copy is remapped to the
+    new one. Returns the new image, or None if nothing was rebuilt.
+    """
+    source_path = image.get("tml_source_path")
+    if not source_path:
+        return None
+    kind = image.get(DERIVED_PROP) or ('BYTE' if image.filepath.endswith("_8bit.png") else 'NORMAL_GL')
+    try:
+        source = bpy.data.images.load(source_path, check_existing=True)
+    except RuntimeError as e:
+        logger.warning("Cannot rebuild '%s': %s", image.name, e)
+        return None
+    source.reload()
+    source.colorspace_settings.name = image.colorspace_settings.name
+    new_image = get_8bit_copy(source) if kind == 'BYTE' else get_opengl_copy(source)
+    if source.users == 0:
+        bpy.data.images.remove(source) # Carregada só para converter
+    if not new_image or new_image == image:
+        return None
+    image.user_remap(new_image)
+    if image.users == 0:
+        bpy.data.images.remove(image)
+    return new_image
+
+
+def apply_precision_policy(node, precision):
+    """
+    Applies a bit-depth policy to a node's image at load time:
+    'HALF' stores float buffers at 16-bit half precision, 'BYTE'
+    replaces float data maps by a cached 8-bit copy, 'KEEP' does
+    nothing. Returns True if the node's image was replaced.
+    """
+    image = node.image
+    if not image or precision == 'KEEP' or image.source != 'FILE':
+        return False
+    if precision == 'HALF':
+        if not image.use_half_precision and not image.library:
+            image.use_half_precision = True
+        return False
+
+    if "tml_source_path" in image:
+        return False # Já é uma cópia convertida
+    if not image.colorspace_settings.is_data:
+        # Color maps would need a view transform to fit in 8 bits
+        logger.debug("8-bit policy skipped for color image '%s'", image.name)
+        return False
+    signature = get_file_signature(image)
+    if not signature or not is_float_source(image, signature):
+        return False
+    byte_image = get_8bit_copy(image)
+    if not byte_image:
+        return False
+    node.image = byte_image
+    diagnostics.count("analysis.to_8bit")
+    return True
@@ -0,0 +1,325 @@
+# File: k_tools_texture_map_loader/lod.py
+
+import bpy
+import os
+import re
+from bpy.app.handlers import persistent
+from . import utils
+from . import pruning
+from . import diagnostics
+from .diagnostics import logger
+
+# Resolution token of a filename: 'Wood_Color_2k.png', 'Wood_4K_Normal.exr'
+TIER_RE = re.compile(r"(?<![0-9a-z])(\d{1,2})k(?![0-9a-z])", re.IGNORECASE)
+
+# dirpath -> (mtime_ns, {name pattern: {pixels: filename}})
+_dir_index = {}
+# (tree name, node name, original image name) of the nodes swapped for this frame
+_swapped = []
+# Tier images apply_lod loaded itself: removed when the render ends
+_loaded = set()
+# Scenes whose Lock Interface was turned on for LOD
+_locked_scenes = set()
+
+
+def _tier_pattern(filename):
+    """(name with the tier token replaced by '{}', pixels) or None."""
+    matches = list(TIER_RE.finditer(filename))
+    if not matches:
+        return None
+    match = matches[-1] # O token mais à direita
+    pattern = (filename[:match.start()] + "{}" + filename[match.end():]).lower()
+    return pattern, int(match.group(1)) * 1024
+
+
+def _get_dir_index(dirpath):
+    try:
+        mtime = os.stat(dirpath).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _dir_index.get(dirpath)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    index = {}
+    try:
+        filenames = os.listdir(dirpath)
+    except OSError:
+        filenames = []
+    for filename in filenames:
+        tier = _tier_pattern(filename)
+        if tier:
+            index.setdefault(tier[0], {})[tier[1]] = filename
+    _dir_index[dirpath] = (mtime, index)
+    return index
+
+
+def find_tiers(path):
+    """
+    Resolution tiers of a texture found next to it: {pixels: path}, e.g.
+    {1024: '.../Wood_1k.png', 2048: '.../Wood_2k.png'}. Empty if the
+    filename has no tier token.
+    """
+    dirpath, filename = os.path.split(path)
+    tier = _tier_pattern(filename)
+    if not tier:
+        return {}
+    files = _get_dir_index(dirpath).get(tier[0], {})
+    return {pixels: os.path.join(dirpath, name) for pixels, name in files.items()}
+
+
+def choose_tier(tiers, needed):
+    """Smallest tier covering 'needed' pixels (the largest if none does)."""
+    if not tiers:
+        return None
+    covering = [pixels for pixels in tiers if pixels >= needed]
+    return min(covering) if covering else max(tiers)
+
+
+def get_camera_projection(scene, camera):
+    """
+    What projected_sizes needs from the camera: the world -> camera
+    matrix, pixels per unit (at depth 1 for perspective cameras), the
+    near clip and the render size in pixels.
+    """
+    import numpy as np
+
+    render = scene.render
+    factor = render.resolution_percentage / 100.0
+    res_x = render.resolution_x * factor * render.pixel_aspect_x
+    res_y = render.resolution_y * factor * render.pixel_aspect_y
+    cam = camera.data
+    if cam.sensor_fit == 'VERTICAL' or (cam.sensor_fit == 'AUTO' and res_y > res_x):
+        fit_pixels, sensor = res_y, (cam.sensor_height if cam.sensor_fit == 'VERTICAL' else cam.sensor_width)
+    else:
+        fit_pixels, sensor = res_x, cam.sensor_width
+    ortho = cam.type == 'ORTHO'
+    scale = fit_pixels / cam.ortho_scale if ortho else cam.lens / sensor * fit_pixels
+    return {
+        "world_to_camera": np.array(camera.matrix_world.inverted(), dtype=np.float64),
+        "scale": scale,
+        "ortho": ortho,
+        "clip_start": cam.clip_start,
+        "max_pixels": max(res_x, res_y),
+    }
+
+
+def projected_sizes(bounds, matrices, projection):
+    """
+    Projected size in pixels (largest side of the screen-space bounding
+    rectangle) of N objects at once. 'bounds' is (N, 8, 3) local
+    bound_box corners, 'matrices' (N, 4, 4) world matrices. Objects
+    entirely behind the camera get 0; objects crossing the near plane
+    are clamped to the render size.
+    """
+    import numpy as np
+
+    count = len(bounds)
+    if not count:
+        return np.zeros(0)
+    local = np.concatenate((bounds, np.ones((count, 8, 1))), axis=2)
+    model_view = np.matmul(projection["world_to_camera"], matrices) # (N, 4, 4)
+    cam = np.matmul(local, model_view.transpose(0, 2, 1))[..., :3] # (N, 8, 3)
+
+    clip = projection["clip_start"]
+    if projection["ortho"]:
+        xy = cam[..., :2] * projection["scale"]
+    else:
+        depth = np.maximum(-cam[..., 2], clip)
+        xy = cam[..., :2] / depth[..., None] * projection["scale"]
+    extent = (xy.max(axis=1) - xy.min(axis=1)).max(axis=1)
+    extent[(cam[..., 2] > -clip).all(axis=1)] = 0.0
+    return np.minimum(extent, projection["max_pixels"])
+
+
+def _collect_objects(scene):
+    """
+    Renderable objects using a material with a K-Tools Loader.
+    Returns (objects, {loader tree name: [object indices]}).
+    """
+    objects = []
+    users = {}
+    trees_of_material = {}
+    for ob in scene.objects:
+        if ob.hide_render or not ob.material_slots:
+            continue
+        index = None
+        for slot in ob.material_slots:
+            mat = slot.material
+            if not mat or not mat.use_nodes or not mat.node_tree:
+                continue
+            trees = trees_of_material.get(mat.name_full)
+            if trees is None:
+                trees = trees_of_material[mat.name_full] = [t.name_full for t in pruning.iter_loader_trees(mat)]
+            if not trees:
+                continue
+            if index is None:
+                index = len(objects)
+                objects.append(ob)
+            for tree_name in trees:
+                users.setdefault(tree_name, []).append(index)
+    return objects, users
+
+
+@diagnostics.profiled("lod.apply")
+def apply_lod(scene, bias=1.0):
+    """
+    Swaps the images of the K-Tools Loaders for the smallest resolution
+    tier (siblings named '_1k', '_2k', '_4k'...) that covers the largest
+    projected size of the objects using them. The swaps are recorded so
+    restore_lod can undo them. Returns the number of nodes swapped.
+    """
+    import numpy as np
+
+    camera = scene.camera
+    if not camera:
+        return 0
+    objects, users = _collect_objects(scene)
+    if not objects:
+        return 0
+
+    bounds = np.array([ob.bound_box for ob in objects], dtype=np.float64)
+    matrices = np.array([ob.matrix_world for ob in objects], dtype=np.float64)
+    sizes = projected_sizes(bounds, matrices, get_camera_projection(scene, camera)) * bias
+
+    swapped = 0
+    for tree_name, indices in users.items():
+        tree = bpy.data.node_groups.get(tree_name)
+        if not tree:
+            continue
+        needed = float(sizes[indices].max())
+        for node in utils.find_image_nodes_in_tree(tree):
+            image = node.image
+            if not image or image.source != 'FILE' or image.packed_file:
+                continue
+            path = os.path.normpath(bpy.path.abspath(image.filepath, library=image.library))
+            tiers = find_tiers(path)
+            target = choose_tier(tiers, needed)
+            if not target or os.path.normcase(tiers[target]) == os.path.normcase(path):
+                continue
+            count = len(bpy.data.images)
+            try:
+                lod_image = bpy.data.images.load(tiers[target], check_existing=True)
+            except RuntimeError as e:
+                logger.warning("LOD: could not load tier %d of '%s': %s", target, image.name, e)
+                continue
+            if len(bpy.data.images) > count:
+                _loaded.add(lod_image.name_full)
+            lod_image.colorspace_settings.name = image.colorspace_settings.name
+            lod_image.alpha_mode = image.alpha_mode
+            _swapped.append((tree.name_full, node.name, image.name_full))
+            node.image = lod_image
+            swapped += 1
+
+    diagnostics.count("lod.swapped", swapped)
+    logger.debug("LOD: %d object(s), %d image(s) swapped", len(objects), swapped)
+    return swapped
+
+
+def restore_lod():
+    """Puts back the images swapped by apply_lod. Returns the count."""
+    restored = 0
+    for tree_name, node_name, image_name in reversed(_swapped):
+        tree = bpy.data.node_groups.get(tree_name)
+        node = tree.nodes.get(node_name) if tree else None
+        image = bpy.data.images.get(image_name)
+        if node and image:
+            node.image = image
+            restored += 1
+    _swapped.clear()
+    return restored
+
+
+def remove_loaded_tiers():
+    """Removes the tier images apply_lod loaded that nothing uses anymore. Returns the count."""
+    removed = 0
+    for name in _loaded:
+        image = bpy.data.images.get(name)
+        if image and image.users == 0:
+            bpy.data.images.remove(image)
+            removed += 1
+    _loaded.clear()
+    return removed
+
+
+def set_lock_interface(enabled):
+    """
+    Render LOD swaps images from the render thread: the interface must be
+    locked so nothing edits or draws them meanwhile. Turns Lock Interface
+    on for every scene, or back off for the scenes it was turned on for.
+    """
+    for scene in bpy.data.scenes:
+        render = scene.render
+        if enabled and not render.use_lock_interface:
+            render.use_lock_interface = True
+            _locked_scenes.add(scene.name_full)
+        elif not enabled and scene.name_full in _locked_scenes:
+            render.use_lock_interface = False
+    if not enabled:
+        _locked_scenes.clear()
+
+
+@persistent
+def _on_render_pre(scene, *args):
+    prefs = utils.get_addon_preferences(bpy.context)
+    if not prefs or not prefs.render_lod:
+        return
+    restore_lod() # Quadro anterior cancelado sem render_post
+    if not bpy.app.background and not scene.render.use_lock_interface:
+        logger.warning("LOD: skipped, enable Render > Lock Interface on scene '%s'", scene.name)
+        return
+    apply_lod(scene, prefs.lod_bias)
+
+
+@persistent
+def _on_render_post(scene, *args):
+    if _swapped:
+        restore_lod()
+
+
+@persistent
+def _on_render_complete(scene, *args):
+    restore_lod()
+    remove_loaded_tiers()
+
+
+@persistent
+def _on_load_post(*args):
+    _locked_scenes.clear()
+    prefs = utils.get_addon_preferences(bpy.context)
+    if prefs and prefs.render_lod:
+        set_lock_interface(True)
+
+
+HANDLERS = (
+    ("render_pre", _on_render_pre),
+    ("render_post", _on_render_post),
+    ("render_complete", _on_render_complete),
+    ("render_cancel", _on_render_complete),
+    ("load_post", _on_load_post),
+)
+
+
+def set_enabled(enabled):
+    """
+    Adds or removes the render handlers and turns Lock Interface on or
+    off (called from the preferences; this module is only imported once
+    Render Texture LOD is on).
+    """
+    for name, handler in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if enabled and handler not in handlers:
+            handlers.append(handler)
+        elif not enabled and handler in handlers:
+            handlers.remove(handler)
+    set_lock_interface(enabled)
+
+
+def unregister():
+    for name, handler in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler in handlers:
+            handlers.remove(handler)
+    restore_lod()
+    remove_loaded_tiers()
+    _locked_scenes.clear()
+    _dir_index.clear()
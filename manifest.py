@@ -0,0 +1,130 @@
+# File: k_tools_texture_map_loader/manifest.py
+
+import bpy
+import os
+from . import utils
+from . import api
+from . import colorspace
+from . import diagnostics
+from .diagnostics import logger
+
+MANIFEST_VERSION = 1
+
+# Node settings stored per entry (besides path and colorspace)
+NODE_SETTINGS = ("interpolation", "projection", "projection_blend", "extension")
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.normpath(bpy.path.abspath(path)))
+
+
+def _iter_loader_nodes():
+    """Yields (material, loader group node) for every K-Tools Loader."""
+    for mat in bpy.data.materials:
+        if not mat.node_tree or mat.library:
+            continue
+        for node in mat.node_tree.nodes:
+            if api.get_kt_group_kind(node) == 'LOADER':
+                yield mat, node
+
+
+def build_manifest():
+    """
+    Image assignments of every image node inside the K-Tools Loaders:
+    {material: {loader node: {image node: entry}}}, entries holding the
+    absolute path, the colorspace (with its data type, to resolve it
+    under another OCIO config) and the node settings.
+    """
+    materials = {}
+    for mat, loader in _iter_loader_nodes():
+        entries = {}
+        for node in utils.find_image_nodes_in_tree(loader.node_tree):
+            image = node.image
+            if not image or image.source != 'FILE':
+                continue
+            entry = {
+                "path": bpy.path.abspath(image.filepath, library=image.library).replace("\\", "/"),
+                "colorspace": image.colorspace_settings.name,
+                "data_type": 'UTILITY' if image.colorspace_settings.is_data else 'COLOR',
+            }
+            for setting in NODE_SETTINGS:
+                entry[setting] = getattr(node, setting)
+            entries[node.name] = entry
+        if entries:
+            materials.setdefault(mat.name, {})[loader.name] = entries
+    return {"version": MANIFEST_VERSION, "blend_file": bpy.data.filepath, "materials": materials}
+
+
+def write_manifest(filepath):
+    import json # Só quando exporta
+
+    data = build_manifest()
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    return sum(len(entries) for loaders in data["materials"].values() for entries in loaders.values())
+
+
+@diagnostics.profiled("manifest.apply")
+def apply_manifest(data):
+    """
+    Restores the assignments of a manifest. Images already loaded (same
+    file) are reused; each missing file is loaded once. Materials or
+    nodes not found in this file are skipped.
+    Returns (restored_count, error_messages).
+    """
+    if data.get("version") != MANIFEST_VERSION:
+        return 0, [f"Unsupported manifest version: {data.get('version')}"]
+
+    loaded = {}
+    for image in bpy.data.images:
+        if image.source == 'FILE' and image.filepath:
+            loaded.setdefault(_normalize_path(image.filepath), image)
+
+    restored = 0
+    errors = []
+    for mat_name, loaders in data.get("materials", {}).items():
+        mat = bpy.data.materials.get(mat_name)
+        if not mat or not mat.node_tree:
+            errors.append(f"Material not found: {mat_name}")
+            continue
+        for loader_name, entries in loaders.items():
+            loader = mat.node_tree.nodes.get(loader_name)
+            if not loader or not loader.node_tree:
+                errors.append(f"Loader not found: {mat_name} / {loader_name}")
+                continue
+            nodes = loader.node_tree.nodes
+            for node_name, entry in entries.items():
+                node = nodes.get(node_name)
+                if not node or node.type != 'TEX_IMAGE':
+                    continue
+                key = _normalize_path(entry["path"])
+                image = loaded.get(key)
+                if image is None:
+                    try:
+                        image = bpy.data.images.load(entry["path"])
+                    except RuntimeError as e:
+                        errors.append(f"Load error: {entry['path']}. {e}")
+                        continue
+                    loaded[key] = image
+                if node.image != image:
+                    node.image = image
+
+                target_cs = colorspace.resolve_colorspace(entry.get("colorspace", ""), entry.get("data_type", 'COLOR'))
+                if target_cs and image.colorspace_settings.name != target_cs and not image.library:
+                    image.colorspace_settings.name = target_cs
+                for setting in NODE_SETTINGS:
+                    if setting in entry and getattr(node, setting) != entry[setting]:
+                        setattr(node, setting, entry[setting])
+                restored += 1
+
+    diagnostics.count("manifest.restored", restored)
+    logger.info("Manifest: restored %d image assignment(s), %d error(s).", restored, len(errors))
+    return restored, errors
+
+
+def restore_manifest(filepath):
+    import json # Só quando importa
+
+    with open(filepath, encoding="utf-8") as f:
+        data = json.load(f)
+    return apply_manifest(data)
@@ -0,0 +1,148 @@
+# File: k_tools_texture_map_loader/memory_report.py
+
+import bpy
+from . import utils
+from . import image_analysis
+from . import diagnostics
+
+# image name -> (signature, stats); stats = (bytes, width, height, bits, is_float)
+_stats_cache = {}
+_last_report = None
+
+
+def _compute_stats(image, signature):
+    """
+    (bytes, width, height, bits, is_float) as Blender holds the image:
+    4 channels, 1 byte each for byte buffers and 4 for float ones,
+    whatever the file stores. Unloaded images are sized from the file
+    header (PNG, JPEG, OpenEXR, TIFF); without a header reader they are
+    unknown (0 bytes, counted as not sized) rather than decoded just for
+    the report.
+    """
+    if image.has_data:
+        width, height = image.size # Já decodificada: não custa nada
+        channels = max(image.channels, 1)
+        return (utils.get_image_memory_bytes(image), width, height, image.depth // channels, image.is_float)
+    header = image_analysis.read_image_header(signature[0]) if signature else None
+    if not header:
+        return (0, 0, 0, 0, False)
+    width, height, channels, bits = header
+    is_float = bits > 8 # Blender carrega PNG 16 bits como float
+    return (utils.get_buffer_bytes(width, height, is_float), width, height, bits, is_float)
+
+
+def get_image_stats(image):
+    """
+    Decoded size and format of an image, cached per image and file
+    signature: only new or changed images are read again.
+    """
+    signature = image_analysis.get_file_signature(image) or (image.source, image.has_data)
+    cached = _stats_cache.get(image.name_full)
+    if cached and cached[0] == signature:
+        return cached[1]
+    stats = _compute_stats(image, signature)
+    _stats_cache[image.name_full] = (signature, stats)
+    return stats
+
+
+def _depth_label(bits, is_float):
+    if not bits:
+        return "unknown"
+    if is_float:
+        return "16-bit" if bits == 16 else "32-bit float"
+    return f"{bits}-bit"
+
+
+@diagnostics.profiled("memory_report.build")
+def build_report(materials, kw_map):
+    """
+    Memory report of the images reachable from the materials' image
+    nodes (nested groups such as Maps Loader copies included). An image
+    counts once per material and once in the totals, however many nodes
+    or materials use it.
+    """
+    images = {}
+    rows = []
+    per_material = []
+    for mat in materials:
+        seen = set()
+        mat_bytes = 0
+        for node in utils.iter_image_nodes_recursive(mat.node_tree):
+            image = node.image
+            if not image or image.name_full in seen:
+                continue
+            seen.add(image.name_full)
+            size, width, height, bits, is_float = get_image_stats(image)
+            map_type = utils.get_node_map_info(node, kw_map)[0]
+            info = images.get(image.name_full)
+            if info is None:
+                info = images[image.name_full] = {
+                    "bytes": size,
+                    "resolution": f"{width}x{height}" if width else "unknown",
+                    "depth": _depth_label(bits, is_float),
+                    "map_type": map_type,
+                    "materials": 0,
+                }
+            info["materials"] += 1
+            mat_bytes += size
+            rows.append((mat.name, image.name_full))
+        per_material.append({"material": mat.name, "bytes": mat_bytes, "images": len(seen)})
+
+    breakdown = {"map_type": {}, "resolution": {}, "depth": {}}
+    for info in images.values():
+        for key, table in breakdown.items():
+            table[info[key]] = table.get(info[key], 0) + info["bytes"]
+
+    per_material.sort(key=lambda m: m["bytes"], reverse=True)
+    return {
+        "total_bytes": sum(info["bytes"] for info in images.values()),
+        "image_count": len(images),
+        "unsized_count": sum(1 for info in images.values() if info["resolution"] == "unknown"),
+        "materials": per_material,
+        "images": images,
+        "rows": rows,
+        "breakdown": breakdown,
+    }
+
+
+def get_last_report():
+    return _last_report
+
+
+def update_report(materials, kw_map, scope):
+    """Builds the report of the materials and keeps it for the panel and the export."""
+    global _last_report
+    _last_report = build_report(materials, kw_map)
+    _last_report["scope"] = scope
+    return _last_report
+
+
+def export_csv(report, filepath):
+    import csv # Só quando exporta
+
+    images = report["images"]
+    with open(filepath, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["material", "image", "map_type", "resolution", "depth", "bytes", "shared_by"])
+        for mat_name, image_name in report["rows"]:
+            info = images[image_name]
+            writer.writerow([mat_name, image_name, info["map_type"], info["resolution"],
+                             info["depth"], info["bytes"], info["materials"]])
+        # Totais: imagens sem tamanho conhecido não entram em 'bytes'
+        writer.writerow(["(total)", f"{report['unsized_count']} image(s) not sized", "", "", "",
+                         report["total_bytes"], ""])
+
+
+def export_json(report, filepath):
+    import json # Só quando exporta
+
+    data = {key: value for key, value in report.items() if key != "rows"}
+    data["blend_file"] = bpy.data.filepath
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+
+
+def unregister():
+    global _last_report
+    _stats_cache.clear()
+    _last_report = None
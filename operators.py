@@ -1,11 +1,21 @@
 import bpy
 import os
-from bpy.props import StringProperty, CollectionProperty, BoolProperty
+from bpy.props import StringProperty, CollectionProperty, BoolProperty, EnumProperty, FloatProperty, IntProperty
 from bpy.types import Operator, OperatorFileListElement
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 from . import utils
-from .tool_properties import TML_ToolProperties
 from . import assets
+from . import image_analysis
+from . import reclaim
+from . import pruning
+from . import transaction
+from . import api
+from . import diagnostics
+from .diagnostics import logger
 from mathutils import Vector
+# Wiring helpers used across the addon; they live in api
+from .api import get_kt_group_kind, link_mapping_to_loader, link_loader_to_bsdf, connect_kt_groups_in_tree
+from .utils import SCOPE_ITEMS, get_materials_in_scope
 
 #####################################################################
 #
@@ -23,6 +33,8 @@ class TML_OT_LoadTextureSet(Operator, OperatorFileListElement):
         """Verifica se há uma árvore alvo (material ou grupo)."""
         return utils.get_target_node_tree(context) is not None # USAR NOVA FUNÇÃO
 
+    @diagnostics.profiled_method("op.load_texture_set")
+    @transaction.batch_method
     def execute(self, context):
         # 1. Obter Alvo
         target_tree = utils.get_target_node_tree(context) # USAR NOVA FUNÇÃO
@@ -34,34 +46,15 @@ class TML_OT_LoadTextureSet(Operator, OperatorFileListElement):
         prefs = utils.get_addon_preferences(context)
         tool_props = context.scene.tml_tool_props
         if not prefs: self.report({'ERROR'}, "Prefs error."); return {'CANCELLED'}
-        kw_map = utils.build_keyword_map(prefs)
-        node_map = {}
-        image_nodes = utils.find_image_nodes_in_tree(target_tree) # Busca na árvore alvo
-        for node in image_nodes:
-            map_info = utils.get_node_map_info(node, kw_map)
-            map_type = map_info[0]
-            if map_type != "Unknown" and map_type not in node_map: node_map[map_type] = node
-        loaded_count = 0
         if not self.files: return {'CANCELLED'}
-        for file_elem in self.files:
-            filepath = os.path.join(self.directory, file_elem.name)
-            filename = file_elem.name
-            map_info = utils.get_file_map_info(filename, kw_map)
-            map_type = map_info[0]; data_type = map_info[1]
-            if map_type == "Unknown": continue
-            target_node = node_map.get(map_type)
-            if not target_node: continue
-            try: new_image = bpy.data.images.load(filepath); loaded_count += 1
-            except Exception as e: self.report({'ERROR'}, f"Load error: {filename}. {e}"); continue
-            target_node.image = new_image
-            target_node.interpolation = tool_props.interpolation
-            target_node.projection = tool_props.projection
-            if target_node.projection == 'BOX': target_node.projection_blend = tool_props.projection_blend
-            target_node.extension = tool_props.extension
-            target_cs = prefs.color_space_color if data_type == 'COLOR' else prefs.color_space_utility
-            try: new_image.colorspace_settings.name = target_cs
-            except: pass # Ignorar erro de colorspace
-        self.report({'INFO'}, f"Loaded {loaded_count} textures.")
+        filepaths = [os.path.join(self.directory, f.name) for f in self.files]
+        result = api.load_texture_set(target_tree, filepaths, prefs, api.settings_from(tool_props))
+        for message in result["errors"]: self.report({'ERROR'}, message)
+        message = f"Loaded {len(result['loaded'])} textures."
+        if prefs.reclaim_replaced_images != 'OFF':
+            count, reclaimed = reclaim.reclaim(prefs.reclaim_replaced_images)
+            if count: message += f" Reclaimed {count} replaced image(s), {utils.format_bytes(reclaimed)}."
+        self.report({'INFO'}, message)
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -82,6 +75,7 @@ class TML_OT_GetBatchSettings(Operator):
         """Verifica se há uma árvore alvo (material ou grupo)."""
         return utils.get_target_node_tree(context) is not None # USAR NOVA FUNÇÃO
 
+    @diagnostics.profiled_method("op.get_batch_settings")
     def execute(self, context):
         target_tree = utils.get_target_node_tree(context) # USAR NOVA FUNÇÃO
         if not target_tree:
@@ -97,31 +91,12 @@ class TML_OT_GetBatchSettings(Operator):
 
         source_node = image_nodes[0]
 
-        # (Lógica de desativar/reativar callbacks permanece a mesma)
-        try:
-            prop_interp = TML_ToolProperties.__annotations__['interpolation']
-            prop_proj = TML_ToolProperties.__annotations__['projection']
-            prop_blend = TML_ToolProperties.__annotations__['projection_blend']
-            prop_ext = TML_ToolProperties.__annotations__['extension']
-        except: self.report({'ERROR'}, "Tool props definition error."); return {'CANCELLED'}
-        update_interp = prop_interp.keywords.get('update')
-        update_proj = prop_proj.keywords.get('update')
-        update_blend = prop_blend.keywords.get('update')
-        update_ext = prop_ext.keywords.get('update')
-        if update_interp: prop_interp.keywords['update'] = None
-        if update_proj: prop_proj.keywords['update'] = None
-        if update_blend: prop_blend.keywords['update'] = None
-        if update_ext: prop_ext.keywords['update'] = None
-        try:
+        # Callbacks de update suspensos: só copiar os valores, sem reaplicar nos nós
+        with transaction.transaction():
             tool_props.interpolation = source_node.interpolation
             tool_props.projection = source_node.projection
             tool_props.projection_blend = source_node.projection_blend
             tool_props.extension = source_node.extension
-        finally:
-            if update_interp: prop_interp.keywords['update'] = update_interp
-            if update_proj: prop_proj.keywords['update'] = update_proj
-            if update_blend: prop_blend.keywords['update'] = update_blend
-            if update_ext: prop_ext.keywords['update'] = update_ext
         self.report({'INFO'}, f"Copied settings from '{source_node.name}'")
         return {'FINISHED'}
 
@@ -141,31 +116,19 @@ class TML_OT_ApplyBatchSettings(Operator):
         """Verifica se há uma árvore alvo."""
         return utils.get_target_node_tree(context) is not None
 
+    @diagnostics.profiled_method("op.apply_batch_settings")
+    @transaction.batch_method
     def execute(self, context):
         target_tree = utils.get_target_node_tree(context)
         if not target_tree:
             self.report({'ERROR'}, "No target node tree found.")
             return {'CANCELLED'}
 
-        image_nodes = utils.find_image_nodes_in_tree(target_tree)
-        tool_props = context.scene.tml_tool_props
-
-        if not image_nodes:
+        if not utils.find_image_nodes_in_tree(target_tree):
             self.report({'INFO'}, "No Image Nodes found in target tree.")
             return {'CANCELLED'}
 
-        count = 0
-        for node in image_nodes:
-            try:
-                node.interpolation = tool_props.interpolation
-                node.projection = tool_props.projection
-                if node.projection == 'BOX':
-                    node.projection_blend = tool_props.projection_blend
-                node.extension = tool_props.extension
-                count += 1
-            except Exception as e:
-                print(f"TML Apply Error on {node.name}: {e}")
-
+        count = api.apply_batch_settings(target_tree, api.settings_from(context.scene.tml_tool_props))
         self.report({'INFO'}, f"Applied settings to {count} nodes.")
         return {'FINISHED'}
 
@@ -206,12 +169,12 @@ class TML_OT_AddAssetGroupBase(Operator):
     bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
 
     group_name_to_add: StringProperty() # type: ignore
-    append_unique: BoolProperty(default=False) # type: ignore
 
     @classmethod
     def poll(cls, context):
         return context.material and context.material.use_nodes
 
+    @diagnostics.profiled_method("op.add_asset_group")
     def execute(self, context):
         # Acessar/Modificar as variáveis globais
         global last_added_node_location
@@ -222,22 +185,13 @@ class TML_OT_AddAssetGroupBase(Operator):
             self.report({'ERROR'}, "No active material selected.")
             return {'CANCELLED'}
 
-        # (Carregamento do node group - inalterado)
-        node_group = None
-        if self.append_unique:
-            node_group = assets.append_maps_loader_group(active_mat.name)
-        else:
-            node_group = assets.ensure_node_group(self.group_name_to_add, link=False)
-        if not node_group:
+        kind = next((k for k, name in api.KT_GROUP_NAMES.items() if name == self.group_name_to_add), None)
+        mat_tree = active_mat.node_tree
+        new_node = api.add_kt_group(mat_tree, kind, loader_name=active_mat.name) if kind else None
+        if not new_node:
             self.report({'ERROR'}, f"Failed to load/find node group: {self.group_name_to_add}")
             return {'CANCELLED'}
 
-        mat_tree = active_mat.node_tree
-        new_node = mat_tree.nodes.new('ShaderNodeGroup')
-        new_node.node_tree = node_group
-        new_node.name = node_group.name
-        new_node.label = node_group.name.split(':')[-1].strip()
-
         current_center = get_node_editor_view_center(context)
         apply_offset = False # Flag para saber se aplicamos offset
 
@@ -273,7 +227,7 @@ class TML_OT_AddAssetGroupBase(Operator):
         new_node.select = True
         mat_tree.nodes.active = new_node
 
-        self.report({'INFO'}, f"Added '{node_group.name}' node.")
+        self.report({'INFO'}, f"Added '{new_node.node_tree.name}' node.")
         return {'FINISHED'}
 
 
@@ -282,43 +236,21 @@ class TML_OT_AddMappingNode(TML_OT_AddAssetGroupBase):
     bl_idname = "tml.add_mapping_node"
     bl_label = "Add Mapping Node"
     group_name_to_add: StringProperty(default=assets.MAPPING_GROUP_NAME) # type: ignore
-    append_unique: bpy.props.BoolProperty(default=False) # type: ignore
 
 class TML_OT_AddMapsLoaderNode(TML_OT_AddAssetGroupBase):
     bl_idname = "tml.add_maps_loader_node"
     bl_label = "Add Maps Loader Node"
     group_name_to_add: StringProperty(default=assets.MAPS_LOADER_GROUP_NAME) # type: ignore
-    append_unique: bpy.props.BoolProperty(default=True) # type: ignore
 
 class TML_OT_AddBsdfNode(TML_OT_AddAssetGroupBase):
     bl_idname = "tml.add_bsdf_node"
     bl_label = "Add BSDF Node"
     group_name_to_add: StringProperty(default=assets.BSDF_GROUP_NAME) # type: ignore
-    append_unique: bpy.props.BoolProperty(default=False) # type: ignore
 
 
 #####################################################################
 #
 #####################################################################
-# "Loader Output Name": ("BSDF Input Name", "Internal Image Node Name"),
-SOCKET_MAP_CONNECT = {
-    "Base Color":        ("Base Color",        "Diffuse"),
-    "Metalness":         ("Metalness",         "Metalness"),
-    "Roughness":         ("Roughness",         "Roughness"),
-    "Alpha":             ("Alpha",             "Alpha"),
-    "Normal":            ("Normal",            "Normal"),
-    "Displacement":      ("Displacement",      "Displacement"),
-    "Transmission":      ("Transmission",      "Transmission"),
-    "Ambient Occlusion": ("Ambient Occlusion", "AmbientOcclusion"),
-    "Emission":          ("Emission",          "Emission"),
-    "Subsurface Weight": ("Subsurface Weight", "Subsurface Weight"),
-}
-
-MAPPING_LOADER_SOCKET_MAP = {
-    "Vector": "Vector",               # Saída Mapping : Entrada Loader (AJUSTE NOME ENTRADA LOADER SE NECESSÁRIO)
-    "Rotation Angle": "Rotation Angle", # Saída Mapping : Entrada Loader (AJUSTE AMBOS NOMES SE NECESSÁRIO)
-}
-
 class TML_OT_ConnectGroups(Operator):
     """
     Connects selected K-Tools groups (Mapping > Loader > BSDF).
@@ -337,88 +269,736 @@ class TML_OT_ConnectGroups(Operator):
                 len(context.selected_nodes) in [2, 3] and # Aceitar 2 ou 3
                 all(n.type == 'GROUP' for n in context.selected_nodes))
 
+    @diagnostics.profiled_method("op.connect_groups")
+    @transaction.batch_method
     def execute(self, context):
         mat_tree = context.material.node_tree
-        selected = context.selected_nodes
-        loader_node = None
-        bsdf_node = None
-        mapping_node = None # Novo
+        found = {}
 
         # Identificar os três tipos de nós
-        for node in selected:
-            if node.node_tree:
-                if node.node_tree.name.startswith(assets.MAPS_LOADER_GROUP_NAME):
-                    loader_node = node
-                elif node.node_tree.name.startswith(assets.BSDF_GROUP_NAME):
-                    bsdf_node = node
-                elif node.node_tree.name.startswith(assets.MAPPING_GROUP_NAME):
-                    mapping_node = node
+        for node in context.selected_nodes:
+            kind = get_kt_group_kind(node)
+            if kind:
+                found[kind] = node
+
+        loader_node = found.get('LOADER')
+        mapping_node = found.get('MAPPING')
+        bsdf_node = found.get('BSDF')
 
         # Verificar se temos pelo menos o Loader (essencial)
         if not loader_node:
             self.report({'ERROR'}, f"A '{assets.MAPS_LOADER_GROUP_NAME}' node must be selected.")
             return {'CANCELLED'}
 
-        links = mat_tree.links
-        links_created = 0
+        prefs = utils.get_addon_preferences(context)
+        skip_opaque_alpha = bool(prefs and prefs.analyze_alpha_coverage)
+        result = api.connect_kt_groups(mat_tree, mapping_node, loader_node, bsdf_node, skip_opaque_alpha)
+        links_created = result["mapping_loader"] + result["loader_bsdf"]
         report_messages = []
+        if result["mapping_loader"]: report_messages.append("Mapped->Loader")
+        if result["loader_bsdf"]: report_messages.append("Loader->BSDF")
 
-        # --- Bloco 1: Conectar Mapping -> Loader ---
-        if mapping_node and loader_node:
-            print(f"TML Connect: Checking Mapping '{mapping_node.name}' -> Loader '{loader_node.name}'")
-            for map_out_name, load_in_name in MAPPING_LOADER_SOCKET_MAP.items():
-                out_sock = mapping_node.outputs.get(map_out_name)
-                in_sock = loader_node.inputs.get(load_in_name)
+        # --- Reportar Resultado ---
+        if links_created > 0:
+            message = f"Created {links_created} link(s) ({' & '.join(report_messages)})."
+            self.report({'INFO'}, message)
+        elif not mapping_node and not bsdf_node:
+            self.report({'WARNING'}, "Select Loader and Mapping or BSDF node.")
+        else:
+            self.report({'INFO'}, "No new links needed or created.")
 
-                if not out_sock or not in_sock: continue
-                if in_sock.is_linked: continue # Não sobrescrever
+        return {'FINISHED'}
 
-                print(f"TML Connect: Linking Mapping '{map_out_name}' -> Loader '{load_in_name}'")
-                links.new(out_sock, in_sock)
-                links_created += 1
-            if links_created > 0: report_messages.append("Mapped->Loader")
 
+class TML_OT_ConnectGroupsBulk(Operator):
+    """
+    Connects every K-Tools group instance (Mapping > Loader > BSDF)
+    in all materials of the chosen scope in one pass.
+    """
+    bl_idname = "tml.connect_groups_bulk"
+    bl_label = "Bulk Connect K-Tools Nodes"
+    bl_options = {'REGISTER', 'UNDO'}
 
-        # --- Bloco 2: Conectar Loader -> BSDF ---
-        if loader_node and bsdf_node:
-            print(f"TML Connect: Checking Loader '{loader_node.name}' -> BSDF '{bsdf_node.name}'")
-            loader_tree = loader_node.node_tree # Árvore interna do loader
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
 
-            # Usar um cache para nós internos para evitar buscas repetidas
-            internal_img_nodes_cache = {
-                name: loader_tree.nodes.get(name)
-                for _, (_, name) in SOCKET_MAP_CONNECT.items()
-            }
+    @diagnostics.profiled_method("op.connect_groups_bulk")
+    @transaction.batch_method
+    def execute(self, context):
+        materials = get_materials_in_scope(context, self.scope)
+        if not materials:
+            self.report({'WARNING'}, "No node-based materials in scope.")
+            return {'CANCELLED'}
 
-            for loader_out_name, (bsdf_in_name, internal_img_node_name) in SOCKET_MAP_CONNECT.items():
-                out_sock = loader_node.outputs.get(loader_out_name)
-                in_sock = bsdf_node.inputs.get(bsdf_in_name)
+        prefs = utils.get_addon_preferences(context)
+        skip_opaque_alpha = bool(prefs and prefs.analyze_alpha_coverage)
 
-                if not out_sock or not in_sock: continue
+        links_created = 0
+        materials_wired = 0
+        for mat in materials:
+            count = connect_kt_groups_in_tree(mat.node_tree, skip_opaque_alpha)
+            if count:
+                links_created += count
+                materials_wired += 1
+
+        logger.info("Bulk connect: %d link(s) in %d of %d material(s).", links_created, materials_wired, len(materials))
+        self.report({'INFO'}, f"Created {links_created} link(s) in {materials_wired} of {len(materials)} material(s).")
+        return {'FINISHED'}
 
-                # Verificar se o nó interno existe e tem imagem
-                internal_img_node = internal_img_nodes_cache.get(internal_img_node_name)
-                if not internal_img_node or not internal_img_node.image:
-                    continue # Pular se nó interno não existe ou não tem imagem
 
-                if in_sock.is_linked: continue # Não sobrescrever
+#####################################################################
+#
+#####################################################################
+class TML_OT_ConvertDirectXNormals(Operator):
+    """
+    Detects DirectX normal maps in the chosen materials and replaces
+    them with OpenGL copies (green channel flipped, cached on disk).
+    """
+    bl_idname = "tml.convert_directx_normals"
+    bl_label = "Convert DirectX Normals"
+    bl_options = {'REGISTER', 'UNDO'}
 
-                print(f"TML Connect: Linking Loader '{loader_out_name}' -> BSDF '{bsdf_in_name}' (Image found in '{internal_img_node_name}')")
-                links.new(out_sock, in_sock)
-                links_created += 1
-            if "Mapped->Loader" not in report_messages and links_created > 0: # Evitar duplicar se M->L já foi contado
-                report_messages.append("Loader->BSDF")
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
 
+    use_pixels: BoolProperty(
+        name="Analyze Pixels",
+        description="When the filename gives no hint, guess the convention from the pixels (slower)",
+        default=True,
+    ) # type: ignore
 
-        # --- Reportar Resultado ---
-        if links_created > 0:
-            message = f"Created {links_created} link(s) ({' & '.join(report_messages)})."
-            self.report({'INFO'}, message)
-        elif not mapping_node and not bsdf_node:
-            self.report({'WARNING'}, "Select Loader and Mapping or BSDF node.")
+    @diagnostics.profiled_method("op.convert_directx_normals")
+    @transaction.batch_method
+    def execute(self, context):
+        prefs = utils.get_addon_preferences(context)
+        kw_map = utils.get_keyword_map(prefs)
+
+        # Agrupar nós por imagem: cada imagem é analisada uma única vez
+        nodes_by_image = {}
+        for mat in get_materials_in_scope(context, self.scope):
+            for node in utils.iter_image_nodes_recursive(mat.node_tree):
+                if node.image and utils.get_node_map_info(node, kw_map)[0] == "Normal":
+                    nodes_by_image.setdefault(node.image.name_full, []).append(node)
+
+        converted = 0
+        for nodes in nodes_by_image.values():
+            if not image_analysis.convert_directx_normal(nodes[0], use_pixels=self.use_pixels):
+                continue
+            for node in nodes[1:]:
+                node.image = nodes[0].image
+            converted += 1
+
+        self.report({'INFO'}, f"Converted {converted} of {len(nodes_by_image)} normal map(s) to OpenGL.")
+        return {'FINISHED'}
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_CollapseConstantMaps(Operator):
+    """
+    Replaces flat textures (e.g. an all-black Metalness map) with value
+    nodes and frees their image buffers.
+    """
+    bl_idname = "tml.collapse_constant_maps"
+    bl_label = "Collapse Constant Maps"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
+
+    tolerance: FloatProperty(
+        name="Tolerance",
+        description="Maximum per-channel difference for a map to count as constant",
+        min=0.0, max=0.25,
+        default=image_analysis.CONSTANT_TOLERANCE,
+        precision=4,
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.collapse_constant_maps")
+    @transaction.batch_method
+    def execute(self, context):
+        collapsed = 0
+        reclaimed = 0
+        for mat in get_materials_in_scope(context, self.scope):
+            for node in list(utils.iter_image_nodes_recursive(mat.node_tree)):
+                if not node.image:
+                    continue
+                freed = image_analysis.collapse_constant_node(node, self.tolerance)
+                if not node.image:
+                    collapsed += 1
+                reclaimed += freed
+
+        self.report({'INFO'}, f"Collapsed {collapsed} constant map(s), reclaimed {utils.format_bytes(reclaimed)}.")
+        return {'FINISHED'}
+
+
+class TML_OT_PruneLoaderSlots(Operator):
+    """
+    Mutes or strips the empty slots of the Maps Loader copies so their
+    nodes are not compiled, or restores them.
+    """
+    bl_idname = "tml.prune_loader_slots"
+    bl_label = "Prune Unused Loader Slots"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
+
+    mode: EnumProperty(
+        name="Mode",
+        items=pruning.PRUNE_MODE_ITEMS + [('RESTORE', "Restore", "Restore the pruned slots")],
+        default='STRIP',
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.prune_loader_slots")
+    @transaction.batch_method
+    def execute(self, context):
+        trees = 0
+        slots = 0
+        for mat in get_materials_in_scope(context, self.scope):
+            for tree in pruning.iter_loader_trees(mat):
+                if self.mode == 'RESTORE':
+                    trees += pruning.restore_tree(tree)
+                else:
+                    pruned = pruning.prune_tree(tree, self.mode)
+                    trees += bool(pruned)
+                    slots += pruned
+
+        if self.mode == 'RESTORE':
+            self.report({'INFO'}, f"Restored {trees} Loader(s).")
         else:
-            self.report({'INFO'}, "No new links needed or created.")
+            self.report({'INFO'}, f"Pruned {slots} empty slot(s) in {trees} Loader(s).")
+        return {'FINISHED'}
+
+
+class TML_OT_TranscodeImages(Operator):
+    """
+    Transcodes the slow-to-decode textures (TIFF, compressed EXR) of the
+    chosen materials into the fast-load cache in the background, or
+    points them back at their source files.
+    """
+    bl_idname = "tml.transcode_images"
+    bl_label = "Transcode Textures"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
+
+    mode: EnumProperty(
+        name="Mode",
+        items=[
+            ('TRANSCODE', "Transcode", "Queue the slow-to-decode textures for the fast-load cache"),
+            ('RESTORE', "Restore Sources", "Point the transcoded textures back at their source files"),
+        ],
+        default='TRANSCODE',
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.transcode_images")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import transcode # Só quando usado
+
+        prefs = utils.get_addon_preferences(context)
+        images = {}
+        for mat in get_materials_in_scope(context, self.scope):
+            for node in utils.iter_image_nodes_recursive(mat.node_tree):
+                if node.image:
+                    images[node.image.name_full] = node.image
+
+        if self.mode == 'RESTORE':
+            count = sum(transcode.restore_source(image) for image in images.values())
+            self.report({'INFO'}, f"Restored {count} image(s) to their source files.")
+        else:
+            count = sum(transcode.queue_image(image, prefs) for image in images.values())
+            self.report({'INFO'}, f"Queued {count} image(s) for transcoding.")
+        return {'FINISHED'}
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_RelinkMissing(Operator):
+    """
+    Relinks the missing images of all materials and node groups to the
+    files found under a folder (searched once, in parallel).
+    """
+    bl_idname = "tml.relink_missing"
+    bl_label = "Relink Missing Textures"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(subtype='DIR_PATH') # type: ignore
+    filter_folder: BoolProperty(default=True, options={'HIDDEN'}) # type: ignore
+
+    relative: BoolProperty(
+        name="Relative Paths",
+        description="Store the new paths relative to the .blend file",
+        default=True,
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.relink_missing")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import relink # Só quando usado
+
+        root = bpy.path.abspath(self.directory)
+        if not os.path.isdir(root):
+            self.report({'ERROR'}, f"Not a folder: {root}")
+            return {'CANCELLED'}
+
+        kw_map = utils.get_keyword_map(utils.get_addon_preferences(context))
+        relinked, not_found = relink.relink_missing(root, kw_map, relative=self.relative)
+        for name in not_found:
+            self.report({'WARNING'}, f"Not found: {name}")
+        self.report({'INFO'}, f"Relinked {relinked} image(s), {len(not_found)} still missing.")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_SaveManifest(Operator, ExportHelper):
+    """Save the image assignments of every K-Tools Loader to a JSON manifest"""
+    bl_idname = "tml.save_manifest"
+    bl_label = "Save Texture Manifest"
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'}) # type: ignore
+
+    @diagnostics.profiled_method("op.save_manifest")
+    def execute(self, context):
+        from . import manifest # Só quando usado
+
+        try:
+            count = manifest.write_manifest(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write manifest: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Saved {count} image assignments to {self.filepath}")
+        return {'FINISHED'}
+
+
+class TML_OT_RestoreManifest(Operator, ImportHelper):
+    """Restore the image assignments of the K-Tools Loaders from a JSON manifest"""
+    bl_idname = "tml.restore_manifest"
+    bl_label = "Restore Texture Manifest"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'}) # type: ignore
+
+    @diagnostics.profiled_method("op.restore_manifest")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import manifest # Só quando usado
 
+        try:
+            restored, errors = manifest.restore_manifest(self.filepath)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Could not read manifest: {e}")
+            return {'CANCELLED'}
+        for message in errors: self.report({'WARNING'}, message)
+        self.report({'INFO'}, f"Restored {restored} image assignments.")
+        return {'FINISHED'}
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_BuildAtlas(Operator):
+    """
+    Packs the small texture sets of the chosen materials into one atlas
+    per map type (packed into the .blend; unpack to write them to the
+    folder) and makes each Maps Loader sample its own rectangle.
+    Meant for sets used with 0-1 UVs: a set tiled by its Mapping would
+    sample its neighbours.
+    """
+    bl_idname = "tml.build_atlas"
+    bl_label = "Build Texture Atlas"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(subtype='DIR_PATH') # type: ignore
+    filter_folder: BoolProperty(default=True, options={'HIDDEN'}) # type: ignore
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='SELECTED',
+    ) # type: ignore
+
+    atlas_name: StringProperty(
+        name="Name",
+        description="Prefix of the atlas files (one per map type)",
+        default="Atlas",
+    ) # type: ignore
+
+    padding: IntProperty(
+        name="Padding",
+        description="Pixels between the sets",
+        default=8, min=0, max=256,
+    ) # type: ignore
+
+    bleed: IntProperty(
+        name="Bleed",
+        description="Pixels of the padding filled with the set's edge pixels, so mipmaps do not mix neighbours",
+        default=4, min=0, max=256,
+    ) # type: ignore
+
+    max_set_size: IntProperty(
+        name="Max Set Size",
+        description="Sets with a larger image stay as they are",
+        default=1024, min=16, max=8192,
+    ) # type: ignore
+
+    max_size: IntProperty(
+        name="Max Atlas Size",
+        description="Sets that do not fit in an atlas of this size stay as they are",
+        default=8192, min=256, max=16384,
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.build_atlas")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import atlas # Só quando usado
+
+        directory = bpy.path.abspath(self.directory)
+        if not directory or (self.directory.startswith("//") and not bpy.data.filepath):
+            self.report({'ERROR'}, "Choose an output folder (or save the .blend first).")
+            return {'CANCELLED'}
+
+        materials = get_materials_in_scope(context, self.scope)
+        kw_map = utils.get_keyword_map(utils.get_addon_preferences(context))
+        sets = atlas.collect_sets(materials, kw_map, self.max_set_size)
+        if len(sets) < 2:
+            self.report({'WARNING'}, "Need at least two small texture sets in scope.")
+            return {'CANCELLED'}
+
+        try:
+            atlased, skipped, paths = atlas.build_atlas(sets, directory, self.atlas_name,
+                                                  self.padding, self.bleed, self.max_size)
+        except RuntimeError as e:
+            self.report({'ERROR'}, f"Could not pack atlas: {e}")
+            return {'CANCELLED'}
+        for name in skipped:
+            self.report({'WARNING'}, f"Did not fit: {name}")
+        self.report({'INFO'}, f"Packed {len(atlased)} set(s) into {len(paths)} atlas image(s) inside the .blend; "
+                              f"File > External Data > Unpack Resources writes them to {self.directory}.")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+#####################################################################
+#
+#####################################################################
+PACK_GROUP_BY_ITEMS = [
+    ('MATERIAL', "Material", "One subfolder per material (the first one using the image)"),
+    ('TEXTURE_SET', "Texture Set", "One subfolder per texture set, from the filename keywords"),
+]
+
+class TML_OT_UnpackImages(Operator):
+    """
+    Writes the packed images used by the chosen materials to a folder
+    (one subfolder per material or texture set), relinks them and frees
+    the packed data
+    """
+    bl_idname = "tml.unpack_images"
+    bl_label = "Unpack Images"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(subtype='DIR_PATH', default="//textures/") # type: ignore
+    filter_folder: BoolProperty(default=True, options={'HIDDEN'}) # type: ignore
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ALL',
+    ) # type: ignore
+
+    group_by: EnumProperty(
+        name="Group By",
+        items=PACK_GROUP_BY_ITEMS,
+        default='MATERIAL',
+    ) # type: ignore
+
+    relative: BoolProperty(
+        name="Relative Paths",
+        description="Store the new paths relative to the .blend file",
+        default=True,
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.unpack_images")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import packing # Só quando usado
+
+        materials = get_materials_in_scope(context, self.scope)
+        if not materials:
+            self.report({'WARNING'}, "No materials in scope.")
+            return {'CANCELLED'}
+        if self.directory.startswith("//") and not bpy.data.filepath:
+            self.report({'ERROR'}, "Save the .blend file first, or pick an absolute folder.")
+            return {'CANCELLED'}
+
+        kw_map = utils.get_keyword_map(utils.get_addon_preferences(context))
+        count, freed, errors = packing.unpack_images(materials, self.directory, self.group_by, self.relative, kw_map)
+        for message in errors: self.report({'WARNING'}, f"Not unpacked: {message}")
+        self.report({'INFO'}, f"Unpacked {count} image(s) to {self.directory}: "
+                              f"the .blend shrinks by {utils.format_bytes(freed)} on the next save.")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class TML_OT_PackImages(Operator):
+    """Pack only the images used by the chosen materials into the .blend, for delivery"""
+    bl_idname = "tml.pack_images"
+    bl_label = "Pack Images"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.pack_images")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import packing # Só quando usado
+
+        materials = get_materials_in_scope(context, self.scope)
+        if not materials:
+            self.report({'WARNING'}, "No materials in scope.")
+            return {'CANCELLED'}
+        count, added, errors = packing.pack_images(materials)
+        for message in errors: self.report({'WARNING'}, f"Not packed: {message}")
+        self.report({'INFO'}, f"Packed {count} image(s), {utils.format_bytes(added)}.")
+        return {'FINISHED'}
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_BakeFlatten(Operator):
+    """
+    Bake the K-Tools network of the chosen materials to a flattened
+    texture set (base color, ORM, normal) with Cycles on the CPU, in
+    background processes, and replace it with a single Maps Loader
+    """
+    bl_idname = "tml.bake_flatten"
+    bl_label = "Bake to Flat Texture Set"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(
+        name="Folder",
+        subtype='DIR_PATH',
+        default="//baked/",
+    ) # type: ignore
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
+
+    resolution: IntProperty(name="Resolution", default=2048, min=64, max=16384) # type: ignore
+    samples: IntProperty(name="Samples", default=16, min=1, max=4096) # type: ignore
+    margin: IntProperty(name="Margin", description="Pixels baked past the UV islands", default=16, min=0, max=64) # type: ignore
+
+    workers: IntProperty(
+        name="Processes",
+        description="Background Blender processes baking at once (0 = automatic)",
+        default=0, min=0, max=32,
+    ) # type: ignore
+
+    replace: BoolProperty(
+        name="Replace Network",
+        description="Rebuild each baked material around a single Maps Loader",
+        default=True,
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.bake_flatten")
+    @transaction.batch_method
+    def execute(self, context):
+        from . import bake # Só quando usado
+
+        materials = get_materials_in_scope(context, self.scope)
+        if not materials:
+            self.report({'WARNING'}, "No materials in scope.")
+            return {'CANCELLED'}
+        if self.directory.startswith("//") and not bpy.data.filepath:
+            self.report({'ERROR'}, "Save the .blend file first, or pick an absolute folder.")
+            return {'CANCELLED'}
+
+        queued, errors = bake.bake_materials(materials, self.directory, self.resolution, self.samples,
+                                             self.margin, self.workers, self.replace)
+        for message in errors: self.report({'WARNING'}, message)
+        if bpy.app.background:
+            self.report({'INFO'}, f"Baked {len(queued)} of {len(materials)} material(s).")
+        else:
+            self.report({'INFO'}, f"Baking {len(queued)} material(s) in the background.")
+        return {'FINISHED'} if queued else {'CANCELLED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+
+#####################################################################
+#
+#####################################################################
+def _archive_set_items(self, context):
+    from . import archive # Só quando usado: lê a lista do zip escolhido
+    return archive.texture_set_items(self, context)
+
+class TML_OT_LoadFromArchive(Operator, ImportHelper):
+    """Load a texture set straight from a zip archive, extracting only its files to a cache"""
+    bl_idname = "tml.load_from_archive"
+    bl_label = "Load from Zip"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".zip"
+    filter_glob: StringProperty(default="*.zip", options={'HIDDEN'}) # type: ignore
+
+    texture_set: EnumProperty(
+        name="Texture Set",
+        description="Texture set to load, classified from the archive's file list",
+        items=_archive_set_items,
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return utils.get_target_node_tree(context) is not None
+
+    def draw(self, context):
+        self.layout.prop(self, "texture_set")
+
+    @diagnostics.profiled_method("op.load_from_archive")
+    @transaction.batch_method
+    def execute(self, context):
+        import zipfile # Só quando usado
+        from . import archive
+
+        target_tree = utils.get_target_node_tree(context)
+        prefs = utils.get_addon_preferences(context)
+        if not target_tree or not prefs:
+            return {'CANCELLED'}
+        if self.texture_set in {'', 'NONE'}:
+            self.report({'ERROR'}, "No texture set selected (is this a zip with texture files?).")
+            return {'CANCELLED'}
+        try:
+            result = archive.load_archive_set(target_tree, bpy.path.abspath(self.filepath), self.texture_set,
+                                              prefs, api.settings_from(context.scene.tml_tool_props))
+        except (OSError, KeyError, RuntimeError, zipfile.BadZipFile) as e:
+            self.report({'ERROR'}, f"Could not read archive: {e}")
+            return {'CANCELLED'}
+        for message in result["errors"]: self.report({'ERROR'}, message)
+        message = f"Loaded {len(result['loaded'])} textures from the archive."
+        if prefs.reclaim_replaced_images != 'OFF':
+            count, reclaimed = reclaim.reclaim(prefs.reclaim_replaced_images)
+            if count: message += f" Reclaimed {count} replaced image(s), {utils.format_bytes(reclaimed)}."
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_MemoryReport(Operator):
+    """Compute the texture memory used by the materials in scope"""
+    bl_idname = "tml.memory_report"
+    bl_label = "Texture Memory Report"
+
+    scope: EnumProperty(
+        name="Scope",
+        items=SCOPE_ITEMS,
+        default='ACTIVE',
+    ) # type: ignore
+
+    @diagnostics.profiled_method("op.memory_report")
+    def execute(self, context):
+        from . import memory_report # Só quando usado
+
+        materials = get_materials_in_scope(context, self.scope)
+        if not materials:
+            self.report({'WARNING'}, "No materials in scope.")
+            return {'CANCELLED'}
+        kw_map = utils.get_keyword_map(utils.get_addon_preferences(context))
+        report = memory_report.update_report(materials, kw_map, self.scope)
+        message = (f"{len(materials)} material(s), {report['image_count']} image(s), "
+                   f"{utils.format_bytes(report['total_bytes'])}.")
+        if report["unsized_count"]:
+            message += f" {report['unsized_count']} images not sized."
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
+class TML_OT_ExportMemoryReport(Operator, ExportHelper):
+    """Export the last texture memory report as CSV or JSON"""
+    bl_idname = "tml.export_memory_report"
+    bl_label = "Export Memory Report"
+
+    filename_ext = ".csv"
+    filter_glob: StringProperty(default="*.csv;*.json", options={'HIDDEN'}) # type: ignore
+
+    file_format: EnumProperty(
+        name="Format",
+        items=[
+            ('CSV', "CSV", "One row per material and image"),
+            ('JSON', "JSON", "Totals, per-material sums, images and breakdowns"),
+        ],
+        default='CSV',
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        # Sem o módulo carregado ainda não há relatório
+        memory_report = utils.get_loaded_module("memory_report")
+        return memory_report is not None and memory_report.get_last_report() is not None
+
+    def check(self, context):
+        # Ajusta a extensão ao formato escolhido
+        self.filename_ext = ".json" if self.file_format == 'JSON' else ".csv"
+        return super().check(context)
+
+    @diagnostics.profiled_method("op.export_memory_report")
+    def execute(self, context):
+        from . import memory_report # Só quando usado
+
+        report = memory_report.get_last_report()
+        filepath = bpy.path.ensure_ext(self.filepath, ".json" if self.file_format == 'JSON' else ".csv")
+        try:
+            if self.file_format == 'JSON':
+                memory_report.export_json(report, filepath)
+            else:
+                memory_report.export_csv(report, filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write report: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Report written to {filepath}")
         return {'FINISHED'}
 
 
@@ -431,7 +1011,22 @@ classes = (
     TML_OT_AddMappingNode,
     TML_OT_AddMapsLoaderNode,
     TML_OT_AddBsdfNode, 
-    TML_OT_ConnectGroups,   
+    TML_OT_ConnectGroups,
+    TML_OT_ConnectGroupsBulk,
+    TML_OT_ConvertDirectXNormals,
+    TML_OT_CollapseConstantMaps,
+    TML_OT_PruneLoaderSlots,
+    TML_OT_TranscodeImages,
+    TML_OT_RelinkMissing,
+    TML_OT_SaveManifest,
+    TML_OT_RestoreManifest,
+    TML_OT_BuildAtlas,
+    TML_OT_UnpackImages,
+    TML_OT_PackImages,
+    TML_OT_BakeFlatten,
+    TML_OT_LoadFromArchive,
+    TML_OT_MemoryReport,
+    TML_OT_ExportMemoryReport,
 )
 
 def register():
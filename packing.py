@@ -0,0 +1,166 @@
+# File: k_tools_texture_map_loader/packing.py
+
+import bpy
+import os
+from . import utils
+from . import diagnostics
+from .diagnostics import logger
+
+WRITE_MAX_WORKERS = 8
+MAX_PENDING_BYTES = 512 << 20 # Bytes empacotados em trânsito para as threads
+
+# Extension of a packed image without one in its filepath
+FORMAT_EXTENSIONS = {
+    'PNG': ".png", 'JPEG': ".jpg", 'JPEG2000': ".jp2", 'TARGA': ".tga", 'TARGA_RAW': ".tga",
+    'BMP': ".bmp", 'TIFF': ".tif", 'OPEN_EXR': ".exr", 'OPEN_EXR_MULTILAYER': ".exr",
+    'HDR': ".hdr", 'WEBP': ".webp", 'DPX': ".dpx", 'CINEON': ".cin",
+}
+
+def _iter_material_images(materials):
+    """(material, image) of the image nodes of the materials, each image once."""
+    seen = set()
+    for mat in materials:
+        if not mat.node_tree:
+            continue
+        for node in utils.iter_image_nodes_recursive(mat.node_tree):
+            image = node.image
+            if image and image.name_full not in seen:
+                seen.add(image.name_full)
+                yield mat, image
+
+
+def _packed_filename(image):
+    filename = bpy.path.basename(image.filepath)
+    if os.path.splitext(filename)[1]:
+        return filename
+    return bpy.path.clean_name(image.name) + FORMAT_EXTENSIONS.get(image.file_format, ".png")
+
+
+def collect_packed_images(materials, group_by='MATERIAL', kw_map=None):
+    """
+    Packed images used by the materials' image nodes (nested groups
+    included), with the subfolder each one goes to.
+    Returns {image name: (image, subfolder, filename)}.
+    """
+    packed = {}
+    for mat, image in _iter_material_images(materials):
+        if image.source != 'FILE' or not image.packed_file or image.library:
+            continue # UDIMs têm um packed_file por tile
+        filename = _packed_filename(image)
+        folder = mat.name
+        if group_by == 'TEXTURE_SET':
+            folder = utils.get_texture_set_name(filename, kw_map or utils.DEFAULT_KEYWORD_MAP) or mat.name
+        packed[image.name_full] = (image, bpy.path.clean_name(folder), filename)
+    return packed
+
+
+def _same_content(path, data):
+    if os.path.getsize(path) != len(data):
+        return False
+    with open(path, "rb") as f:
+        return f.read() == data
+
+
+def _unique_path(path, data, taken):
+    """
+    'path', or 'name_1.ext'... if taken in this run or an existing file
+    with other content. Existing identical files are reused, never
+    overwritten.
+    """
+    base, ext = os.path.splitext(path)
+    index = 1
+    while path in taken or (os.path.exists(path) and not _same_content(path, data)):
+        path = f"{base}_{index}{ext}"
+        index += 1
+    taken.add(path)
+    return path
+
+
+def _write_file(path, data):
+    """Worker thread: writes the bytes atomically. No bpy access here."""
+    if os.path.exists(path):
+        return path # Idêntico (ver _unique_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + ".part"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+    return path
+
+
+@diagnostics.profiled("packing.unpack")
+def unpack_images(materials, directory, group_by='MATERIAL', relative=True, kw_map=None):
+    """
+    Writes the packed images of the materials to 'directory' (one
+    subfolder per material or texture set) from parallel threads, then
+    relinks them to the files and frees the packed data. The packed bytes
+    are read on the main thread; at most MAX_PENDING_BYTES wait for the
+    writers at a time. Returns (count, freed_bytes, errors).
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED # Só quando usado
+
+    root = bpy.path.abspath(directory)
+    packed = collect_packed_images(materials, group_by, kw_map)
+    if not packed:
+        return 0, 0, []
+
+    jobs = {} # future -> (image name, size)
+    written = []
+    errors = []
+    taken = set()
+
+    def collect(futures):
+        for future in futures:
+            name, size = jobs.pop(future)
+            try:
+                written.append((name, future.result(), size))
+            except OSError as e:
+                errors.append(f"{name}: {e}")
+
+    with ThreadPoolExecutor(max_workers=WRITE_MAX_WORKERS) as pool:
+        for name, (image, folder, filename) in packed.items():
+            data = image.packed_file.data
+            path = _unique_path(os.path.join(root, folder, filename), data, taken)
+            jobs[pool.submit(_write_file, path, data)] = (name, len(data))
+            while jobs and sum(size for _, size in jobs.values()) > MAX_PENDING_BYTES:
+                collect(wait(jobs, return_when=FIRST_COMPLETED)[0])
+        collect(list(jobs))
+
+    relinked = 0
+    freed = 0
+    for name, path, size in written:
+        image = bpy.data.images.get(name)
+        if not image or not image.packed_file:
+            continue
+        image.unpack(method='REMOVE')
+        image.filepath = bpy.path.relpath(path) if relative and bpy.data.filepath else path
+        relinked += 1
+        freed += size
+        logger.debug("Unpack: '%s' -> %s", name, path)
+
+    diagnostics.count("packing.unpacked", relinked)
+    return relinked, freed, errors
+
+
+@diagnostics.profiled("packing.pack")
+def pack_images(materials):
+    """
+    Packs only the images the materials' image nodes use (for delivery),
+    leaving every other image of the file alone.
+    Returns (count, packed_bytes, errors).
+    """
+    count = 0
+    added = 0
+    errors = []
+    for mat, image in _iter_material_images(materials):
+        if image.source != 'FILE' or image.packed_file or image.library:
+            continue
+        try:
+            image.pack()
+        except RuntimeError as e:
+            errors.append(f"{image.name}: {e}")
+            continue
+        count += 1
+        added += image.packed_file.size
+    diagnostics.count("packing.packed", count)
+    return count, added, errors
@@ -1,6 +1,7 @@
 # File: k_tools_texture_map_loader/preferences.py
 
 import bpy
+from bpy.app.handlers import persistent
 from bpy.types import (
     AddonPreferences,
     PropertyGroup,
@@ -11,8 +12,12 @@ from bpy.props import (
     StringProperty,
     CollectionProperty,
     IntProperty,
-    EnumProperty
+    EnumProperty,
+    BoolProperty,
+    FloatProperty
 )
+from . import diagnostics
+from . import colorspace
 
 # 1. Default keywords dictionary
 DEFAULT_KEYWORDS = {
@@ -21,7 +26,7 @@ DEFAULT_KEYWORDS = {
     "Metalness":        (["metalness", "Metallic", "metallic", "_MET"], 'UTILITY'),
     "Roughness":        (["rough", "gloss", "Roughness", "_Rgh", "glossiness"], 'UTILITY'),
     "Alpha":            (["alpha", "opacity", "mask", "alphamask", "opacitymask"], 'UTILITY'),
-    "Normal":           (["normal", "nrm", "Normal", "NormlGL", "NormalDX", "_NOR"], 'UTILITY'),
+    "Normal":           (["normal", "nrm", "Normal", "NormlGL", "NormalGL", "NormalDX", "_NOR"], 'UTILITY'),
     "Displacement":     (["disp", "height", "Displacement"], 'UTILITY'),
     "Transmission":     (["transmission", "transmissive", "refraction"], 'UTILITY'),
     "AmbientOcclusion": (["AmbientOcclusion", "ao"], 'UTILITY'),
@@ -30,12 +35,40 @@ DEFAULT_KEYWORDS = {
     "Packed":           (["ORM", "ARM"], 'UTILITY'),
 }
 
+# Default bit-depth policy per map type (types not listed keep their depth)
+DEFAULT_PRECISION = {
+    "Normal":           'HALF',
+    "Roughness":        'BYTE',
+    "Metalness":        'BYTE',
+    "AmbientOcclusion": 'BYTE',
+    "Alpha":            'BYTE',
+}
+
+PRECISION_ITEMS = [
+    ('KEEP', "Keep", "Keep the file's bit depth (e.g. float for displacement)"),
+    ('HALF', "Half", "Store float images at 16-bit half precision"),
+    ('BYTE', "8-bit", "Replace float data maps by a cached 8-bit copy"),
+]
+
+
+# Bumped whenever the keyword list changes, so cached keyword maps
+# (see utils.get_keyword_map) know when to rebuild.
+_keyword_version = 0
+
+def get_keyword_version():
+    return _keyword_version
+
+def bump_keyword_version(self=None, context=None):
+    global _keyword_version
+    _keyword_version += 1
+
 
 # 2. Helper function to populate the list
 def populate_default_keywords(prefs, force=False):
     """
     Populates the keyword_list with defaults.
     """
+    bump_keyword_version()
     if force:
         prefs.keyword_list.clear()
 
@@ -46,6 +79,7 @@ def populate_default_keywords(prefs, force=False):
             item.keywords = ", ".join(keywords)
             # This assignment will now work
             item.data_type = data_type 
+            item.precision = DEFAULT_PRECISION.get(map_type, 'KEEP')
 
 
 # 3. PropertyGroup for each item in the collection
@@ -55,13 +89,15 @@ class TML_MapTypeKeywords(PropertyGroup):
     map_type: StringProperty(
         name="Map Type",
         description="The type of texture map (e.g., Diffuse, Normal)",
-        default="Diffuse"
+        default="Diffuse",
+        update=bump_keyword_version
     ) # type: ignore
     
     keywords: StringProperty(
         name="Keywords",
         description="Comma-separated list of keywords to identify this map type",
-        default="diff, albedo"
+        default="diff, albedo",
+        update=bump_keyword_version
     ) # type: ignore
 
     # --- CORREÇÃO AQUI ---
@@ -75,6 +111,15 @@ class TML_MapTypeKeywords(PropertyGroup):
             ('UTILITY', "Utility", "Use Non-Color data space (e.g., Normal, Roughness)"),
         ],
         default='UTILITY',
+        update=bump_keyword_version
+    ) # type: ignore
+
+    precision: EnumProperty(
+        name="Bit Depth",
+        description="How images of this map type are stored once loaded",
+        items=PRECISION_ITEMS,
+        default='KEEP',
+        update=bump_keyword_version
     ) # type: ignore
 
 
@@ -95,7 +140,9 @@ class TML_UL_KeywordList(UIList):
             
             # This will now draw correctly
             # (Changed to emboss=False for UI consistency)
+            split = split.split(factor=0.5)
             split.prop(item, "data_type", text="", emboss=False)
+            split.prop(item, "precision", text="", emboss=False)
             
         elif self.layout_type == 'GRID':
             layout.alignment = 'CENTER'
@@ -115,7 +162,8 @@ class TML_OT_KeywordListAdd(Operator):
         item.map_type = "NewMap"
         item.keywords = "keyword1"
         item.data_type = 'UTILITY' # This assignment will now work
-        
+        bump_keyword_version()
+
         prefs.active_keyword_index = len(prefs.keyword_list) - 1
         return {'FINISHED'}
 
@@ -134,6 +182,7 @@ class TML_OT_KeywordListRemove(Operator):
         prefs = context.preferences.addons[__package__].preferences
         index = prefs.active_keyword_index
         prefs.keyword_list.remove(index)
+        bump_keyword_version()
         
         if index > 0:
             prefs.active_keyword_index = index - 1
@@ -157,6 +206,32 @@ class TML_OT_KeywordListRestore(Operator):
         return {'FINISHED'}
 
 
+def update_log_level(self, context):
+    diagnostics.setup_logging(self.log_level)
+
+
+def update_profiling(self, context):
+    diagnostics.set_enabled(self.profiling_enabled)
+
+
+def update_colorspace(self, context):
+    colorspace.on_preferences_changed(self)
+
+
+def update_watch(self, context):
+    from . import utils # utils -> preferences
+    if self.watch_textures or utils.get_loaded_module("watcher"):
+        from . import watcher # Só quando usado
+        watcher.set_enabled(self.watch_textures, self.watch_interval)
+
+
+def update_render_lod(self, context):
+    from . import utils # utils -> preferences
+    if self.render_lod or utils.get_loaded_module("lod"):
+        from . import lod # Só quando usado: lod -> utils -> preferences
+        lod.set_enabled(self.render_lod)
+
+
 class TML_Preferences(AddonPreferences):
     """Defines the preferences for the Texture Map Loader addon."""
     
@@ -176,16 +251,122 @@ class TML_Preferences(AddonPreferences):
 
     color_space_color: StringProperty(
             name="Color Data Default",
-            description="The default color space to set for 'Color' data types (e.g., Diffuse, Emission)",
+            description="The default color space to set for 'Color' data types (e.g., Diffuse, Emission). Names missing from the active OCIO config are resolved through known aliases (e.g. 'sRGB' -> 'Utility - sRGB - Texture')",
             default="sRGB",
+            search=colorspace.search_colorspaces,
+            update=update_colorspace,
         ) # type: ignore
         
     color_space_utility: StringProperty(
             name="Utility Data Default",
-            description="The default color space to set for 'Utility' data types (e.g., Normal, Roughness)",
+            description="The default color space to set for 'Utility' data types (e.g., Normal, Roughness). Names missing from the active OCIO config are resolved through known aliases (e.g. 'Non-Color' -> 'Raw')",
             default="Non-Color",
+            search=colorspace.search_colorspaces,
+            update=update_colorspace,
         ) # type: ignore
 
+    normal_convention_mode: EnumProperty(
+        name="DirectX Normals",
+        description="How DirectX normal maps are detected at load time. Detected maps are replaced by an OpenGL copy (green channel flipped, cached on disk)",
+        items=[
+            ('OFF', "Off", "Leave normal maps untouched"),
+            ('FILENAME', "Filename", "Detect DirectX normal maps from the filename (e.g. '_NormalDX', '_dx')"),
+            ('FILENAME_PIXELS', "Filename + Pixels", "Use the filename, then fall back to pixel statistics (decodes the image)"),
+        ],
+        default='FILENAME',
+    ) # type: ignore
+
+    collapse_constant_maps: BoolProperty(
+        name="Collapse Constant Maps",
+        description="After loading, replace flat textures (e.g. a pure black Metalness map) with value nodes and free their memory",
+        default=False,
+    ) # type: ignore
+
+    analyze_alpha_coverage: BoolProperty(
+        name="Skip Opaque Alpha",
+        description="Scan alpha coverage at load time: fully opaque color maps get Alpha Mode 'None' and all-white Alpha maps are not wired into the BSDF. Reads every pixel of the maps with an alpha channel",
+        default=False,
+    ) # type: ignore
+
+    prune_unused_slots: EnumProperty(
+        name="Prune Empty Slots",
+        description="After loading into a Maps Loader, mute or strip its empty slots so they are not compiled into the shader",
+        items=[
+            ('OFF', "Off", "Keep every slot"),
+            ('MUTE', "Mute", "Mute the empty slots and the nodes only they feed, and disconnect them from the group output"),
+            ('STRIP', "Strip", "Disconnect the empty slots from the group output"),
+        ],
+        default='OFF',
+    ) # type: ignore
+
+    reclaim_replaced_images: EnumProperty(
+        name="Replaced Images",
+        description="What to do with the images replaced by Load Texture Set once nothing uses them anymore",
+        items=[
+            ('OFF', "Keep", "Keep them until the file is saved and reopened (reclaim manually from the panel)"),
+            ('FREE', "Free Buffers", "Free their pixel buffers right after loading"),
+            ('REMOVE', "Purge", "Delete them right after loading"),
+        ],
+        default='OFF',
+    ) # type: ignore
+
+    watch_textures: BoolProperty(
+        name="Watch Texture Files",
+        description="Reload the images of K-Tools Loader nodes when their files change on disk (e.g. re-exported from Substance)",
+        default=False,
+        update=update_watch,
+    ) # type: ignore
+
+    watch_interval: FloatProperty(
+        name="Interval",
+        description="Seconds between checks of the watched files",
+        default=1.0,
+        min=0.25, max=10.0,
+        update=update_watch,
+    ) # type: ignore
+
+    transcode_cache: BoolProperty(
+        name="Fast-Load Cache",
+        description="Transcode loaded TIFFs and compressed EXRs once, in background Blender processes, into uncompressed copies that decode quickly; the images then point at the copies",
+        default=False,
+    ) # type: ignore
+
+    transcode_cache_dir: StringProperty(
+        name="Cache Folder",
+        description="Where the transcoded copies are stored (empty: the extension's user folder)",
+        subtype='DIR_PATH',
+        default="",
+    ) # type: ignore
+
+    render_lod: BoolProperty(
+        name="Render Texture LOD",
+        description="At render time, swap the textures of K-Tools Loaders for the smallest resolution tier ('_1k', '_2k', '_4k'... next to the file) that covers the objects' projected size from the camera; restored after each frame. Turns on Lock Interface, which LOD needs",
+        default=False,
+        update=update_render_lod,
+    ) # type: ignore
+
+    lod_bias: FloatProperty(
+        name="LOD Bias",
+        description="Multiplier of the projected size before choosing a tier (above 1 picks larger textures)",
+        default=1.0,
+        min=0.25, max=4.0,
+    ) # type: ignore
+
+    log_level: EnumProperty(
+        name="Log Level",
+        description="Minimum level of the messages printed to the console",
+        items=diagnostics.LOG_LEVEL_ITEMS,
+        default=diagnostics.DEFAULT_LOG_LEVEL,
+        update=update_log_level,
+    ) # type: ignore
+
+    profiling_enabled: BoolProperty(
+        name="Enable Profiling",
+        description="Record timings and counters of operators, panel drawing, classification and asset loading",
+        default=False,
+        update=update_profiling,
+    ) # type: ignore
+
     def draw(self, context):
         layout = self.layout
         box = layout.box()
@@ -196,7 +377,9 @@ class TML_Preferences(AddonPreferences):
         split.label(text="Map Type:")
         split = split.split(factor=0.6)
         split.label(text="Keywords:")
+        split = split.split(factor=0.5)
         split.label(text="Data Type:") # This header was already correct
+        split.label(text="Bit Depth:")
         
         # Draw the UIList
         box.template_list(
@@ -225,6 +408,45 @@ class TML_Preferences(AddonPreferences):
         row = box.row()
         row.prop(self, "color_space_utility")
 
+        box = layout.box()
+        box.label(text="Load Options:")
+        row = box.row()
+        row.prop(self, "normal_convention_mode")
+        row = box.row()
+        row.prop(self, "collapse_constant_maps")
+        row = box.row()
+        row.prop(self, "analyze_alpha_coverage")
+        row = box.row()
+        row.prop(self, "prune_unused_slots")
+        row = box.row()
+        row.prop(self, "reclaim_replaced_images")
+        row = box.row()
+        row.prop(self, "watch_textures")
+        sub = row.row()
+        sub.active = self.watch_textures
+        sub.prop(self, "watch_interval")
+        row = box.row()
+        row.prop(self, "transcode_cache")
+        sub = row.row()
+        sub.active = self.transcode_cache
+        sub.prop(self, "transcode_cache_dir")
+        row = box.row()
+        row.prop(self, "render_lod")
+        sub = row.row()
+        sub.active = self.render_lod
+        sub.prop(self, "lod_bias")
+
+
+        box = layout.box()
+        box.label(text="Diagnostics:", icon='TIME')
+        row = box.row()
+        row.prop(self, "log_level")
+        row.prop(self, "profiling_enabled")
+        if self.profiling_enabled:
+            diagnostics.draw_stats(box)
+            row = box.row(align=True)
+            row.operator("tml.export_profile", icon='EXPORT', text="Export JSON")
+            row.operator("tml.reset_profile", icon='X', text="Reset")
 
         box = layout.box()
         box.label(text="Support and Documentation", icon='INFO')
@@ -251,19 +473,67 @@ classes = (
 )
 
 
+_initialized = False
+
+def ensure_initialized():
+    """
+    One-time setup that needs the user preferences (default keywords,
+    log level, profiling). Kept out of register() so enabling the addon
+    stays cheap; runs on the first timer tick, after a file load, or on
+    the first utils.get_addon_preferences / get_keyword_map call (so
+    headless scripts, where the timer never fires, get it too).
+    """
+    global _initialized
+    if _initialized:
+        return
+    prefs_addon = bpy.context.preferences.addons.get(__package__)
+    if not prefs_addon:
+        return
+    _initialized = True
+    prefs = prefs_addon.preferences
+    populate_default_keywords(prefs)
+    diagnostics.setup_logging(prefs.log_level)
+    diagnostics.set_enabled(prefs.profiling_enabled)
+    # Watcher e LOD só são importados quando ligados
+    if prefs.watch_textures:
+        update_watch(prefs, bpy.context)
+    if prefs.render_lod:
+        update_render_lod(prefs, bpy.context)
+
+
+def _deferred_init():
+    ensure_initialized()
+    return None # Não repetir o timer
+
+
+@persistent
+def _on_load_post(*args):
+    ensure_initialized()
+    # O transcode só é importado para arquivos com cópias transcodificadas
+    if any("tml_source_hash" in image for image in bpy.data.images):
+        from . import transcode # Só quando usado
+        transcode.on_file_loaded()
+
+
 def register():
     """Registers all addon classes."""
     for cls in classes:
         bpy.utils.register_class(cls)
-    
-    # Try to populate defaults on registration
-    # Use .get() for safety
-    prefs_addon = bpy.context.preferences.addons.get(__package__)
-    if prefs_addon:
-        populate_default_keywords(prefs_addon.preferences)
+
+    # Defaults are populated later, outside the enable path
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+    bpy.app.timers.register(_deferred_init, first_interval=0)
 
 
 def unregister():
     """Unregisters all addon classes."""
+    global _initialized
+    _initialized = False
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if bpy.app.timers.is_registered(_deferred_init):
+        bpy.app.timers.unregister(_deferred_init)
+
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
\ No newline at end of file
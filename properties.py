@@ -1,8 +1,8 @@
 # File: k_tools_texture_map_loader/properties.py
 
 import bpy
-from bpy.props import BoolProperty, PointerProperty, StringProperty
-from bpy.types import PropertyGroup, Node
+from bpy.props import BoolProperty, PointerProperty, StringProperty, CollectionProperty, IntProperty
+from bpy.types import PropertyGroup, Node, NodeTree, Image
 
 # 1. Define the Property Group
 class TML_NodeProperties(PropertyGroup):
@@ -26,10 +26,53 @@ class TML_NodeProperties(PropertyGroup):
     
     # A 'image_proxy' foi removida
 
+    constant_image_path: StringProperty(
+        name="Constant Image Path",
+        description="Source of an image replaced by a constant value node",
+        default=""
+    ) # type: ignore
+
+
+# Variants: several texture sets remembered per node tree (Loader group
+# or material); switching reassigns the stored images to the nodes.
+class TML_VariantSlot(PropertyGroup):
+    node_name: StringProperty(
+        name="Node Name",
+        description="Image Texture node this image is assigned to",
+        default=""
+    ) # type: ignore
+
+    image: PointerProperty(
+        type=Image,
+        name="Image"
+    ) # type: ignore
+
+
+class TML_Variant(PropertyGroup):
+    slots: CollectionProperty(type=TML_VariantSlot) # type: ignore
+
+    keep_loaded: BoolProperty(
+        name="Keep Loaded",
+        description="Keep the images of this variant decoded while another variant is active, for instant switching",
+        default=True
+    ) # type: ignore
+
+
+class TML_VariantSet(PropertyGroup):
+    variants: CollectionProperty(type=TML_Variant) # type: ignore
+
+    active_index: IntProperty(
+        name="Active Variant",
+        default=-1
+    ) # type: ignore
+
 
 # 2. Define classes and register/unregister functions
 classes = (
     TML_NodeProperties,
+    TML_VariantSlot,
+    TML_Variant,
+    TML_VariantSet,
 )
 
 def register():
@@ -43,6 +86,10 @@ def register():
         type=TML_NodeProperties,
         name="TML Node Properties"
     )
+    NodeTree.tml_variants = PointerProperty(
+        type=TML_VariantSet,
+        name="TML Variants"
+    )
 
 def unregister():
     """
@@ -52,6 +99,10 @@ def unregister():
         del Node.tml_props
     except (AttributeError, TypeError):
         pass
+    try:
+        del NodeTree.tml_variants
+    except (AttributeError, TypeError):
+        pass
 
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
\ No newline at end of file
@@ -0,0 +1,133 @@
+# File: k_tools_texture_map_loader/pruning.py
+
+from . import assets
+from . import image_analysis
+from . import diagnostics
+from .diagnostics import logger
+
+# ID property (on the Loader node tree) recording what was pruned
+PRUNED_PROP = "tml_pruned"
+# Removed links are stored as "from_node<TAB>from_socket<TAB>to_node<TAB>to_socket"
+LINK_SEPARATOR = "\t"
+
+PRUNE_MODE_ITEMS = [
+    ('MUTE', "Mute", "Mute the empty Image Texture nodes and the nodes only they feed, and disconnect them from the group output"),
+    ('STRIP', "Strip", "Disconnect the empty slots from the group output so their nodes are not compiled"),
+]
+
+
+def is_loader_tree(node_tree):
+    return node_tree is not None and node_tree.name.startswith(assets.MAPS_LOADER_GROUP_NAME)
+
+
+def get_empty_slots(node_tree):
+    """Image Texture nodes with no image and no constant replacement."""
+    return [
+        node for node in node_tree.nodes
+        if node.type == 'TEX_IMAGE' and not node.image
+        and not image_analysis.has_constant_replacement(node_tree, node.name)
+    ]
+
+
+def find_exclusive_nodes(node_tree, seeds):
+    """
+    Nodes that only get data from the seed nodes (e.g. the Normal Map or
+    Separate Color node behind an empty slot). Group Input links are
+    ignored, since every slot shares them. Returns a set of node names.
+    """
+    incoming = {}
+    for link in node_tree.links:
+        incoming.setdefault(link.to_node.name, []).append(link.from_node)
+
+    exclusive = {node.name for node in seeds}
+    changed = True
+    while changed:
+        changed = False
+        for node in node_tree.nodes:
+            if node.name in exclusive or node.type in {'GROUP_INPUT', 'GROUP_OUTPUT'}:
+                continue
+            sources = [n for n in incoming.get(node.name, ()) if n.type != 'GROUP_INPUT']
+            if sources and all(n.name in exclusive for n in sources):
+                exclusive.add(node.name)
+                changed = True
+    return exclusive
+
+
+def is_pruned(node_tree):
+    return PRUNED_PROP in node_tree
+
+
+def prune_tree(node_tree, mode='STRIP'):
+    """
+    Mutes or strips the unused slots of a Loader tree. What was changed is
+    stored on the tree so restore_tree can undo it. A tree that was
+    already pruned is restored first. Returns the number of empty slots.
+    """
+    restore_tree(node_tree)
+    seeds = get_empty_slots(node_tree)
+    if not seeds:
+        return 0
+
+    exclusive = find_exclusive_nodes(node_tree, seeds)
+    record = {"mode": mode, "links": [], "muted": []}
+    if mode == 'MUTE':
+        for name in exclusive:
+            node = node_tree.nodes[name]
+            if not node.mute:
+                node.mute = True
+                record["muted"].append(name)
+    # Links que saem do subgrafo exclusivo: sem eles o subgrafo não é
+    # compilado. Também no MUTE: um nó mudo passa a entrada adiante
+    # (o Vector de um Image Texture sairia como Color)
+    boundary = [l for l in node_tree.links
+                if l.from_node.name in exclusive and l.to_node.name not in exclusive]
+    for link in boundary:
+        record["links"].append(LINK_SEPARATOR.join((link.from_node.name, link.from_socket.identifier,
+                                                    link.to_node.name, link.to_socket.identifier)))
+        node_tree.links.remove(link)
+
+    node_tree[PRUNED_PROP] = record
+    diagnostics.count("prune.slots", len(seeds))
+    logger.debug("Pruned %d empty slot(s) (%d nodes) in '%s'", len(seeds), len(exclusive), node_tree.name)
+    return len(seeds)
+
+
+def _find_socket(sockets, identifier):
+    for socket in sockets:
+        if socket.identifier == identifier:
+            return socket
+    return None
+
+
+def restore_tree(node_tree):
+    """Undoes prune_tree. Returns True if something was restored."""
+    if PRUNED_PROP not in node_tree:
+        return False
+    record = node_tree[PRUNED_PROP]
+    nodes = node_tree.nodes
+    for name in record.get("muted", ()):
+        node = nodes.get(name)
+        if node:
+            node.mute = False
+    for entry in record.get("links", ()):
+        from_name, from_id, to_name, to_id = entry.split(LINK_SEPARATOR)
+        from_node = nodes.get(from_name)
+        to_node = nodes.get(to_name)
+        if not (from_node and to_node):
+            continue
+        from_socket = _find_socket(from_node.outputs, from_id)
+        to_socket = _find_socket(to_node.inputs, to_id)
+        if from_socket and to_socket:
+            node_tree.links.new(from_socket, to_socket)
+    del node_tree[PRUNED_PROP]
+    return True
+
+
+def iter_loader_trees(material):
+    """Node trees of the Maps Loader copies used by a material."""
+    seen = set()
+    for node in material.node_tree.nodes:
+        tree = node.node_tree if node.type == 'GROUP' else None
+        if is_loader_tree(tree) and tree.name_full not in seen and not tree.library:
+            seen.add(tree.name_full)
+            yield tree
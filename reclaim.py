@@ -0,0 +1,134 @@
+# File: k_tools_texture_map_loader/reclaim.py
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy.props import EnumProperty
+from bpy.types import Operator
+from . import utils
+from . import diagnostics
+from .diagnostics import logger
+
+# Names (name_full) of images the loader replaced on a node. Names are
+# kept instead of references, which become invalid after undo.
+_replaced_images = set()
+
+
+def track_replaced(image):
+    """Records an image that was replaced by the loader."""
+    if image:
+        _replaced_images.add(image.name_full)
+
+
+def get_replaced_images():
+    """Returns the tracked images that still exist in bpy.data."""
+    images = []
+    for name in list(_replaced_images):
+        image = bpy.data.images.get(name)
+        if image is None:
+            _replaced_images.discard(name)
+        else:
+            images.append(image)
+    return images
+
+
+def get_orphaned_replaced_images():
+    """Tracked images that no longer have any user."""
+    return [img for img in get_replaced_images() if img.users == 0]
+
+
+def get_reclaimable_bytes():
+    return sum(utils.get_image_memory_bytes(img) for img in get_orphaned_replaced_images() if img.has_data)
+
+
+def reclaim(mode='REMOVE'):
+    """
+    Reclaims the memory of replaced images that reached zero users.
+    'REMOVE' deletes the datablocks, 'FREE' only frees their pixel
+    buffers (they reload on demand). Either way the image is no longer
+    tracked; images still in use are kept and stay tracked.
+    Returns (image_count, bytes_reclaimed).
+    """
+    count = 0
+    reclaimed = 0
+    for image in get_orphaned_replaced_images():
+        if image.has_data:
+            reclaimed += utils.get_image_memory_bytes(image)
+        name = image.name_full
+        if mode == 'REMOVE':
+            bpy.data.images.remove(image)
+        else:
+            image.buffers_free()
+        _replaced_images.discard(name) # Liberada: fora do resumo e do poll
+        count += 1
+
+    diagnostics.count("reclaim.images", count)
+    logger.info("Reclaimed %d replaced image(s), %s.", count, utils.format_bytes(reclaimed))
+    return count, reclaimed
+
+
+RECLAIM_MODE_ITEMS = [
+    ('REMOVE', "Purge", "Delete replaced images that have no users left"),
+    ('FREE', "Free Buffers", "Free the pixel buffers of replaced images that have no users left, keeping the datablocks"),
+]
+
+
+class TML_OT_ReclaimReplacedImages(Operator):
+    """
+    Frees the images replaced by Load Texture Set that are no longer
+    used by anything.
+    """
+    bl_idname = "tml.reclaim_replaced_images"
+    bl_label = "Reclaim Replaced Images"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: EnumProperty(
+        name="Mode",
+        items=RECLAIM_MODE_ITEMS,
+        default='REMOVE',
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return bool(_replaced_images)
+
+    @diagnostics.profiled_method("op.reclaim_replaced_images")
+    def execute(self, context):
+        count, reclaimed = reclaim(self.mode)
+        self.report({'INFO'}, f"Reclaimed {count} image(s), {utils.format_bytes(reclaimed)}.")
+        return {'FINISHED'}
+
+
+def draw_reclaim(layout):
+    """Draws the replaced-images summary (nothing if none are tracked)."""
+    if not _replaced_images:
+        return
+    orphans = get_orphaned_replaced_images()
+    if not orphans:
+        return
+    size = sum(utils.get_image_memory_bytes(img) for img in orphans if img.has_data)
+    row = layout.row(align=True)
+    row.label(text=f"{len(orphans)} replaced image(s), {utils.format_bytes(size)}", icon='ORPHAN_DATA')
+    row.operator_menu_enum(TML_OT_ReclaimReplacedImages.bl_idname, "mode", text="Reclaim")
+
+
+@persistent
+def _on_load_post(*args):
+    _replaced_images.clear()
+
+
+classes = (
+    TML_OT_ReclaimReplacedImages,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    _replaced_images.clear()
@@ -0,0 +1,165 @@
+# File: k_tools_texture_map_loader/relink.py
+
+import bpy
+import os
+from . import utils
+from . import builder
+from . import diagnostics
+from .diagnostics import logger
+
+
+class FileIndex:
+    """
+    filename -> paths index of a search root, built with one parallel
+    scandir sweep (builder.scan_texture_folder). The (texture set, map
+    type) index used as fallback is only built if needed.
+    """
+
+    def __init__(self, root, kw_map):
+        self.kw_map = kw_map
+        self.by_name = {}
+        self._by_set = None
+        self.listing = builder.scan_texture_folder(root, recursive=True)
+        for dirpath, filenames in self.listing.items():
+            for filename in filenames:
+                self.by_name.setdefault(filename.lower(), []).append(os.path.join(dirpath, filename))
+
+    def __len__(self):
+        return sum(len(paths) for paths in self.by_name.values())
+
+    @property
+    def by_set(self):
+        if self._by_set is None:
+            self._by_set = {}
+            for dirpath, filenames in self.listing.items():
+                for filename in filenames:
+                    key = _set_key(filename, self.kw_map)
+                    if key:
+                        self._by_set.setdefault(key, []).append(os.path.join(dirpath, filename))
+        return self._by_set
+
+
+def _set_key(filename, kw_map, map_type=None):
+    set_name = utils.get_texture_set_name(filename, kw_map)
+    if not set_name:
+        return None
+    if map_type is None or map_type == "Unknown":
+        map_type = utils.get_file_map_info(filename, kw_map)[0]
+    return (set_name.lower(), map_type)
+
+
+def _suffix_score(old_path, candidate):
+    """
+    Number of trailing folder names the two paths have in common. The old
+    path may come from another OS (a .blend saved on Windows): backslashes
+    are separators before splitting off the filename.
+    """
+    old_parts = os.path.normpath(old_path).replace("\\", "/").rpartition("/")[0].lower().split("/")
+    new_parts = os.path.normpath(candidate).replace("\\", "/").rpartition("/")[0].lower().split("/")
+    score = 0
+    for a, b in zip(reversed(old_parts), reversed(new_parts)):
+        if a != b:
+            break
+        score += 1
+    return score
+
+
+def _has_files(index, dirpath, filenames):
+    listed = {f.lower() for f in index.listing.get(dirpath, ())}
+    return all(f.lower() in listed for f in filenames)
+
+
+def _best_candidate(old_path, candidates):
+    if len(candidates) == 1:
+        return candidates[0]
+    return max(sorted(candidates), key=lambda c: _suffix_score(old_path, c))
+
+
+UDIM_TOKEN = "<UDIM>"
+
+
+def get_tile_paths(image, path):
+    """
+    The files of an image: one per tile for a UDIM (TILED) image whose
+    path has the <UDIM> token, else just 'path'.
+    """
+    if image.source != 'TILED' or UDIM_TOKEN not in path:
+        return [path]
+    return [path.replace(UDIM_TOKEN, str(tile.number)) for tile in image.tiles]
+
+
+def find_missing_images(kw_map):
+    """
+    Images with a missing file used by the image nodes of all materials
+    and node groups (each tree visited once). A UDIM image is missing if
+    any of its tiles is.
+    Returns {image name: (image, map type of the first node using it)}.
+    """
+    trees = [mat.node_tree for mat in bpy.data.materials if mat.node_tree]
+    trees.extend(bpy.data.node_groups)
+    missing = {}
+    checked = set()
+    for tree in trees:
+        if tree.library:
+            continue
+        for node in utils.find_image_nodes_in_tree(tree):
+            image = node.image
+            if not image or image.name_full in checked:
+                continue
+            checked.add(image.name_full)
+            if image.source not in {'FILE', 'TILED'} or image.packed_file or image.library:
+                continue
+            if all(os.path.exists(p) for p in get_tile_paths(image, bpy.path.abspath(image.filepath))):
+                continue
+            missing[image.name_full] = (image, utils.get_node_map_info(node, kw_map)[0])
+    return missing
+
+
+@diagnostics.profiled("relink.relink_missing")
+def relink_missing(search_root, kw_map=None, relative=False):
+    """
+    Relinks every missing image to a file found under 'search_root'.
+    Matches by filename first (ties broken by the closest folder
+    structure), then by texture set name + map type (e.g. a file saved
+    as .jpg instead of .png). UDIM images are matched by filename only,
+    in a folder holding all of their tiles. Usable headless:
+
+        blender -b scene.blend --python-expr "import bpy; bpy.ops.tml.relink_missing(directory='/new/server')"
+
+    Returns (relinked_count, still_missing_names).
+    """
+    if kw_map is None:
+        kw_map = utils.DEFAULT_KEYWORD_MAP
+    missing = find_missing_images(kw_map)
+    if not missing:
+        return 0, []
+
+    index = FileIndex(search_root, kw_map)
+    logger.info("Relink: %d missing image(s), %d file(s) indexed under '%s'", len(missing), len(index), search_root)
+
+    relinked = 0
+    not_found = []
+    for name, (image, node_map_type) in missing.items():
+        old_path = bpy.path.abspath(image.filepath)
+        filename = os.path.basename(old_path.replace("\\", "/"))
+        tiles = [os.path.basename(p) for p in get_tile_paths(image, filename)]
+        if len(tiles) > 1 or tiles[0] != filename:
+            # UDIM: pastas com todos os tiles; nunca por set (seria um tile só)
+            candidates = [os.path.join(os.path.dirname(p), filename)
+                          for p in index.by_name.get(tiles[0].lower(), [])
+                          if _has_files(index, os.path.dirname(p), tiles)]
+        else:
+            candidates = index.by_name.get(filename.lower())
+            if not candidates:
+                key = _set_key(filename, kw_map, node_map_type)
+                candidates = index.by_set.get(key) if key else None
+        if not candidates:
+            not_found.append(name)
+            continue
+        new_path = _best_candidate(old_path, candidates)
+        image.filepath = bpy.path.relpath(new_path) if relative and bpy.data.filepath else new_path
+        relinked += 1
+        logger.debug("Relink: '%s' -> %s", name, new_path)
+
+    diagnostics.count("relink.images", relinked)
+    return relinked, not_found
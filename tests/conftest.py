@@ -0,0 +1,82 @@
+# File: k_tools_texture_map_loader/tests/conftest.py
+"""
+Unit tests of the pure-Python parts of the addon (parsers, packers,
+classification), run outside Blender against the stub 'bpy' of the
+benchmarks:
+
+    python -m pytest tests
+
+The addon package is imported from this checkout before the test
+modules, so they can import its modules directly.
+"""
+
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.dirname(TESTS_DIR)
+ADDON_NAME = "k_tools_texture_map_loader"
+
+sys.path.insert(0, os.path.join(ADDON_DIR, "benchmarks"))
+import stub_bpy # noqa: E402
+
+stub_bpy.install()
+
+
+def _import_addon():
+    if ADDON_NAME in sys.modules:
+        return sys.modules[ADDON_NAME]
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME, os.path.join(ADDON_DIR, "__init__.py"),
+        submodule_search_locations=[ADDON_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_import_addon()
+
+
+@pytest.fixture
+def kw_map():
+    """Keyword map of the default keyword list."""
+    from k_tools_texture_map_loader import utils
+    return utils.DEFAULT_KEYWORD_MAP
+
+
+@pytest.fixture
+def pixel_image():
+    """Factory of images holding a NumPy array (see make_pixel_image)."""
+    return make_pixel_image
+
+
+class StubPixels:
+    """image.pixels stand-in: foreach_get copies a NumPy array."""
+
+    def __init__(self, array):
+        self.array = array
+
+    def foreach_get(self, buf):
+        buf[:] = self.array.ravel()
+
+
+def make_pixel_image(array, is_float=False, is_data=True):
+    """
+    Generated image holding 'array' ((height, width, channels) floats),
+    for the pixel analysis functions (no file, so nothing is cached).
+    """
+    height, width, channels = array.shape
+    image = stub_bpy.StubImage("Pixels")
+    image.source = 'GENERATED'
+    image.size = (width, height)
+    image.channels = channels
+    image.is_float = is_float
+    image.colorspace_settings = types.SimpleNamespace(name="Non-Color" if is_data else "sRGB", is_data=is_data)
+    image.pixels = StubPixels(array)
+    return image
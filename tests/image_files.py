@@ -0,0 +1,72 @@
+# File: k_tools_texture_map_loader/tests/image_files.py
+"""
+Minimal image files for the header readers: only the bytes the readers
+look at (signature, size, channels, bit depth), no real pixel data.
+"""
+
+import struct
+import zlib
+
+
+def png_chunk(kind, data=b""):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(path, width=8, height=4, color_type=2, bits=8, trns=False, trns_after_idat=False):
+    """PNG with an IHDR and empty data chunks: enough for the header reader."""
+    ihdr = struct.pack(">IIBBBBB", width, height, bits, color_type, 0, 0, 0)
+    chunks = [png_chunk(b"IHDR", ihdr)]
+    if color_type == 3:
+        chunks.append(png_chunk(b"PLTE", b"\0\0\0" * 2))
+    if trns and not trns_after_idat:
+        chunks.append(png_chunk(b"tRNS", b"\0\0"))
+    chunks.append(png_chunk(b"IDAT", zlib.compress(b"")))
+    if trns and trns_after_idat:
+        chunks.append(png_chunk(b"tRNS", b"\0\0"))
+    chunks.append(png_chunk(b"IEND"))
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"".join(chunks))
+    return str(path)
+
+
+def write_jpeg(path, width=640, height=480, channels=3):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 8 + 3 * channels, 8, height, width, channels) + b"\0" * (3 * channels)
+    path.write_bytes(b"\xff\xd8" + app0 + sof + b"\xff\xd9")
+    return str(path)
+
+
+def exr_attribute(name, kind, value):
+    return name + b"\0" + kind + b"\0" + struct.pack("<i", len(value)) + value
+
+
+def write_exr(path, width=1024, height=512, channels=(b"B", b"G", b"R"), pixel_type=1, compression=4):
+    chlist = b"".join(name + b"\0" + struct.pack("<iB3xii", pixel_type, 0, 1, 1) for name in channels) + b"\0"
+    header = (exr_attribute(b"channels", b"chlist", chlist)
+              + exr_attribute(b"compression", b"compression", bytes([compression]))
+              + exr_attribute(b"dataWindow", b"box2i", struct.pack("<iiii", 10, 20, 10 + width - 1, 20 + height - 1))
+              + b"\0")
+    path.write_bytes(b"\x76\x2f\x31\x01" + struct.pack("<I", 2) + header)
+    return str(path)
+
+
+def write_tiff(path, width=640, height=480, samples=3, bits=16, order="<"):
+    """Classic TIFF: width as LONG, the rest as SHORT; BitsPerSample out of its entry past 2 samples."""
+    bits_field = None if samples > 2 else struct.pack(order + "HH", bits, bits if samples == 2 else 0)
+    entries = [
+        (256, 4, 1, struct.pack(order + "I", width)),
+        (257, 3, 1, struct.pack(order + "H", height) + b"\0\0"),
+        (258, 3, samples, bits_field),
+        (277, 3, 1, struct.pack(order + "H", samples) + b"\0\0"),
+    ]
+    ifd_offset = 8
+    values_offset = ifd_offset + 2 + 12 * len(entries) + 4
+    ifd = struct.pack(order + "H", len(entries))
+    for tag, kind, count, field in entries:
+        if field is None:
+            field = struct.pack(order + "I", values_offset)
+        ifd += struct.pack(order + "HHI", tag, kind, count) + field
+    ifd += struct.pack(order + "I", 0)
+    values = struct.pack(order + "H" * samples, *([bits] * samples))
+    magic = (b"II" if order == "<" else b"MM") + struct.pack(order + "HI", 42, ifd_offset)
+    path.write_bytes(magic + ifd + values)
+    return str(path)
@@ -0,0 +1,58 @@
+# File: k_tools_texture_map_loader/tests/test_api.py
+
+import types
+
+from k_tools_texture_map_loader import api
+
+
+def test_classify_filenames(kw_map):
+    result = api.classify_filenames(
+        ["Wood_Diffuse_2k.png", "Wood_Normal_2k.png", "Wood_ORM_2k.png"], kw_map)
+    assert result["Wood_Diffuse_2k.png"] == {
+        "map_type": "Diffuse", "data_type": 'COLOR', "set_name": "Wood_2k"}
+    assert result["Wood_Normal_2k.png"] == {
+        "map_type": "Normal", "data_type": 'UTILITY', "set_name": "Wood_2k"}
+    assert result["Wood_ORM_2k.png"]["map_type"] == "Packed"
+
+
+def test_classify_filenames_uses_basename(kw_map):
+    # Pastas com palavras-chave não contam, só o nome do arquivo
+    path = "/textures/normal/Stone_Rough.jpg"
+    result = api.classify_filenames([path], kw_map)
+    assert list(result) == [path]
+    assert result[path]["map_type"] == "Roughness"
+    assert result[path]["set_name"] == "Stone"
+
+
+def test_classify_filenames_unknown(kw_map):
+    result = api.classify_filenames(["readme.txt"], kw_map)
+    assert result["readme.txt"] == {
+        "map_type": "Unknown", "data_type": 'UTILITY', "set_name": None}
+
+
+def test_classify_filenames_custom_map():
+    kw_map = {"tint": ("Diffuse", 'COLOR')}
+    result = api.classify_filenames(["Cloth_tint.png", "Cloth_diffuse.png"], kw_map)
+    assert result["Cloth_tint.png"]["map_type"] == "Diffuse"
+    assert result["Cloth_diffuse.png"]["map_type"] == "Unknown"
+
+
+def test_apply_node_settings_skips_blend_without_box():
+    node = types.SimpleNamespace(interpolation='Linear', projection='FLAT',
+                                 projection_blend=0.0, extension='REPEAT')
+    api.apply_node_settings(node, {"interpolation": 'Closest', "projection_blend": 0.5,
+                                   "extension": None})
+    assert node.interpolation == 'Closest'
+    assert node.projection_blend == 0.0
+    assert node.extension == 'REPEAT'
+
+    api.apply_node_settings(node, {"projection": 'BOX', "projection_blend": 0.5})
+    assert (node.projection, node.projection_blend) == ('BOX', 0.5)
+
+
+def test_settings_from_reads_batch_settings():
+    props = types.SimpleNamespace(interpolation='Cubic', projection='FLAT',
+                                  projection_blend=0.2, extension='CLIP', other=1)
+    assert api.settings_from(props) == {
+        "interpolation": 'Cubic', "projection": 'FLAT',
+        "projection_blend": 0.2, "extension": 'CLIP'}
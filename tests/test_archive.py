@@ -0,0 +1,76 @@
+# File: k_tools_texture_map_loader/tests/test_archive.py
+
+import os
+import zipfile
+
+import pytest
+from k_tools_texture_map_loader import archive
+
+
+@pytest.fixture
+def texture_zip(tmp_path):
+    path = tmp_path / "textures.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("Wood/Wood_Color_2k.png", b"color" * 100)
+        zf.writestr("Wood/Wood_Normal_2k.png", b"normal" * 100)
+        zf.writestr("Wood/readme.txt", b"not an image")
+        zf.writestr("Metal/Metal_Roughness.jpg", b"rough")
+        zf.writestr("Metal/Copy_Roughness.jpg", b"rough")
+        zf.writestr("Stone_Diffuse.tga", b"stone")
+        zf.writestr("Empty/", b"")
+    return str(path)
+
+
+def test_read_directory_lists_images_only(texture_zip):
+    names = sorted(info.filename for info in archive.read_directory(texture_zip))
+    assert names == [
+        "Metal/Copy_Roughness.jpg", "Metal/Metal_Roughness.jpg", "Stone_Diffuse.tga",
+        "Wood/Wood_Color_2k.png", "Wood/Wood_Normal_2k.png",
+    ]
+
+
+def test_classify_members(texture_zip, kw_map):
+    sets = archive.classify_members(archive.read_directory(texture_zip), kw_map)
+    assert sorted(sets) == ["Metal/Copy", "Metal/Metal", "Stone", "Wood/Wood_2k"]
+    wood = sets["Wood/Wood_2k"]
+    assert wood["name"] == "Wood_2k"
+    assert wood["folder"] == "Wood"
+    assert wood["members"] == {"Diffuse": "Wood/Wood_Color_2k.png", "Normal": "Wood/Wood_Normal_2k.png"}
+    assert wood["bytes"] == 500 + 600
+    assert sets["Stone"]["folder"] == ""
+    assert sets["Stone"]["members"] == {"Diffuse": "Stone_Diffuse.tga"}
+
+
+def test_get_directory_cached_until_archive_changes(texture_zip):
+    first = archive.get_directory(texture_zip)
+    assert archive.get_directory(texture_zip) is first
+    with zipfile.ZipFile(texture_zip, "a") as zf:
+        zf.writestr("Tile_Normal.png", b"tile")
+    assert len(archive.get_directory(texture_zip)) == len(first) + 1
+
+
+def test_extract_members(texture_zip, tmp_path):
+    root = str(tmp_path / "cache")
+    names = ["Wood/Wood_Color_2k.png", "Metal/Metal_Roughness.jpg"]
+    paths = archive.extract_members(texture_zip, names, root=root)
+    assert sorted(paths) == sorted(names)
+    for name, path in paths.items():
+        assert os.path.basename(path) == os.path.basename(name)
+        with zipfile.ZipFile(texture_zip) as zf, open(path, "rb") as f:
+            assert f.read() == zf.read(name)
+    assert not [f for _, _, files in os.walk(root) for f in files if f.endswith(".part")]
+
+
+def test_extract_members_reuses_the_cache(texture_zip, tmp_path):
+    root = str(tmp_path / "cache")
+    first = archive.extract_members(texture_zip, ["Metal/Metal_Roughness.jpg"], root=root)
+    path = first["Metal/Metal_Roughness.jpg"]
+    mtime = os.stat(path).st_mtime_ns
+    assert archive.extract_members(texture_zip, ["Metal/Metal_Roughness.jpg"], root=root) == first
+    assert os.stat(path).st_mtime_ns == mtime
+
+    # Mesmo conteúdo (CRC + tamanho) com outro nome: mesma pasta do cache
+    copy = archive.extract_members(texture_zip, ["Metal/Copy_Roughness.jpg"], root=root)["Metal/Copy_Roughness.jpg"]
+    assert os.path.dirname(copy) == os.path.dirname(path)
+    with open(copy, "rb") as f:
+        assert f.read() == b"rough"
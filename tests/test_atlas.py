@@ -0,0 +1,63 @@
+# File: k_tools_texture_map_loader/tests/test_atlas.py
+
+import random
+
+import pytest
+from k_tools_texture_map_loader import atlas
+
+
+def padded_rects(sizes, positions, padding):
+    return [(x, y, w + 2 * padding, h + 2 * padding)
+            for (w, h), pos in zip(sizes, positions) if pos is not None for x, y in [pos]]
+
+
+def assert_disjoint(rects):
+    for i, (x1, y1, w1, h1) in enumerate(rects):
+        for x2, y2, w2, h2 in rects[i + 1:]:
+            assert x1 + w1 <= x2 or x2 + w2 <= x1 or y1 + h1 <= y2 or y2 + h2 <= y1
+
+
+def is_power_of_two(value):
+    return value > 0 and value & (value - 1) == 0
+
+
+def test_pack_nothing():
+    assert atlas.pack_rects([]) == (0, 0, [])
+
+
+def test_pack_four_equal_squares():
+    width, height, positions = atlas.pack_rects([(512, 512)] * 4)
+    assert (width, height) == (1024, 1024)
+    assert sorted(positions) == [(0, 0), (0, 512), (512, 0), (512, 512)]
+
+
+@pytest.mark.parametrize("padding", [0, 8])
+def test_pack_random_sizes(padding):
+    rng = random.Random(padding)
+    sizes = [(rng.choice((64, 128, 256, 512)), rng.choice((64, 128, 256, 512))) for _ in range(40)]
+    width, height, positions = atlas.pack_rects(sizes, padding=padding)
+    assert is_power_of_two(width) and is_power_of_two(height)
+    assert all(pos is not None for pos in positions)
+    rects = padded_rects(sizes, positions, padding)
+    assert all(x >= 0 and y >= 0 and x + w <= width and y + h <= height for x, y, w, h in rects)
+    assert_disjoint(rects)
+
+
+def test_pack_is_bottom_left():
+    # O retângulo baixo vai ao lado do alto, não em cima dele
+    width, height, positions = atlas.pack_rects([(256, 512), (256, 256)])
+    assert positions == [(0, 0), (256, 0)]
+    assert (width, height) == (512, 512)
+
+
+def test_rect_wider_than_max_size_is_skipped():
+    width, height, positions = atlas.pack_rects([(256, 256), (1024, 64)], max_size=512)
+    assert positions[1] is None
+    assert positions[0] == (0, 0)
+    assert width <= 512 and height <= 512
+
+
+def test_rects_past_max_height_are_skipped():
+    width, height, positions = atlas.pack_rects([(512, 512)] * 3, max_size=512)
+    assert positions.count(None) == 2
+    assert (width, height) == (512, 512)
@@ -0,0 +1,61 @@
+# File: k_tools_texture_map_loader/tests/test_colorspace.py
+
+import types
+
+import bpy
+import pytest
+from k_tools_texture_map_loader import colorspace
+
+ACES_NAMES = ("ACES2065-1", "ACEScg", "Utility - sRGB - Texture", "Utility - Raw",
+              "Utility - Linear - sRGB", "Output - sRGB")
+
+
+@pytest.fixture
+def aces_config(monkeypatch):
+    """Switches the active OCIO config to an ACES 1.x studio-like list."""
+    items = [types.SimpleNamespace(identifier=name) for name in ACES_NAMES]
+    settings = bpy.types.ColorManagedInputColorspaceSettings
+    monkeypatch.setattr(settings, "bl_rna", types.SimpleNamespace(
+        properties={"name": types.SimpleNamespace(enum_items=items)}))
+    monkeypatch.setenv("OCIO", "/configs/aces_1.2/config.ocio")
+
+
+def test_existing_name_is_kept():
+    assert colorspace.resolve_colorspace("sRGB") == "sRGB"
+    assert colorspace.resolve_colorspace("Non-Color", 'UTILITY') == "Non-Color"
+
+
+def test_case_insensitive_match():
+    assert colorspace.resolve_colorspace("non-color", 'UTILITY') == "Non-Color"
+
+
+def test_alias_from_another_config():
+    assert colorspace.resolve_colorspace("Utility - Raw", 'UTILITY') == "Non-Color"
+    assert colorspace.resolve_colorspace("acescg") == "ACEScg"
+
+
+def test_aliases_under_aces(aces_config):
+    assert colorspace.resolve_colorspace("sRGB") == "Utility - sRGB - Texture"
+    assert colorspace.resolve_colorspace("Non-Color", 'UTILITY') == "Utility - Raw"
+    assert colorspace.resolve_colorspace("Linear Rec.709") == "Utility - Linear - sRGB"
+
+
+def test_unknown_name_falls_back_to_data_type(aces_config):
+    assert colorspace.resolve_colorspace("My Custom Space", 'COLOR') == "Utility - sRGB - Texture"
+    assert colorspace.resolve_colorspace("", 'UTILITY') == "Utility - Raw"
+
+
+def test_config_change_clears_the_cache(aces_config, monkeypatch):
+    key = colorspace.get_config_key()
+    assert colorspace.resolve_colorspace("sRGB") == "Utility - sRGB - Texture"
+    monkeypatch.undo()
+    assert colorspace.resolve_colorspace("sRGB") == "sRGB"
+    assert colorspace.get_config_key() != key
+
+
+def test_nothing_fits(monkeypatch):
+    settings = bpy.types.ColorManagedInputColorspaceSettings
+    monkeypatch.setattr(settings, "bl_rna", types.SimpleNamespace(
+        properties={"name": types.SimpleNamespace(enum_items=[types.SimpleNamespace(identifier="Display")])}))
+    monkeypatch.setenv("OCIO", "/configs/minimal.ocio")
+    assert colorspace.resolve_colorspace("sRGB") is None
@@ -0,0 +1,237 @@
+# File: k_tools_texture_map_loader/tests/test_image_analysis.py
+
+import struct
+import types
+
+import numpy as np
+import pytest
+from k_tools_texture_map_loader import image_analysis
+from image_files import write_exr, write_jpeg, write_png, write_tiff
+
+
+def make_file_image(path, pixels=None):
+    """Image of a file on disk (optionally with pixels, for the range scan)."""
+    image = types.SimpleNamespace(filepath=path, source='FILE', packed_file=None, library=None,
+                                  channels=4, size=(0, 0), pixels=None)
+    if pixels is not None:
+        image.size = (pixels.shape[1], pixels.shape[0])
+        image.channels = pixels.shape[2]
+        image.pixels = types.SimpleNamespace(foreach_get=lambda buf: buf.__setitem__(slice(None), pixels.ravel()))
+    return image
+
+
+def make_normal_map(directx=False, size=64):
+    """Tangent-space normal map of a height field, rows bottom-up like Blender."""
+    y, x = np.mgrid[0:size, 0:size] * (2 * np.pi / size)
+    height = np.sin(2 * x) * np.sin(3 * y)
+    dh_dy, dh_dx = np.gradient(height)
+    normal = np.stack((-dh_dx, -dh_dy, np.ones_like(height)), axis=-1)
+    normal /= np.linalg.norm(normal, axis=-1, keepdims=True)
+    if directx:
+        normal[..., 1] *= -1.0
+    rgba = np.concatenate((normal * 0.5 + 0.5, np.ones((size, size, 1))), axis=-1)
+    return rgba.astype(np.float32)
+
+
+# --- DirectX / OpenGL normals ---
+
+def test_normal_convention_from_name():
+    assert image_analysis.detect_normal_convention_from_name("Wood_NormalDX.png") == 'DIRECTX'
+    assert image_analysis.detect_normal_convention_from_name("wood_normal_dx.png") == 'DIRECTX'
+    assert image_analysis.detect_normal_convention_from_name("Wood_Normal_GL.exr") == 'OPENGL'
+    assert image_analysis.detect_normal_convention_from_name("Wood_Normal.png") is None
+
+
+def test_normal_convention_from_pixels(pixel_image):
+    assert image_analysis.estimate_normal_convention(pixel_image(make_normal_map())) == 'OPENGL'
+    assert image_analysis.estimate_normal_convention(pixel_image(make_normal_map(directx=True))) == 'DIRECTX'
+
+
+def test_normal_convention_of_flat_map(pixel_image):
+    flat = np.tile(np.array([0.5, 0.5, 1.0, 1.0], dtype=np.float32), (16, 16, 1))
+    assert image_analysis.estimate_normal_convention(pixel_image(flat)) is None
+
+
+def test_normal_convention_of_tiny_map(pixel_image):
+    assert image_analysis.estimate_normal_convention(pixel_image(make_normal_map(size=2))) is None
+
+
+# --- Constant maps ---
+
+class FakeTree:
+    """Node tree stand-in recording the nodes and links created."""
+
+    def __init__(self):
+        self.created = {}
+        self.links = types.SimpleNamespace(new=self._link)
+        self.nodes = types.SimpleNamespace(new=self._new)
+        self.linked = []
+
+    def _new(self, node_type):
+        node = types.SimpleNamespace(type=node_type, name="", label="", location=(0, 0),
+                                     outputs=[types.SimpleNamespace(default_value=None)])
+        self.created[node_type] = node
+        return node
+
+    def _link(self, from_socket, to_socket):
+        self.linked.append((from_socket, to_socket))
+
+
+def make_image_node(tree, color_links=0, alpha_links=0):
+    def output(count):
+        return types.SimpleNamespace(links=[types.SimpleNamespace(to_socket=object()) for _ in range(count)])
+    return types.SimpleNamespace(
+        name="Roughness", id_data=tree, location=types.SimpleNamespace(x=0.0, y=0.0),
+        image=types.SimpleNamespace(filepath="//rough.png"),
+        outputs={'Color': output(color_links), 'Alpha': output(alpha_links)},
+        tml_props=types.SimpleNamespace(constant_image_path=""),
+    )
+
+
+def test_constant_value_of_flat_data_map(pixel_image):
+    flat = np.full((8, 8, 4), 0.25, dtype=np.float32)
+    flat[..., 3] = 1.0
+    assert image_analysis.get_constant_value(pixel_image(flat)) == pytest.approx((0.25, 0.25, 0.25, 1.0))
+
+
+def test_constant_value_linearizes_srgb_bytes(pixel_image):
+    flat = np.full((8, 8, 4), 0.5, dtype=np.float32)
+    value = image_analysis.get_constant_value(pixel_image(flat, is_data=False))
+    assert value[0] == pytest.approx(0.214, abs=1e-3)
+    assert value[3] == pytest.approx(0.5) # Alpha fica linear
+
+
+def test_constant_value_within_tolerance(pixel_image):
+    pixels = np.full((8, 8, 1), 0.5, dtype=np.float32)
+    pixels[0, 0] += image_analysis.CONSTANT_TOLERANCE * 0.5
+    assert image_analysis.get_constant_value(pixel_image(pixels)) is not None
+    pixels[0, 0] += image_analysis.CONSTANT_TOLERANCE
+    assert image_analysis.get_constant_value(pixel_image(pixels)) is None
+
+
+def test_constant_value_of_grayscale(pixel_image):
+    gray = np.full((4, 4, 1), 0.75, dtype=np.float32)
+    assert image_analysis.get_constant_value(pixel_image(gray)) == pytest.approx((0.75, 0.75, 0.75, 1.0))
+
+
+def test_replace_with_constant_feeds_the_links():
+    tree = FakeTree()
+    node = make_image_node(tree, color_links=2, alpha_links=1)
+    image = node.image
+    assert image_analysis.replace_with_constant(node, (0.1, 0.2, 0.3, 0.5)) is image
+    assert node.image is None
+    assert node.tml_props.constant_image_path == "//rough.png"
+    assert tree.created['ShaderNodeRGB'].outputs[0].default_value == (0.1, 0.2, 0.3, 0.5)
+    assert tree.created['ShaderNodeValue'].outputs[0].default_value == 0.5
+    assert len(tree.linked) == 3
+
+
+def test_replace_with_constant_leaves_unlinked_node():
+    tree = FakeTree()
+    node = make_image_node(tree)
+    image = node.image
+    assert image_analysis.replace_with_constant(node, (0.0, 0.0, 0.0, 1.0)) is None
+    assert node.image is image
+    assert not tree.created
+
+
+# --- File headers ---
+
+@pytest.mark.parametrize("color_type, trns, channels", [
+    (0, False, 1), (0, True, 2),  # Cinza
+    (2, False, 3), (2, True, 4),  # RGB
+    (3, False, 3), (3, True, 4),  # Paleta
+    (4, False, 2), (6, False, 4), # Cinza + alfa, RGBA
+])
+def test_png_header_channels(tmp_path, color_type, trns, channels):
+    path = write_png(tmp_path / "map.png", width=8, height=4, color_type=color_type, trns=trns)
+    assert image_analysis.read_image_header(path) == (8, 4, channels, 8)
+
+
+def test_png_header_ignores_trns_after_idat(tmp_path):
+    path = write_png(tmp_path / "map.png", trns=True, trns_after_idat=True)
+    assert image_analysis.read_image_header(path)[2] == 3
+
+
+def test_png_header_bit_depth(tmp_path):
+    path = write_png(tmp_path / "map.png", color_type=0, bits=16)
+    assert image_analysis.read_image_header(path) == (8, 4, 1, 16)
+
+
+def test_png_header_truncated(tmp_path):
+    path = tmp_path / "map.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n\0\0")
+    assert image_analysis.read_image_header(str(path)) is None
+
+
+def test_jpeg_header(tmp_path):
+    path = write_jpeg(tmp_path / "map.jpg", width=640, height=480, channels=3)
+    assert image_analysis.read_image_header(path) == (640, 480, 3, 8)
+
+
+def test_header_of_other_formats(tmp_path):
+    path = tmp_path / "map.tga"
+    path.write_bytes(b"\0" * 32)
+    assert image_analysis.read_image_header(str(path)) is None
+    assert image_analysis.read_image_header(str(tmp_path / "missing.png")) is None
+
+
+# --- Alpha coverage ---
+
+def test_rgb_png_is_opaque_without_decoding(tmp_path):
+    image = make_file_image(write_png(tmp_path / "color.png", color_type=2))
+    assert image_analysis.is_alpha_channel_opaque(image) # Sem pixels: nem foi lido
+
+
+def test_trns_png_is_scanned(tmp_path):
+    pixels = np.ones((4, 8, 4), dtype=np.float32)
+    pixels[0, 0, 3] = 0.0 # Um pixel recortado
+    image = make_file_image(write_png(tmp_path / "leaf.png", color_type=3, trns=True), pixels)
+    assert not image_analysis.is_alpha_channel_opaque(image)
+
+
+def test_opaque_trns_png(tmp_path):
+    pixels = np.ones((4, 8, 4), dtype=np.float32)
+    image = make_file_image(write_png(tmp_path / "leaf.png", color_type=2, trns=True), pixels)
+    assert image_analysis.is_alpha_channel_opaque(image)
+
+
+@pytest.mark.parametrize("pixel_type, bits", [(1, 16), (2, 32)])
+def test_exr_header(tmp_path, pixel_type, bits):
+    path = write_exr(tmp_path / "map.exr", 1024, 512, pixel_type=pixel_type)
+    assert image_analysis.read_image_header(path) == (1024, 512, 3, bits)
+
+
+def test_exr_header_channel_count(tmp_path):
+    path = write_exr(tmp_path / "map.exr", channels=(b"A", b"B", b"G", b"R"))
+    assert image_analysis.read_image_header(path)[2] == 4
+
+
+def test_exr_compression(tmp_path):
+    assert image_analysis.read_exr_compression(write_exr(tmp_path / "piz.exr", compression=4)) == "PIZ"
+    assert image_analysis.read_exr_compression(write_exr(tmp_path / "raw.exr", compression=0)) == "NONE"
+    assert image_analysis.read_exr_compression(str(tmp_path / "missing.exr")) is None
+
+
+def test_exr_header_not_exr(tmp_path):
+    path = tmp_path / "map.exr"
+    path.write_bytes(b"\0" * 64)
+    assert image_analysis.read_image_header(str(path)) is None
+    assert image_analysis.read_exr_compression(str(path)) is None
+
+
+@pytest.mark.parametrize("order", ["<", ">"])
+def test_tiff_header(tmp_path, order):
+    path = write_tiff(tmp_path / "map.tif", 640, 480, samples=3, bits=16, order=order)
+    assert image_analysis.read_image_header(path) == (640, 480, 3, 16)
+
+
+def test_tiff_header_single_sample(tmp_path):
+    path = write_tiff(tmp_path / "map.tiff", 256, 128, samples=1, bits=8)
+    assert image_analysis.read_image_header(path) == (256, 128, 1, 8)
+
+
+def test_bigtiff_is_not_read(tmp_path):
+    path = tmp_path / "map.tif"
+    path.write_bytes(b"II" + struct.pack("<HHHQ", 43, 8, 0, 16))
+    assert image_analysis.read_image_header(str(path)) is None
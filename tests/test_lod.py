@@ -0,0 +1,102 @@
+# File: k_tools_texture_map_loader/tests/test_lod.py
+
+import os
+
+import pytest
+from k_tools_texture_map_loader import lod
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("Wood_Color_2k.png", ("wood_color_{}.png", 2048)),
+    ("Wood_4K_Normal.exr", ("wood_{}_normal.exr", 4096)),
+    ("rock-16k.tif", ("rock-{}.tif", 16384)),
+    ("Brick_1k_Rough_8k.jpg", ("brick_1k_rough_{}.jpg", 8192)), # O token mais à direita
+])
+def test_tier_pattern(filename, expected):
+    assert lod._tier_pattern(filename) == expected
+
+
+@pytest.mark.parametrize("filename", ["Wood_Color.png", "Wood_2kb.png", "Wood_v12k3.png", "Wood_123k.png"])
+def test_tier_pattern_without_token(filename):
+    assert lod._tier_pattern(filename) is None
+
+
+def test_find_tiers(tmp_path):
+    for name in ("Wood_Color_1k.png", "Wood_Color_2K.png", "Wood_Color_4k.png",
+                 "Wood_Normal_2k.png", "Wood_Color_2k.exr"):
+        (tmp_path / name).write_bytes(b"")
+    tiers = lod.find_tiers(str(tmp_path / "Wood_Color_2k.png"))
+    assert tiers == {
+        1024: os.path.join(str(tmp_path), "Wood_Color_1k.png"),
+        2048: os.path.join(str(tmp_path), "Wood_Color_2K.png"),
+        4096: os.path.join(str(tmp_path), "Wood_Color_4k.png"),
+    }
+    assert lod.find_tiers(str(tmp_path / "Wood_Color.png")) == {}
+
+
+def test_find_tiers_sees_new_files(tmp_path):
+    (tmp_path / "Tile_1k.png").write_bytes(b"")
+    path = str(tmp_path / "Tile_1k.png")
+    assert list(lod.find_tiers(path)) == [1024]
+    (tmp_path / "Tile_2k.png").write_bytes(b"")
+    # Força outro mtime: a resolução do relógio do sistema de arquivos pode ser grossa
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert sorted(lod.find_tiers(path)) == [1024, 2048]
+
+
+def test_choose_tier():
+    tiers = {1024: "a", 2048: "b", 4096: "c"}
+    assert lod.choose_tier(tiers, 900) == 1024
+    assert lod.choose_tier(tiers, 1024) == 1024
+    assert lod.choose_tier(tiers, 1500) == 2048
+    assert lod.choose_tier(tiers, 10000) == 4096
+    assert lod.choose_tier({}, 100) is None
+
+
+def _projection(np, ortho=False, scale=1000.0, max_pixels=1920.0):
+    # Câmera na origem olhando para -Z
+    return {"world_to_camera": np.eye(4), "scale": scale, "ortho": ortho,
+            "clip_start": 0.1, "max_pixels": max_pixels}
+
+
+def _unit_cube(np):
+    return np.array([[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)])
+
+
+def _translation(np, z):
+    matrix = np.eye(4)
+    matrix[2, 3] = z
+    return matrix
+
+
+def test_projected_sizes_perspective():
+    np = pytest.importorskip("numpy")
+    bounds = np.stack([_unit_cube(np)] * 3)
+    matrices = np.stack([_translation(np, -10.5), _translation(np, -20.5), _translation(np, 10.0)])
+    sizes = lod.projected_sizes(bounds, matrices, _projection(np))
+    # Lado mais largo visto na face mais próxima: 1 / 10 * 1000
+    assert sizes[0] == pytest.approx(100.0)
+    assert sizes[1] == pytest.approx(50.0)
+    assert sizes[2] == 0.0 # Atrás da câmera
+
+
+def test_projected_sizes_ortho_ignores_depth():
+    np = pytest.importorskip("numpy")
+    bounds = np.stack([_unit_cube(np)] * 2)
+    matrices = np.stack([_translation(np, -5.0), _translation(np, -50.0)])
+    sizes = lod.projected_sizes(bounds, matrices, _projection(np, ortho=True, scale=200.0))
+    assert sizes.tolist() == pytest.approx([200.0, 200.0])
+
+
+def test_projected_sizes_clamped_to_render_size():
+    np = pytest.importorskip("numpy")
+    bounds = np.stack([_unit_cube(np)])
+    matrices = np.stack([_translation(np, 0.0)]) # Cruza o plano near
+    sizes = lod.projected_sizes(bounds, matrices, _projection(np, max_pixels=1920.0))
+    assert sizes.tolist() == [1920.0]
+
+
+def test_projected_sizes_empty():
+    np = pytest.importorskip("numpy")
+    assert len(lod.projected_sizes(np.zeros((0, 8, 3)), np.zeros((0, 4, 4)), _projection(np))) == 0
@@ -0,0 +1,50 @@
+# File: k_tools_texture_map_loader/tests/test_memory_report.py
+
+import types
+
+from k_tools_texture_map_loader import memory_report
+from image_files import write_exr, write_png
+
+
+def make_image(path, name):
+    return types.SimpleNamespace(name=name, name_full=name, filepath=path, source='FILE', packed_file=None,
+                                 library=None, has_data=False)
+
+
+def make_material(name, uid, images):
+    nodes = [types.SimpleNamespace(type='TEX_IMAGE', name=label, label="", image=image)
+             for label, image in images.items()]
+    return types.SimpleNamespace(name=name, node_tree=types.SimpleNamespace(session_uid=uid, nodes=nodes))
+
+
+def test_unloaded_images_sized_from_headers(tmp_path):
+    png = make_image(write_png(tmp_path / "Wood_Diffuse.png", 64, 32), "Wood_Diffuse.png")
+    exr = make_image(write_exr(tmp_path / "Wood_Normal.exr", 128, 64), "Wood_Normal.exr")
+    assert memory_report.get_image_stats(png) == (64 * 32 * 4, 64, 32, 8, False)
+    assert memory_report.get_image_stats(exr) == (128 * 64 * 16, 128, 64, 16, True)
+
+
+def test_report_counts_unsized_images(tmp_path, kw_map):
+    png = make_image(write_png(tmp_path / "Wood_Diffuse.png", 64, 32), "Wood_Diffuse.png")
+    tga_path = tmp_path / "Wood_Roughness.tga"
+    tga_path.write_bytes(b"\0" * 32)
+    tga = make_image(str(tga_path), "Wood_Roughness.tga")
+    materials = [
+        make_material("Wood", 1, {"Diffuse": png, "Roughness": tga}),
+        make_material("Wood.001", 2, {"Diffuse": png}),
+    ]
+    report = memory_report.build_report(materials, kw_map)
+    assert report["image_count"] == 2
+    assert report["unsized_count"] == 1
+    assert report["total_bytes"] == 64 * 32 * 4 # Cada imagem conta uma vez
+    assert report["images"]["Wood_Roughness.tga"]["resolution"] == "unknown"
+    assert report["images"]["Wood_Diffuse.png"]["materials"] == 2
+
+
+def test_csv_export_has_totals_row(tmp_path, kw_map):
+    png = make_image(write_png(tmp_path / "Wood_Diffuse.png", 64, 32), "Wood_Diffuse.png")
+    report = memory_report.build_report([make_material("Wood", 3, {"Diffuse": png})], kw_map)
+    path = tmp_path / "report.csv"
+    memory_report.export_csv(report, str(path))
+    last = path.read_text(encoding="utf-8").splitlines()[-1]
+    assert last == f"(total),0 image(s) not sized,,,,{64 * 32 * 4},"
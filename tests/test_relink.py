@@ -0,0 +1,56 @@
+# File: k_tools_texture_map_loader/tests/test_relink.py
+
+import os
+import types
+
+from k_tools_texture_map_loader import relink
+
+
+def touch(root, *parts):
+    path = os.path.join(str(root), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    return path
+
+
+def test_suffix_score_counts_common_trailing_folders():
+    old = "C:\\Projects\\Old\\assets\\wood\\Wood_Diffuse.png"
+    assert relink._suffix_score(old, "/mnt/server/assets/wood/Wood_Diffuse.png") == 2
+    assert relink._suffix_score(old, "/mnt/server/backup/wood/Wood_Diffuse.png") == 1
+    assert relink._suffix_score(old, "/mnt/server/Wood_Diffuse.png") == 0
+
+
+def test_best_candidate_prefers_closest_structure():
+    old = "/old/assets/wood/Wood_Diffuse.png"
+    candidates = ["/new/backup/wood/Wood_Diffuse.png", "/new/assets/wood/Wood_Diffuse.png", "/new/Wood_Diffuse.png"]
+    assert relink._best_candidate(old, candidates) == "/new/assets/wood/Wood_Diffuse.png"
+
+
+def test_best_candidate_ties_are_stable():
+    candidates = ["/b/Wood.png", "/a/Wood.png"]
+    assert relink._best_candidate("/old/Wood.png", candidates) == "/a/Wood.png"
+
+
+def test_tile_paths_of_udim_image():
+    image = types.SimpleNamespace(source='TILED', tiles=[types.SimpleNamespace(number=1001),
+                                                         types.SimpleNamespace(number=1002)])
+    assert relink.get_tile_paths(image, "/t/Wood.<UDIM>.png") == ["/t/Wood.1001.png", "/t/Wood.1002.png"]
+    assert relink.get_tile_paths(types.SimpleNamespace(source='FILE'), "/t/Wood.png") == ["/t/Wood.png"]
+
+
+def test_file_index(tmp_path, kw_map):
+    diffuse = touch(tmp_path, "wood", "Wood_Diffuse.jpg")
+    touch(tmp_path, "stone", "Stone_Normal.png")
+    index = relink.FileIndex(str(tmp_path), kw_map)
+    assert len(index) == 2
+    assert index.by_name["wood_diffuse.jpg"] == [diffuse]
+    # Fallback por set + tipo: o mesmo mapa salvo em outro formato
+    assert index.by_set[relink._set_key("Wood_Diffuse.png", kw_map)] == [diffuse]
+
+
+def test_has_files_checks_every_tile(tmp_path, kw_map):
+    folder = os.path.dirname(touch(tmp_path, "udim", "Wood.1001.png"))
+    touch(tmp_path, "udim", "Wood.1002.png")
+    index = relink.FileIndex(str(tmp_path), kw_map)
+    assert relink._has_files(index, folder, ["Wood.1001.png", "Wood.1002.png"])
+    assert not relink._has_files(index, folder, ["Wood.1001.png", "Wood.1003.png"])
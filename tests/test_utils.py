@@ -0,0 +1,103 @@
+# File: k_tools_texture_map_loader/tests/test_utils.py
+
+import types
+
+import bpy
+from k_tools_texture_map_loader import utils
+
+
+def make_group_node(uid, inputs, outputs=()):
+    tree = types.SimpleNamespace(session_uid=uid, interface=types.SimpleNamespace(
+        items_tree=[None] * (len(inputs) + len(outputs))))
+    return types.SimpleNamespace(
+        node_tree=tree,
+        inputs=[types.SimpleNamespace(name=name) for name in inputs],
+        outputs=[types.SimpleNamespace(name=name) for name in outputs],
+    )
+
+
+def depsgraph_update(tree):
+    node_tree = bpy.types.NodeTree(original=tree)
+    return types.SimpleNamespace(updates=[types.SimpleNamespace(id=node_tree)])
+
+
+# --- Socket index tables ---
+
+def test_socket_index_table_maps_names_to_indices():
+    utils.clear_socket_index_cache()
+    node = make_group_node(1, ["Vector", "Scale"], ["Base Color", "Normal"])
+    inputs, outputs = utils.get_socket_index_table(node)
+    assert inputs == {"Vector": 0, "Scale": 1}
+    assert outputs == {"Base Color": 0, "Normal": 1}
+
+
+def test_socket_index_table_keeps_first_duplicate():
+    utils.clear_socket_index_cache()
+    node = make_group_node(2, ["Color", "Color"])
+    assert utils.get_socket_index_table(node)[0] == {"Color": 0}
+
+
+def test_socket_index_table_shared_per_tree():
+    utils.clear_socket_index_cache()
+    first = make_group_node(3, ["Vector"])
+    second = make_group_node(3, ["Vector"])
+    second.node_tree = first.node_tree
+    assert utils.get_socket_index_table(first)[0] is utils.get_socket_index_table(second)[0]
+
+
+def test_socket_index_table_rebuilt_when_sockets_added():
+    utils.clear_socket_index_cache()
+    node = make_group_node(4, ["Vector"])
+    utils.get_socket_index_table(node)
+    node.inputs.insert(0, types.SimpleNamespace(name="Scale"))
+    node.node_tree.interface.items_tree.append(None)
+    assert utils.get_socket_index_table(node)[0] == {"Scale": 0, "Vector": 1}
+
+
+def test_socket_index_table_dropped_on_tree_update():
+    utils.clear_socket_index_cache()
+    node = make_group_node(5, ["Vector"])
+    utils.get_socket_index_table(node)
+    node.inputs[0].name = "UV" # Renomear não muda a contagem
+    assert utils.get_socket_index_table(node)[0] == {"Vector": 0}
+    utils._on_depsgraph_update(None, depsgraph_update(node.node_tree))
+    assert utils.get_socket_index_table(node)[0] == {"UV": 0}
+
+
+def test_socket_index_table_without_group():
+    node = types.SimpleNamespace(node_tree=None)
+    assert utils.get_socket_index_table(node) == ({}, {})
+
+
+# --- Texture sets ---
+
+def test_texture_set_name_drops_keyword(kw_map):
+    assert utils.get_texture_set_name("Wood_Diffuse_2k.png", kw_map) == "Wood_2k"
+    assert utils.get_texture_set_name("Wood_nrm.exr", kw_map) == "Wood"
+
+
+def test_texture_set_name_keeps_separators(kw_map):
+    assert utils.get_texture_set_name("Metal.Plate-albedo.jpg", kw_map) == "Metal.Plate"
+    assert utils.get_texture_set_name("Brick diffuse.png", kw_map) == "Brick"
+
+
+def test_texture_set_name_of_bare_keyword(kw_map):
+    assert utils.get_texture_set_name("diffuse.png", kw_map) == "diffuse"
+
+
+def test_texture_set_name_without_keyword(kw_map):
+    assert utils.get_texture_set_name("notes.png", kw_map) is None
+
+
+def test_group_files_into_sets(kw_map):
+    sets = utils.group_files_into_sets(
+        ["Wood_Diffuse_2k.png", "Wood_Normal_2k.png", "Stone_Roughness.png", "notes.png"], kw_map)
+    assert sets == {
+        "Wood_2k": {"Diffuse": "Wood_Diffuse_2k.png", "Normal": "Wood_Normal_2k.png"},
+        "Stone": {"Roughness": "Stone_Roughness.png"},
+    }
+
+
+def test_group_files_first_file_per_map_type_wins(kw_map):
+    sets = utils.group_files_into_sets(["Wood_Diffuse.png", "Wood_Color.png"], kw_map)
+    assert sets == {"Wood": {"Diffuse": "Wood_Diffuse.png"}}
@@ -0,0 +1,62 @@
+# File: k_tools_texture_map_loader/tests/test_variants.py
+
+import types
+
+import stub_bpy
+from k_tools_texture_map_loader import variants
+
+
+def make_image(name, loaded=True):
+    image = stub_bpy.StubImage(name)
+    image.has_data = loaded
+    return image
+
+
+def make_variant(images, keep_loaded=False):
+    slots = [types.SimpleNamespace(node_name=node_name, image=image) for node_name, image in images.items()]
+    return types.SimpleNamespace(slots=slots, keep_loaded=keep_loaded)
+
+
+def make_tree(variant_list, active_index=-1, **images):
+    nodes = {name: types.SimpleNamespace(type='TEX_IMAGE', image=image) for name, image in images.items()}
+    return types.SimpleNamespace(
+        nodes=nodes,
+        tml_variants=types.SimpleNamespace(variants=variant_list, active_index=active_index),
+    )
+
+
+def test_switch_assigns_the_variant_images():
+    red, blue = make_image("Red"), make_image("Blue")
+    tree = make_tree([make_variant({"Diffuse": red}), make_variant({"Diffuse": blue})], 0, Diffuse=red)
+    variants.switch_variant(tree, 1)
+    assert tree.nodes["Diffuse"].image is blue
+    assert tree.tml_variants.active_index == 1
+
+
+def test_switch_frees_the_previous_variant():
+    red, blue = make_image("Red"), make_image("Blue")
+    tree = make_tree([make_variant({"Diffuse": red}), make_variant({"Diffuse": blue})], 0, Diffuse=red)
+    assert variants.switch_variant(tree, 1) == 4 * 4 * 4
+    assert not red.has_data
+    assert blue.has_data
+
+
+def test_switch_keeps_shared_and_kept_images():
+    shared, red, blue = make_image("Normal"), make_image("Red"), make_image("Blue")
+    kept = make_variant({"Diffuse": red, "Normal": shared}, keep_loaded=True)
+    tree = make_tree([kept, make_variant({"Diffuse": blue, "Normal": shared})], 0, Diffuse=red, Normal=shared)
+    assert variants.switch_variant(tree, 1) == 0
+    assert red.has_data and shared.has_data
+
+
+def test_switch_skips_missing_nodes():
+    blue = make_image("Blue")
+    tree = make_tree([make_variant({"Removed": blue})])
+    assert variants.switch_variant(tree, 0) == 0
+    assert tree.tml_variants.active_index == 0
+
+
+def test_variant_memory_counts_loaded_images_once():
+    red, blue = make_image("Red"), make_image("Blue", loaded=False)
+    variant = make_variant({"Diffuse": red, "Emission": red, "Normal": blue})
+    assert variants.get_variant_memory(variant) == (4 * 4 * 4, 1, 2)
@@ -4,7 +4,11 @@ import bpy
 from bpy.props import EnumProperty, PointerProperty, FloatProperty, BoolProperty
 from bpy.types import PropertyGroup, Scene
 from . import utils # Para encontrar os nós
+from . import transaction
+from . import diagnostics
+from .diagnostics import logger
 
+@diagnostics.profiled("tool_props.update_batch_property")
 def update_batch_property(self, context, prop_name):
     """
     Função genérica para atualizar uma propriedade em todos os nós
@@ -13,6 +17,9 @@ def update_batch_property(self, context, prop_name):
     # Context pode não estar disponível em todos os updates, mas tentamos
     if not context:
         return
+    # Dentro de uma transação (ex.: Get Batch Settings) os nós não são tocados
+    if transaction.is_active():
+        return
 
     # 1. Obter a árvore alvo com base no search_mode
     target_tree = utils.get_target_node_tree(context)
@@ -29,7 +36,7 @@ def update_batch_property(self, context, prop_name):
     new_value = getattr(self, prop_name)
 
     # 4. Aplicar em lote
-    print(f"TML Batch Update: Setting '{prop_name}' to '{new_value}' for {len(image_nodes)} nodes in '{target_tree.name}'.")
+    logger.debug("Batch update: setting '%s' to '%s' for %d nodes in '%s'.", prop_name, new_value, len(image_nodes), target_tree.name)
     for node in image_nodes:
         if hasattr(node, prop_name):
             try:
@@ -44,7 +51,7 @@ def update_batch_property(self, context, prop_name):
 
             except Exception as e:
                 # Captura erros caso a propriedade não possa ser definida (raro)
-                print(f"TML Error setting {prop_name} on {node.name}: {e}")
+                logger.error("Error setting %s on %s: %s", prop_name, node.name, e)
 
 
 # Callbacks individuais (agora funcionam com a lógica atualizada)
@@ -0,0 +1,70 @@
+# File: k_tools_texture_map_loader/transaction.py
+
+import bpy
+import functools
+from contextlib import contextmanager
+from . import diagnostics
+from .diagnostics import logger
+
+_depth = 0
+_last_memory = None
+
+
+def is_active():
+    """True while a batch is in flight (tool property callbacks skip)."""
+    return _depth > 0
+
+
+@contextmanager
+def transaction(name="", push=False):
+    """
+    Groups the changes of a bulk operation into a single undo step.
+
+    While it is open, the TML_ToolProperties update callbacks do nothing,
+    so setting tool properties does not re-apply them to every node.
+    Operators with the 'UNDO' option already get their one step from
+    Blender and use push=False. Scripts (timers, console, batch jobs)
+    pass push=True: one step named 'name' is pushed with ed.undo_push
+    when the outermost transaction ends. Call the api functions inside,
+    not operators, which push steps of their own. User preferences are
+    never touched. The process memory before the batch and after the
+    push is recorded (get_last_memory, 'undo.memory_kb' counter).
+    Transactions nest; only the outermost one pushes.
+    """
+    global _depth, _last_memory
+    outermost = _depth == 0
+    pushing = push and outermost and not bpy.app.background # Sem pilha de undo em background
+    before = diagnostics.get_process_memory() if pushing else None
+
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if pushing:
+            bpy.ops.ed.undo_push(message=name or "K-Tools Batch")
+            diagnostics.count("undo.push")
+            after = diagnostics.get_process_memory()
+            _last_memory = (before, after)
+            if before is not None and after is not None:
+                diagnostics.count("undo.memory_kb", (after - before) // 1024)
+            logger.debug("Transaction: pushed one undo step '%s' (memory %s -> %s bytes)", name, before, after)
+
+
+def get_last_memory():
+    """(bytes before, bytes after) of the last pushed batch, or None."""
+    return _last_memory
+
+
+def batch_method(func):
+    """
+    Runs an Operator.execute inside a transaction (keeps the exact
+    (self, context) signature Blender checks when registering). The
+    operator's 'UNDO' option gives the undo step; this only suspends the
+    tool property callbacks while it runs.
+    """
+    @functools.wraps(func)
+    def wrapper(self, context):
+        with transaction():
+            return func(self, context)
+    return wrapper
@@ -0,0 +1,334 @@
+# File: k_tools_texture_map_loader/transcode.py
+
+import bpy
+import os
+import threading
+from . import utils
+from . import image_analysis
+from . import colorspace
+from . import diagnostics
+from .diagnostics import logger
+
+# Formats worth transcoding: TIFF always (LZW/Deflate decode is slow),
+# EXR unless already stored uncompressed or RLE
+TRANSCODE_EXTENSIONS = {".tif", ".tiff", ".exr"}
+FAST_EXR_COMPRESSIONS = {"NONE", "RLE"}
+
+POLL_INTERVAL = 0.5 # Segundos entre verificações dos jobs
+HASH_CHUNK = 1 << 20
+INDEX_FILENAME = "index.json"
+
+# Runs inside 'blender -b': float images become uncompressed 32-bit EXR
+# (written in scene linear), byte images uncompressed TGA (raw bytes).
+WORKER_SCRIPT = """
+import bpy, sys
+source, colorspace, target = sys.argv[sys.argv.index("--") + 1:]
+image = bpy.data.images.load(source)
+try:
+    image.colorspace_settings.name = colorspace
+except TypeError:
+    pass
+if image.is_float:
+    scene = bpy.context.scene
+    settings = scene.render.image_settings
+    settings.file_format = 'OPEN_EXR'
+    settings.exr_codec = 'NONE'
+    settings.color_depth = '32'
+    image.save_render(target + ".exr", scene=scene)
+else:
+    image.file_format = 'TARGA_RAW'
+    image.save(filepath=target + ".tga")
+"""
+
+# ID properties on a transcoded image (provenance and invalidation)
+SOURCE_PROPS = ("tml_source_path", "tml_source_hash", "tml_source_signature",
+                "tml_source_colorspace", "tml_source_data_type")
+
+_pool = None
+# future -> (image name, source signature, cache root) of the jobs in flight
+_jobs = {}
+# "path|mtime_ns|size" -> content hash, persisted in the cache folder
+_index = None
+_index_lock = threading.Lock()
+_index_dirty = False
+
+
+def get_cache_root(prefs):
+    path = getattr(prefs, "transcode_cache_dir", "")
+    if path:
+        path = bpy.path.abspath(path)
+        os.makedirs(path, exist_ok=True)
+        return path
+    return utils.get_cache_dir("transcode")
+
+
+def needs_transcode(path):
+    """True for TIFFs and compressed EXRs (checked from the header)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in TRANSCODE_EXTENSIONS:
+        return False
+    if ext == ".exr":
+        return image_analysis.read_exr_compression(path) not in FAST_EXR_COMPRESSIONS
+    return True
+
+
+def _signature_key(signature):
+    return f"{signature[0]}|{signature[1]}|{signature[2]}"
+
+
+def _load_index(root):
+    global _index
+    if _index is None:
+        import json # Só quando usado
+        try:
+            with open(os.path.join(root, INDEX_FILENAME), encoding="utf-8") as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save_index(root):
+    global _index_dirty
+    import json # Só quando usado
+    with _index_lock:
+        data = dict(_index or {})
+        _index_dirty = False
+    try:
+        with open(os.path.join(root, INDEX_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+    except OSError as e:
+        logger.warning("Transcode: could not write the cache index: %s", e)
+
+
+def file_hash(path):
+    import hashlib # Só quando usado
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _find_cached(target):
+    for ext in (".exr", ".tga"):
+        if os.path.exists(target + ext):
+            return target + ext
+    return None
+
+
+def _colorspace_target(target, colorspace_name, is_data):
+    """
+    Cache path (without extension) of an EXR copy: written in scene linear,
+    it depends on the source colorspace unless the image is data. TGA
+    copies hold the raw bytes and are shared by every colorspace.
+    """
+    if is_data:
+        return target
+    import hashlib # Só quando usado
+    return f"{target}_{hashlib.blake2b(colorspace_name.encode(), digest_size=4).hexdigest()}"
+
+
+def _find_cached_copy(target, colorspace_name, is_data):
+    if os.path.exists(target + ".tga"):
+        return target + ".tga"
+    exr = _colorspace_target(target, colorspace_name, is_data) + ".exr"
+    return exr if os.path.exists(exr) else None
+
+
+def _transcode_job(source, signature, colorspace_name, is_data, root, binary):
+    """
+    Worker thread: hashes the source (the persisted index skips this for
+    files seen before), then runs a background Blender to write the fast
+    copy, unless the cache already has it. No bpy data access here.
+    The cache key is the content hash, plus the colorspace for non-data
+    EXR copies. Returns (content_hash, cached_path).
+    """
+    global _index_dirty
+    import subprocess # Só quando usado
+
+    key = _signature_key(signature)
+    with _index_lock:
+        content_hash = _index.get(key)
+    if content_hash is None:
+        content_hash = file_hash(source)
+        with _index_lock:
+            _index[key] = content_hash
+            _index_dirty = True
+
+    folder = os.path.join(root, content_hash[:2])
+    target = os.path.join(folder, content_hash)
+    cached = _find_cached_copy(target, colorspace_name, is_data)
+    if cached:
+        return content_hash, cached
+
+    os.makedirs(folder, exist_ok=True)
+    partial = target + ".part"
+    cmd = [binary, "-b", "--factory-startup", "--python-expr", WORKER_SCRIPT,
+           "--", source, colorspace_name, partial]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    written = _find_cached(partial)
+    if proc.returncode != 0 or not written:
+        raise RuntimeError(f"transcode failed ({proc.returncode}): {proc.stderr.strip()[-300:]}")
+    ext = os.path.splitext(written)[1]
+    cached = (_colorspace_target(target, colorspace_name, is_data) if ext == ".exr" else target) + ext
+    os.replace(written, cached) # Atômico: nunca há cópia pela metade no cache
+    return content_hash, cached
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ThreadPoolExecutor # Só quando usado
+        # Cada thread só espera seu processo Blender
+        _pool = ThreadPoolExecutor(max_workers=max(1, min(4, (os.cpu_count() or 2) // 2)))
+    return _pool
+
+
+def queue_image(image, prefs):
+    """
+    Starts transcoding an image's source file in the background if its
+    format is slow to decode. The image is switched to the cached copy
+    when the job is done. Returns True if a job was queued.
+    """
+    if (not image or image.source != 'FILE' or image.packed_file or image.library
+            or "tml_source_path" in image):
+        return False
+    signature = image_analysis.get_file_signature(image)
+    if not signature or not needs_transcode(signature[0]):
+        return False
+    if any(job[0] == image.name_full for job in _jobs.values()):
+        return False
+
+    root = get_cache_root(prefs)
+    _load_index(root)
+    future = _get_pool().submit(_transcode_job, signature[0], signature, image.colorspace_settings.name,
+                                image.colorspace_settings.is_data, root, bpy.app.binary_path)
+    _jobs[future] = (image.name_full, signature, root)
+    if not bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.register(_poll, first_interval=POLL_INTERVAL)
+    diagnostics.count("transcode.queued")
+    return True
+
+
+def switch_to_cached(image, signature, content_hash, cached_path):
+    """Points an image at its cached copy and records where it came from."""
+    source_colorspace = image.colorspace_settings.name
+    is_data = image.colorspace_settings.is_data
+    image["tml_source_path"] = signature[0]
+    image["tml_source_hash"] = content_hash
+    image["tml_source_signature"] = _signature_key(signature)
+    image["tml_source_colorspace"] = source_colorspace
+    image.filepath = cached_path
+    if cached_path.endswith(".exr") and not is_data:
+        # EXR escrito em scene linear: fora do re-apply das preferências
+        if colorspace.DATA_TYPE_PROP in image:
+            image["tml_source_data_type"] = image[colorspace.DATA_TYPE_PROP]
+            del image[colorspace.DATA_TYPE_PROP]
+        linear = colorspace.resolve_colorspace("Linear Rec.709", 'COLOR')
+        if linear:
+            image.colorspace_settings.name = linear
+    else:
+        image.colorspace_settings.name = source_colorspace
+
+
+def restore_source(image):
+    """Points a transcoded image back at its source file. Returns True if changed."""
+    if "tml_source_hash" not in image:
+        return False
+    source = image["tml_source_path"]
+    colorspace_name = image.get("tml_source_colorspace", "")
+    if "tml_source_data_type" in image:
+        image[colorspace.DATA_TYPE_PROP] = image["tml_source_data_type"]
+    for prop in SOURCE_PROPS:
+        if prop in image:
+            del image[prop]
+    image.filepath = source
+    if colorspace_name:
+        try:
+            image.colorspace_settings.name = colorspace_name
+        except TypeError:
+            pass
+    return True
+
+
+def _poll():
+    """Timer: applies the finished jobs on the main thread."""
+    done = [future for future in _jobs if future.done()]
+    roots = set()
+    for future in done:
+        name, signature, root = _jobs.pop(future)
+        roots.add(root)
+        try:
+            content_hash, cached_path = future.result()
+        except Exception as e:
+            logger.warning("Transcode: '%s' failed: %s", name, e)
+            continue
+        image = bpy.data.images.get(name)
+        # A imagem pode ter mudado de arquivo enquanto o job rodava
+        if not image or image_analysis.get_file_signature(image) != signature:
+            continue
+        switch_to_cached(image, signature, content_hash, cached_path)
+        diagnostics.count("transcode.done")
+        logger.info("Transcode: '%s' -> %s", name, cached_path)
+
+    if _index_dirty:
+        for root in roots:
+            _save_index(root)
+    return POLL_INTERVAL if _jobs else None
+
+
+def get_pending_count():
+    return len(_jobs)
+
+
+def validate_transcoded(prefs=None, requeue=True):
+    """
+    Checks the transcoded images against their sources: an image whose
+    source changed (mtime/size) or whose cached copy is gone is pointed
+    back at the source and, with 'requeue', transcoded again.
+    Returns the number of images restored.
+    """
+    restored = 0
+    for image in bpy.data.images:
+        if "tml_source_hash" not in image or image.library:
+            continue
+        source = image["tml_source_path"]
+        try:
+            st = os.stat(source)
+            current = _signature_key((source, st.st_mtime_ns, st.st_size))
+        except OSError:
+            current = None
+        cached = bpy.path.abspath(image.filepath)
+        if current == image.get("tml_source_signature") and os.path.exists(cached):
+            continue
+        if current is None:
+            continue # Fonte sumiu: manter a cópia em cache
+        restore_source(image)
+        restored += 1
+        if requeue and prefs:
+            queue_image(image, prefs)
+    return restored
+
+
+def on_file_loaded():
+    """
+    Called by the preferences' load_post handler, only for files holding
+    transcoded images (this module is not imported otherwise).
+    """
+    prefs = utils.get_addon_preferences(bpy.context)
+    enabled = bool(prefs and prefs.transcode_cache)
+    restored = validate_transcoded(prefs, requeue=enabled)
+    if restored:
+        logger.info("Transcode: %d image(s) changed on disk, back on their source.", restored)
+
+
+def unregister():
+    global _pool, _index
+    if bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.unregister(_poll)
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    _jobs.clear()
+    _index = None
@@ -2,6 +2,10 @@ import bpy
 from bpy.types import Panel
 from .. import utils
 from .. import operators
+from .. import reclaim
+from .. import variants
+from .. import builder
+from .. import diagnostics
 
 class TML_PT_MainPanel(Panel):
     bl_label = "Texture Map Loader"; bl_idname = "TML_PT_MainPanel"
@@ -14,6 +18,7 @@ class TML_PT_MainPanel(Panel):
         if space.type == 'NODE_EDITOR' and space.tree_type == 'ShaderNodeTree': return space.edit_tree is not None
         return False
 
+    @diagnostics.profiled_method("ui.panel_draw")
     def draw(self, context):
         layout = self.layout
         tool_props = context.scene.tml_tool_props
@@ -33,6 +38,8 @@ class TML_PT_MainPanel(Panel):
         
         row_connect = box_add.row()
         row_connect.operator(operators.TML_OT_ConnectGroups.bl_idname, icon='LINKED', text='Connect Selected Nodes')
+        row_connect.operator_menu_enum(operators.TML_OT_ConnectGroupsBulk.bl_idname, "scope", text="Bulk", icon='LINKED')
+        box_add.operator(builder.TML_OT_BuildMaterialsFromFolder.bl_idname, icon='FILE_FOLDER', text='Build Materials from Folder')
 
         target_tree = utils.get_target_node_tree(context)
         if not target_tree:
@@ -52,6 +59,9 @@ class TML_PT_MainPanel(Panel):
         box = layout.box()
         row = box.row()
         row.operator(operators.TML_OT_LoadTextureSet.bl_idname, text="Load Texture Set", icon='FILEBROWSER')
+        row.operator(operators.TML_OT_LoadFromArchive.bl_idname, text="", icon='FILE_ARCHIVE')
+        reclaim.draw_reclaim(box)
+        variants.draw_variants(box, target_tree)
 
         row = box.row(align=True)
         can_operate = target_tree is not None
@@ -85,7 +95,7 @@ class TML_PT_MainPanel(Panel):
         if not image_nodes:
             box = layout.box(); box.label(text="No Image Nodes."); return
 
-        prefs = utils.get_addon_preferences(context); kw_map = utils.build_keyword_map(prefs)
+        prefs = utils.get_addon_preferences(context); kw_map = utils.get_keyword_map(prefs)
         main_col = layout.column(align=True)
 
         for node in image_nodes:
@@ -102,17 +112,86 @@ class TML_PT_MainPanel(Panel):
                 current_image_name = node.image.name if node.image else ""
                 stored_image_name = node.tml_props.previous_image_name
                 if current_image_name != stored_image_name:
-                    target_cs = ""
-                    if prefs: target_cs = prefs.color_space_color if map_info[1] == 'COLOR' else prefs.color_space_utility
                     tree_name_for_timer = target_tree.name # Usar nome da árvore alvo
-                    bpy.app.timers.register(lambda gn=tree_name_for_timer, nn=node.name, cs=target_cs, cin=current_image_name: \
-                                            utils.apply_colorspace_and_update_tracker(gn, nn, cs, cin), first_interval=0)
+                    bpy.app.timers.register(lambda gn=tree_name_for_timer, nn=node.name, dt=map_info[1], cin=current_image_name: \
+                                            utils.apply_colorspace_and_update_tracker(gn, nn, dt, cin), first_interval=0)
 
                 if node.image: sub_col.prop(node.image.colorspace_settings, "name", text="Color Space")
                 else: row = sub_col.row(); row.enabled = False; row.label(text="Color Space: (No Image)")
 
+class TML_PT_LibraryTools(Panel):
+    bl_label = "Library Tools"; bl_idname = "TML_PT_LibraryTools"; bl_parent_id = "TML_PT_MainPanel"
+    bl_space_type = 'NODE_EDITOR'; bl_region_type = 'UI'; bl_category = 'K-Tools'; bl_context = "shader"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column(align=True)
+        col.operator_menu_enum(operators.TML_OT_ConvertDirectXNormals.bl_idname, "scope", text="DirectX Normals to OpenGL", icon='NORMALS_FACE')
+        col.operator_menu_enum(operators.TML_OT_CollapseConstantMaps.bl_idname, "scope", text="Collapse Constant Maps", icon='IMAGE_ZDEPTH')
+        col.operator_menu_enum(operators.TML_OT_PruneLoaderSlots.bl_idname, "mode", text="Prune Empty Loader Slots", icon='MOD_DECIM')
+        col.operator(operators.TML_OT_RelinkMissing.bl_idname, text="Relink Missing Textures", icon='FILE_FOLDER')
+        col.operator(operators.TML_OT_BuildAtlas.bl_idname, text="Build Texture Atlas", icon='IMGDISPLAY')
+        row = col.row(align=True)
+        row.operator_menu_enum(operators.TML_OT_TranscodeImages.bl_idname, "scope", text="Transcode Slow Textures", icon='FILE_CACHE')
+        op = row.operator(operators.TML_OT_TranscodeImages.bl_idname, text="Restore", icon='LOOP_BACK')
+        op.mode = 'RESTORE'
+        op.scope = 'ALL'
+        col.operator(operators.TML_OT_BakeFlatten.bl_idname, text="Bake to Flat Texture Set", icon='RENDER_STILL')
+        row = col.row(align=True)
+        row.operator(operators.TML_OT_UnpackImages.bl_idname, text="Unpack Images", icon='PACKAGE')
+        row.operator_menu_enum(operators.TML_OT_PackImages.bl_idname, "scope", text="Pack", icon='UGLYPACKAGE')
+        row = col.row(align=True)
+        row.operator(operators.TML_OT_SaveManifest.bl_idname, text="Save Manifest", icon='EXPORT')
+        row.operator(operators.TML_OT_RestoreManifest.bl_idname, text="Restore", icon='IMPORT')
+        # Estado só dos módulos já carregados (importados no primeiro uso)
+        watcher = utils.get_loaded_module("watcher")
+        if watcher and watcher.is_enabled():
+            layout.label(text=f"Watching {watcher.get_watched_count()} file(s)", icon='FILE_REFRESH')
+        transcode = utils.get_loaded_module("transcode")
+        if transcode and transcode.get_pending_count():
+            layout.label(text=f"Transcoding {transcode.get_pending_count()} texture(s)...", icon='SORTTIME')
+        bake = utils.get_loaded_module("bake")
+        if bake and bake.get_pending_count():
+            layout.label(text=f"Baking {bake.get_pending_count()} material(s)...", icon='RENDER_STILL')
+
+class TML_PT_MemoryReport(Panel):
+    bl_label = "Texture Memory"; bl_idname = "TML_PT_MemoryReport"; bl_parent_id = "TML_PT_MainPanel"
+    bl_space_type = 'NODE_EDITOR'; bl_region_type = 'UI'; bl_category = 'K-Tools'; bl_context = "shader"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        row = layout.row(align=True)
+        row.operator_menu_enum(operators.TML_OT_MemoryReport.bl_idname, "scope", text="Memory Report", icon='MEMORY')
+        row.operator(operators.TML_OT_ExportMemoryReport.bl_idname, text="", icon='EXPORT')
+        memory_report = utils.get_loaded_module("memory_report")
+        report = memory_report.get_last_report() if memory_report else None
+        if report:
+            draw_memory_report(layout, report)
+
+def draw_memory_report(layout, report, max_rows=8):
+    """Draws a memory report: totals, heaviest materials, breakdowns."""
+    col = layout.column(align=True)
+    col.label(text=f"Total: {utils.format_bytes(report['total_bytes'])} ({report['image_count']} images)")
+    if report["unsized_count"]:
+        col.label(text=f"{report['unsized_count']} images not sized (not in the totals)", icon='ERROR')
+    for entry in report["materials"][:max_rows]:
+        split = col.split(factor=0.65)
+        split.label(text=entry["material"], icon='MATERIAL')
+        split.label(text=utils.format_bytes(entry["bytes"]))
+    for title, table in (("Map Type", report["breakdown"]["map_type"]),
+                         ("Resolution", report["breakdown"]["resolution"]),
+                         ("Bit Depth", report["breakdown"]["depth"])):
+        box = layout.box()
+        box.label(text=f"{title}:")
+        for key, size in sorted(table.items(), key=lambda item: item[1], reverse=True)[:max_rows]:
+            split = box.split(factor=0.65)
+            split.label(text=key)
+            split.label(text=utils.format_bytes(size))
+
 # (classes, register, unregister unchanged)
-classes = ( TML_PT_MainPanel, )
+classes = ( TML_PT_MainPanel, TML_PT_LibraryTools, TML_PT_MemoryReport, )
 def register():
     for cls in classes: bpy.utils.register_class(cls)
 def unregister():
@@ -1,24 +1,52 @@
 import bpy
+import logging
+from bpy.app.handlers import persistent
 import re
 import os
-from .preferences import DEFAULT_KEYWORDS
+import sys
+from .preferences import DEFAULT_KEYWORDS, DEFAULT_PRECISION
+from . import preferences
+from . import colorspace
+from . import diagnostics
+from .diagnostics import logger
 
 def get_addon_preferences(context):
     """
-    Safely retrieves the addon's preferences object.
+    Safely retrieves the addon's preferences object, running the
+    one-time setup first (headless scripts get no timer or load_post).
     """
+    preferences.ensure_initialized()
     try:
         return context.preferences.addons[__package__].preferences
     except (KeyError, AttributeError):
-        print(f"Error: Could not find addon preferences for {__package__}")
+        logger.error("Could not find addon preferences for %s", __package__)
         return None
 
+def get_loaded_module(name):
+    """
+    The addon module 'name' if something already imported it, else None.
+    Feature modules (bake, transcode, watcher...) are imported on first
+    use; the UI reads their state through this without loading them.
+    """
+    return sys.modules.get(f"{__package__}.{name}")
+
 PRIORITY_MAP_ORDER = [
     "Diffuse","Metalness","Roughness","Alpha","Normal",
     "Displacement","Transmission","AmbientOcclusion","Emission","Subsurface",
 ]
 PRIORITY_LOOKUP = {map_type: i for i, map_type in enumerate(PRIORITY_MAP_ORDER)}
 
+# Separadores usados para quebrar nomes de nós/arquivos em palavras
+NAME_SPLIT_RE = re.compile(r'[\._ -]')
+NAME_SPLIT_KEEP_RE = re.compile(r'([\._ -])')
+
+# Mapa padrão (DEFAULT_KEYWORDS), construído uma única vez
+DEFAULT_KEYWORD_MAP = {
+    keyword.lower().strip(): (map_type, data_type)
+    for map_type, (keywords_list, data_type) in DEFAULT_KEYWORDS.items()
+    for keyword in keywords_list
+}
+
 def get_active_shader_tree(context):
     """
     Retorna a árvore de shader de nível superior (o material), 
@@ -51,6 +79,37 @@ def get_active_group_node(context):
         
     return None
 
+def get_materials_in_scope(context, scope):
+    """
+    Returns the materials for a scope:
+    'ACTIVE' (active material), 'SELECTED' (materials of the selected
+    objects) or 'ALL' (every material in the file).
+    """
+    if scope == 'ALL':
+        materials = list(bpy.data.materials)
+    elif scope == 'SELECTED':
+        seen = set()
+        materials = []
+        for ob in getattr(context, "selected_objects", None) or []:
+            for slot in ob.material_slots:
+                mat = slot.material
+                if mat and mat.name_full not in seen:
+                    seen.add(mat.name_full)
+                    materials.append(mat)
+    else:
+        mat = getattr(context, "material", None)
+        materials = [mat] if mat else []
+
+    return [mat for mat in materials if mat.use_nodes and mat.node_tree]
+
+
+SCOPE_ITEMS = [
+    ('ACTIVE', "Active Material", "Operate on the active material"),
+    ('SELECTED', "Selected Objects", "Operate on the materials of the selected objects"),
+    ('ALL', "All Materials", "Operate on every material in the file"),
+]
+
+
 def find_image_nodes_in_tree(node_tree):
     """
     Busca por Image Texture nodes em uma árvore.
@@ -61,6 +120,67 @@ def find_image_nodes_in_tree(node_tree):
     return [node for node in node_tree.nodes if node.type == 'TEX_IMAGE']
 
 
+def iter_image_nodes_recursive(node_tree, _visited=None):
+    """
+    Yields every Image Texture node of a tree, including the ones inside
+    nested node groups (e.g. Maps Loader copies). Each group datablock is
+    visited once.
+    """
+    if not node_tree:
+        return
+    if _visited is None:
+        _visited = set()
+    if node_tree.session_uid in _visited:
+        return
+    _visited.add(node_tree.session_uid)
+
+    for node in node_tree.nodes:
+        if node.type == 'TEX_IMAGE':
+            yield node
+        elif node.type == 'GROUP' and node.node_tree:
+            yield from iter_image_nodes_recursive(node.node_tree, _visited)
+
+
+def get_cache_dir(subdir):
+    """
+    Returns (and creates) a cache folder for derived files such as
+    converted textures. Uses the extension's user directory, or the
+    temp folder for legacy installs.
+    """
+    try:
+        path = bpy.utils.extension_path_user(__package__, path=subdir, create=True)
+    except (ValueError, AttributeError):
+        import tempfile
+        path = os.path.join(tempfile.gettempdir(), "k_tools_tml", subdir)
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_buffer_bytes(width, height, is_float):
+    """
+    Size of a decoded image buffer: Blender holds every image as RGBA,
+    4 bytes per pixel for byte buffers and 16 for float buffers.
+    """
+    return width * height * (16 if is_float else 4)
+
+
+def get_image_memory_bytes(image):
+    """Approximate size of an image's decoded buffer in bytes."""
+    if not image:
+        return 0
+    width, height = image.size
+    return get_buffer_bytes(width, height, image.is_float)
+
+
+def format_bytes(size):
+    """Human readable size, e.g. '12.3 MB'."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024.0 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024.0
+
+
+@diagnostics.profiled("utils.build_keyword_map")
 def build_keyword_map(prefs):
     """
     Builds a fast lookup map from the addon preferences.
@@ -82,17 +202,55 @@ def build_keyword_map(prefs):
                 if keyword:
                     keyword_map[keyword] = (map_type, data_type)
     else:
-        print("--- TML: Building keyword map from DEFAULT_KEYWORDS (prefs empty or invalid).")
-        for map_type, (keywords_list, data_type) in DEFAULT_KEYWORDS.items():
-            for keyword in keywords_list:
-                keyword_map[keyword.lower().strip()] = (map_type, data_type)
+        logger.info("Building keyword map from DEFAULT_KEYWORDS (prefs empty or invalid).")
+        keyword_map.update(DEFAULT_KEYWORD_MAP)
                 
     return keyword_map
 
 
+_keyword_map_cache = {"key": None, "map": None}
+
+def get_keyword_map(prefs):
+    """
+    Cached build_keyword_map: the map is rebuilt only when the keyword
+    list changes (see preferences.bump_keyword_version).
+    The returned dict is shared; do not modify it.
+    """
+    preferences.ensure_initialized() # Lista padrão antes do primeiro uso
+    if not prefs or len(prefs.keyword_list) == 0:
+        return DEFAULT_KEYWORD_MAP
+
+    key = (preferences.get_keyword_version(), len(prefs.keyword_list))
+    if _keyword_map_cache["key"] != key:
+        _keyword_map_cache["map"] = build_keyword_map(prefs)
+        _keyword_map_cache["key"] = key
+    return _keyword_map_cache["map"]
+
+
+_precision_map_cache = {"key": None, "map": None}
+
+def get_precision_map(prefs):
+    """
+    {map type: bit-depth policy} from the keyword list, cached like
+    get_keyword_map. Stale preferences without 'precision' keep every
+    map type's depth.
+    """
+    if not prefs or len(prefs.keyword_list) == 0:
+        return DEFAULT_PRECISION
+
+    key = (preferences.get_keyword_version(), len(prefs.keyword_list))
+    if _precision_map_cache["key"] != key:
+        _precision_map_cache["map"] = {
+            item.map_type: item.precision if hasattr(item, "precision") else 'KEEP'
+            for item in prefs.keyword_list
+        }
+        _precision_map_cache["key"] = key
+    return _precision_map_cache["map"]
+
+
 def get_node_map_info(node, keyword_map):
     name_to_check = node.label if node.label else node.name
-    parts = re.split(r'[\._ -]', name_to_check.lower())
+    parts = NAME_SPLIT_RE.split(name_to_check.lower())
     
     for part in parts:
         if part in keyword_map:
@@ -101,6 +259,7 @@ def get_node_map_info(node, keyword_map):
     return ("Unknown", "UTILITY")
 
 
+@diagnostics.profiled("utils.get_sorted_image_nodes")
 def get_sorted_image_nodes(node_tree, context):
     """
     Gets all image nodes from a tree and sorts them.
@@ -114,7 +273,7 @@ def get_sorted_image_nodes(node_tree, context):
         return []
         
     prefs = get_addon_preferences(context)
-    keyword_map = build_keyword_map(prefs) 
+    keyword_map = get_keyword_map(prefs)
 
     def sort_key(node):
         map_info = get_node_map_info(node, keyword_map)
@@ -124,9 +283,9 @@ def get_sorted_image_nodes(node_tree, context):
 
     return sorted(nodes, key=sort_key)
 
-def apply_colorspace_and_update_tracker(group_name, node_name, target_colorspace, new_image_name):
+def apply_colorspace_and_update_tracker(group_name, node_name, data_type, new_image_name):
     """
-    Safely finds a node, applies the colorspace, and updates the tracker property.
+    Safely finds a node, applies the colorspace for its data type, and updates the tracker property.
     This function is 100% safe to run outside of a draw context.
     """
     node = None
@@ -135,30 +294,72 @@ def apply_colorspace_and_update_tracker(group_name, node_name, target_colorspace
         node = group.nodes.get(node_name)
 
     if not node:
-        print(f"TML Timer: Could not find node {node_name} in group {group_name}.")
+        logger.warning("Timer: could not find node %s in group %s.", node_name, group_name)
         return
 
-    if node.image and target_colorspace:
-        try:
-            node.image.colorspace_settings.name = target_colorspace
-            print(f"TML Timer: Set '{node.name}' colorspace to '{target_colorspace}'")
-        except TypeError:
-            print(f"TML Warning: Color space '{target_colorspace}' not found.")
-        except Exception as e:
-            print(f"TML Timer Error setting colorspace: {e}")
+    prefs = get_addon_preferences(bpy.context)
+    if node.image and prefs:
+        if colorspace.apply_colorspace(node.image, data_type, prefs):
+            logger.debug("Timer: set '%s' colorspace to '%s'", node.name, node.image.colorspace_settings.name)
 
     try:
         node.tml_props.previous_image_name = new_image_name
     except Exception as e:
-        print(f"TML Timer Error setting tracker: {e}")
+        logger.error("Timer: error setting tracker: %s", e)
+
+
+# --- Socket index tables (cached per node-group datablock) ---
+_socket_index_cache = {}
 
+def get_socket_index_table(group_node):
+    """
+    Returns (inputs, outputs) dicts mapping socket name -> index for a
+    group node. Tables are cached per node-group datablock (session_uid),
+    so every instance of the same group shares one lookup table. Entries
+    are dropped when the node tree is updated (renamed or moved sockets)
+    and on load/undo/redo; the interface item count is checked as a cheap
+    guard against sockets added or removed in between.
+    """
+    tree = group_node.node_tree
+    if not tree:
+        return {}, {}
+
+    item_count = len(tree.interface.items_tree)
+    cached = _socket_index_cache.get(tree.session_uid)
+    if cached and cached[0] == item_count:
+        return cached[1], cached[2]
+
+    # setdefault: keep the first socket with a given name, like .get()
+    inputs = {}
+    for i, sock in enumerate(group_node.inputs):
+        inputs.setdefault(sock.name, i)
+    outputs = {}
+    for i, sock in enumerate(group_node.outputs):
+        outputs.setdefault(sock.name, i)
+
+    _socket_index_cache[tree.session_uid] = (item_count, inputs, outputs)
+    return inputs, outputs
+
+@persistent
+def clear_socket_index_cache(*args):
+    _socket_index_cache.clear()
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    if not _socket_index_cache:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.NodeTree):
+            _socket_index_cache.pop(update.id.original.session_uid, None)
+
+@diagnostics.profiled("utils.get_file_map_info")
 def get_file_map_info(filename, keyword_map):
     """
     Determina o map info (type, data_type) de um arquivo 
     baseado no seu nome.
     """
     name_only = os.path.splitext(filename)[0]
-    parts = re.split(r'[\._ -]', name_only.lower())
+    parts = NAME_SPLIT_RE.split(name_only.lower())
     
     for part in parts:
         if part in keyword_map:
@@ -166,6 +367,39 @@ def get_file_map_info(filename, keyword_map):
             
     return ("Unknown", "UTILITY")    
 
+def get_texture_set_name(filename, keyword_map):
+    """
+    Returns the texture set name of a file: its name without extension
+    and without the map-type keyword (e.g. 'Wood_Diffuse_2k.png' ->
+    'Wood_2k'). Returns None when no keyword matches.
+    """
+    name_only = os.path.splitext(filename)[0]
+    # Keep the separators so the original spelling survives the join
+    tokens = NAME_SPLIT_KEEP_RE.split(name_only)
+
+    for i in range(0, len(tokens), 2):
+        if tokens[i].lower() in keyword_map:
+            del tokens[max(i - 1, 0):i + 1]
+            set_name = "".join(tokens).strip("._ -")
+            return set_name or name_only
+    return None
+
+
+def group_files_into_sets(filenames, keyword_map):
+    """
+    Groups filenames into texture sets using the keyword classification.
+    Returns {set_name: {map_type: filename}}; the first file found for a
+    map type wins.
+    """
+    sets = {}
+    for filename in filenames:
+        set_name = get_texture_set_name(filename, keyword_map)
+        if set_name is None:
+            continue
+        map_type = get_file_map_info(filename, keyword_map)[0]
+        sets.setdefault(set_name, {}).setdefault(map_type, filename)
+    return sets
+
 # ============================================================
 # NOVA ALTERNATIVA: Usando space.path
 # ============================================================
@@ -175,14 +409,13 @@ def get_target_group_tree(context):
     Finds the target group NodeTree using space.path for 'Tabbed-in' state.
     Returns the group's NodeTree, or None.
     """
-    print("\n" + "="*10 + " get_target_group_tree " + "="*10) # DEBUG
     if not context or not hasattr(context, "space_data"):
-        print("DEBUG: Invalid context.") # DEBUG
+        logger.debug("get_target_group_tree: invalid context.")
         return None
 
     space = context.space_data
     if space.type != 'NODE_EDITOR' or space.tree_type != 'ShaderNodeTree':
-        print("DEBUG: Not Shader Node Editor.") # DEBUG
+        logger.debug("get_target_group_tree: not a Shader Node Editor.")
         return None
 
     viewed_tree = space.node_tree
@@ -190,60 +423,45 @@ def get_target_group_tree(context):
     active_node = context.active_node
     path = space.path
 
-    # Imprimir estado atual
-    print(f"DEBUG: Viewed Tree   : '{viewed_tree.name if viewed_tree else 'None'}' (ID: {id(viewed_tree)})") # DEBUG
-    print(f"DEBUG: Material Tree : '{material_tree.name if material_tree else 'None'}' (ID: {id(material_tree)})") # DEBUG
-    print(f"DEBUG: Active Node   : '{active_node.name if active_node else 'None'}'") # DEBUG
-    print(f"DEBUG: Path Length   : {len(path)}") # DEBUG
-    for i, p in enumerate(path): print(f"  Path[{i}]: {p.node_tree.name if hasattr(p,'node_tree') else 'N/A'}") # DEBUG
-    print(f"DEBUG: Viewed == Material? : {viewed_tree == material_tree}") # DEBUG
-
+    # Estado atual (só monta as mensagens se o nível DEBUG estiver ativo)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("get_target_group_tree: viewed=%r material=%r active=%r path=%r",
+                     viewed_tree.name if viewed_tree else None,
+                     material_tree.name if material_tree else None,
+                     active_node.name if active_node else None,
+                     [p.node_tree.name if hasattr(p, 'node_tree') else None for p in path])
 
     if not material_tree:
-        print("DEBUG: No material tree found.") # DEBUG
+        logger.debug("get_target_group_tree: no material tree found.")
         return None
 
     # --- LÓGICA ---
 
     # 1. Caso "Selecionado": Estamos no nível do material
     if viewed_tree == material_tree:
-        print("DEBUG: Condition: At Material Level (viewed == material)") # DEBUG
         if (active_node and
             active_node.type == 'GROUP' and
             active_node.node_tree):
-            target = active_node.node_tree
-            print(f"DEBUG: RESULT = Selected Group Tree: '{target.name}'") # DEBUG
-            return target
-        else:
-            print("DEBUG: RESULT = No group selected at material level.") # DEBUG
-            return None
-
-    # 2. Caso "Tabbed-in": A árvore visível é diferente da árvore do material
-    else:
-        print("DEBUG: Condition: Inside Group (viewed != material)") # DEBUG
-        if path and len(path) > 1:
-            last_path_item = path[-1]
-            if hasattr(last_path_item, 'node_tree'):
-                target = last_path_item.node_tree
-                if target and target != material_tree:
-                    print(f"DEBUG: RESULT = Tree from Path: '{target.name}'") # DEBUG
-                    return target
-                else:
-                    print("DEBUG: Tree from path is invalid or is the material tree.") # DEBUG
-            else:
-                print("DEBUG: Last path item has no node_tree attribute.") # DEBUG
-
-        # Fallback (se o path falhar)
-        print("DEBUG: Path logic failed or insufficient. Trying viewed_tree as fallback.") # DEBUG
-        if viewed_tree and viewed_tree != material_tree:
-            print(f"DEBUG: RESULT = Fallback to Viewed Tree: '{viewed_tree.name}'") # DEBUG
-            return viewed_tree
-
-        print("DEBUG: RESULT = Tabbed-in fallback failed. No target found.") # DEBUG
+            logger.debug("get_target_group_tree: selected group '%s'.", active_node.node_tree.name)
+            return active_node.node_tree
+        logger.debug("get_target_group_tree: no group selected at material level.")
         return None
 
-    # Fallback final (não deve ser alcançado)
-    print("DEBUG: RESULT = Reached unexpected end of function.") # DEBUG
+    # 2. Caso "Tabbed-in": A árvore visível é diferente da árvore do material
+    if path and len(path) > 1:
+        last_path_item = path[-1]
+        if hasattr(last_path_item, 'node_tree'):
+            target = last_path_item.node_tree
+            if target and target != material_tree:
+                logger.debug("get_target_group_tree: tree from path '%s'.", target.name)
+                return target
+
+    # Fallback (se o path falhar)
+    if viewed_tree and viewed_tree != material_tree:
+        logger.debug("get_target_group_tree: fallback to viewed tree '%s'.", viewed_tree.name)
+        return viewed_tree
+
+    logger.debug("get_target_group_tree: tabbed-in fallback failed, no target found.")
     return None
 
 
@@ -304,4 +522,26 @@ def get_target_node_tree(context):
         else:
             return None # Nenhum grupo selecionado
 
-    return None
\ No newline at end of file
+    return None
+
+
+# (handler list, function): socket tables drop stale entries on updates
+HANDLERS = (
+    ("depsgraph_update_post", _on_depsgraph_update),
+    ("load_post", clear_socket_index_cache),
+    ("undo_post", clear_socket_index_cache),
+    ("redo_post", clear_socket_index_cache),
+)
+
+def register():
+    for name, handler in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler not in handlers:
+            handlers.append(handler)
+
+def unregister():
+    for name, handler in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler in handlers:
+            handlers.remove(handler)
+    clear_socket_index_cache()
\ No newline at end of file
@@ -0,0 +1,241 @@
+# File: k_tools_texture_map_loader/variants.py
+
+import bpy
+from bpy.props import StringProperty, IntProperty
+from bpy.types import Operator
+from . import utils
+from . import transaction
+from . import diagnostics
+from .diagnostics import logger
+
+
+def capture_variant(node_tree, variant):
+    """Stores the current image of every Image Texture node of the tree."""
+    variant.slots.clear()
+    for node in utils.find_image_nodes_in_tree(node_tree):
+        slot = variant.slots.add()
+        slot.node_name = node.name
+        slot.image = node.image
+
+
+def preload_variant(variant):
+    """
+    Decodes the images of a variant that are not in memory yet, so
+    switching to it does not wait on disk. Returns the number of images
+    loaded. Does nothing in background mode (no GPU context).
+    """
+    if bpy.app.background:
+        return 0
+    count = 0
+    for slot in variant.slots:
+        image = slot.image
+        if not image or image.has_data:
+            continue
+        try:
+            image.gl_load()
+            count += 1
+        except Exception as e:
+            logger.debug("Variants: could not preload '%s': %s", image.name, e)
+    return count
+
+
+def get_variant_memory(variant):
+    """
+    Memory of a variant's decoded images (each image counted once).
+    Returns (bytes, loaded_count, image_count). Images that are not
+    loaded are not measured, since reading their size would decode them.
+    """
+    seen = set()
+    size = 0
+    loaded = 0
+    for slot in variant.slots:
+        image = slot.image
+        if not image or image.name_full in seen:
+            continue
+        seen.add(image.name_full)
+        if image.has_data:
+            size += utils.get_image_memory_bytes(image)
+            loaded += 1
+    return size, loaded, len(seen)
+
+
+def switch_variant(node_tree, index):
+    """
+    Assigns the images of variant 'index' to the tree's nodes in one
+    pass. The previous variant's images are freed unless it is marked
+    'Keep Loaded'. Returns the number of bytes freed.
+    """
+    variant_set = node_tree.tml_variants
+    variant = variant_set.variants[index]
+    previous = None
+    if 0 <= variant_set.active_index < len(variant_set.variants) and variant_set.active_index != index:
+        previous = variant_set.variants[variant_set.active_index]
+
+    nodes = node_tree.nodes
+    for slot in variant.slots:
+        node = nodes.get(slot.node_name)
+        if node and node.type == 'TEX_IMAGE' and node.image != slot.image:
+            node.image = slot.image
+    variant_set.active_index = index
+
+    freed = 0
+    if previous and not previous.keep_loaded:
+        in_use = {slot.image.name_full for slot in variant.slots if slot.image}
+        for slot in previous.slots:
+            image = slot.image
+            if image and image.has_data and image.name_full not in in_use:
+                freed += utils.get_image_memory_bytes(image)
+                image.buffers_free()
+                in_use.add(image.name_full) # Não liberar duas vezes
+
+    for other in variant_set.variants:
+        if other.keep_loaded:
+            preload_variant(other)
+    return freed
+
+
+def _get_variant_set(context):
+    target_tree = utils.get_target_node_tree(context)
+    return target_tree, target_tree.tml_variants if target_tree else None
+
+
+#####################################################################
+#
+#####################################################################
+class TML_OT_VariantAdd(Operator):
+    """Remember the images currently assigned as a new variant"""
+    bl_idname = "tml.variant_add"
+    bl_label = "Add Variant"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name: StringProperty(name="Name", default="") # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return utils.get_target_node_tree(context) is not None
+
+    @diagnostics.profiled_method("op.variant_add")
+    def execute(self, context):
+        target_tree, variant_set = _get_variant_set(context)
+        name = self.name
+        if not name:
+            # Nome do conjunto de texturas da primeira imagem (ex.: 'Chair_Red')
+            kw_map = utils.get_keyword_map(utils.get_addon_preferences(context))
+            for node in utils.find_image_nodes_in_tree(target_tree):
+                if node.image:
+                    name = utils.get_texture_set_name(bpy.path.basename(node.image.filepath), kw_map) or ""
+                    if name: break
+        variant = variant_set.variants.add()
+        variant.name = name or f"Variant {len(variant_set.variants)}"
+        capture_variant(target_tree, variant)
+        variant_set.active_index = len(variant_set.variants) - 1
+        self.report({'INFO'}, f"Stored variant '{variant.name}' ({len(variant.slots)} nodes).")
+        return {'FINISHED'}
+
+
+class TML_OT_VariantStore(Operator):
+    """Overwrite a variant with the images currently assigned"""
+    bl_idname = "tml.variant_store"
+    bl_label = "Store Variant"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: IntProperty(default=0) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return utils.get_target_node_tree(context) is not None
+
+    @diagnostics.profiled_method("op.variant_store")
+    def execute(self, context):
+        target_tree, variant_set = _get_variant_set(context)
+        if not 0 <= self.index < len(variant_set.variants):
+            return {'CANCELLED'}
+        capture_variant(target_tree, variant_set.variants[self.index])
+        variant_set.active_index = self.index
+        return {'FINISHED'}
+
+
+class TML_OT_VariantSwitch(Operator):
+    """Assign the images of this variant to the nodes"""
+    bl_idname = "tml.variant_switch"
+    bl_label = "Switch Variant"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: IntProperty(default=0) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return utils.get_target_node_tree(context) is not None
+
+    @diagnostics.profiled_method("op.variant_switch")
+    @transaction.batch_method
+    def execute(self, context):
+        target_tree, variant_set = _get_variant_set(context)
+        if not 0 <= self.index < len(variant_set.variants):
+            return {'CANCELLED'}
+        freed = switch_variant(target_tree, self.index)
+        if freed:
+            self.report({'INFO'}, f"Freed {utils.format_bytes(freed)} from the previous variant.")
+        return {'FINISHED'}
+
+
+class TML_OT_VariantRemove(Operator):
+    """Forget this variant (the images stay assigned)"""
+    bl_idname = "tml.variant_remove"
+    bl_label = "Remove Variant"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: IntProperty(default=0) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return utils.get_target_node_tree(context) is not None
+
+    @diagnostics.profiled_method("op.variant_remove")
+    def execute(self, context):
+        target_tree, variant_set = _get_variant_set(context)
+        if not 0 <= self.index < len(variant_set.variants):
+            return {'CANCELLED'}
+        variant_set.variants.remove(self.index)
+        if variant_set.active_index == self.index:
+            variant_set.active_index = -1
+        elif variant_set.active_index > self.index:
+            variant_set.active_index -= 1
+        return {'FINISHED'}
+
+
+def draw_variants(layout, node_tree):
+    """Draws the variant list of a node tree (switch, memory, options)."""
+    variant_set = node_tree.tml_variants
+    col = layout.column(align=True)
+    row = col.row(align=True)
+    row.label(text="Variants:", icon='RENDERLAYERS')
+    row.operator(TML_OT_VariantAdd.bl_idname, text="", icon='ADD')
+    for i, variant in enumerate(variant_set.variants):
+        size, loaded, total = get_variant_memory(variant)
+        row = col.row(align=True)
+        op = row.operator(TML_OT_VariantSwitch.bl_idname, text=variant.name, depress=(i == variant_set.active_index))
+        op.index = i
+        row.label(text=f"{utils.format_bytes(size)} ({loaded}/{total})")
+        row.prop(variant, "keep_loaded", text="", icon='PINNED' if variant.keep_loaded else 'UNPINNED')
+        op = row.operator(TML_OT_VariantStore.bl_idname, text="", icon='FILE_REFRESH')
+        op.index = i
+        op = row.operator(TML_OT_VariantRemove.bl_idname, text="", icon='X')
+        op.index = i
+
+
+# --- Registro ---
+classes = (
+    TML_OT_VariantAdd,
+    TML_OT_VariantStore,
+    TML_OT_VariantSwitch,
+    TML_OT_VariantRemove,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,235 @@
+# File: k_tools_texture_map_loader/watcher.py
+
+import bpy
+import os
+import time
+from collections import deque
+from bpy.app.handlers import persistent
+from . import assets
+from . import diagnostics
+from .diagnostics import logger
+
+DEFAULT_INTERVAL = 1.0 # Segundos entre ticks do timer (mesmo default de preferences.watch_interval)
+TICK_BUDGET = 0.008 # Segundos de reload por tick
+REFRESH_INTERVAL = 5.0 # Segundos entre reconstruções da lista de imagens
+
+_enabled = False
+_interval = DEFAULT_INTERVAL
+_pool = None
+_future = None
+_last_refresh = 0.0
+
+# abspath -> set of image names (name_full) using that file
+_watched = {}
+# dirpath -> set of watched filenames in it (what the worker thread scans)
+_watched_dirs = {}
+# abspath -> (mtime_ns, size) of the version currently loaded
+_baseline = {}
+# abspath -> (mtime_ns, size) seen changed once; reloaded when it is seen
+# again unchanged, so files still being written are not reloaded half-way
+_changed = {}
+_pending = deque()
+
+
+def collect_watched_images():
+    """
+    Image files used by the Image Texture nodes of K-Tools Loader groups.
+    Packed, generated and linked images are skipped. Derived copies
+    (OpenGL normals, 8-bit and transcoded copies) are watched through
+    their source file and rebuilt when it changes.
+    Returns {abspath: {image names}}.
+    """
+    watched = {}
+    for tree in bpy.data.node_groups:
+        if not tree.name.startswith(assets.MAPS_LOADER_GROUP_NAME):
+            continue
+        for node in tree.nodes:
+            if node.type != 'TEX_IMAGE':
+                continue
+            image = node.image
+            if not image or image.source != 'FILE' or image.packed_file or image.library:
+                continue
+            path = image.get("tml_source_path") or bpy.path.abspath(image.filepath)
+            path = os.path.normpath(path)
+            watched.setdefault(path, set()).add(image.name_full)
+    return watched
+
+
+def scan_signatures(watched_dirs):
+    """
+    Reads (mtime_ns, size) of the watched files, one os.scandir per
+    directory. Runs in the worker thread: no bpy access here.
+    Missing files are left out.
+    """
+    signatures = {}
+    for dirpath, names in watched_dirs.items():
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if entry.name not in names:
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    signatures[os.path.join(dirpath, entry.name)] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            continue
+    return signatures
+
+
+def _refresh_watched():
+    global _watched, _watched_dirs, _last_refresh
+    _watched = collect_watched_images()
+    dirs = {}
+    for path in _watched:
+        dirpath, name = os.path.split(path)
+        dirs.setdefault(dirpath, set()).add(name)
+    _watched_dirs = dirs
+    for path in list(_baseline):
+        if path not in _watched:
+            del _baseline[path]
+            _changed.pop(path, None)
+    _last_refresh = time.monotonic()
+
+
+def _compare(signatures):
+    """Queues the files whose signature changed and then settled."""
+    for path, sig in signatures.items():
+        old = _baseline.get(path)
+        if old is None:
+            _baseline[path] = sig # Primeira vez: só registra
+        elif sig != old:
+            if _changed.get(path) == sig:
+                del _changed[path]
+                _baseline[path] = sig
+                _pending.append(path)
+            else:
+                _changed[path] = sig
+        else:
+            _changed.pop(path, None)
+
+
+def _reload_pending(budget):
+    """Reloads queued images until the time budget is spent."""
+    deadline = time.perf_counter() + budget
+    reloaded = 0
+    while _pending:
+        path = _pending.popleft()
+        for name in _watched.get(path, ()):
+            image = bpy.data.images.get(name)
+            if not image:
+                continue
+            if "tml_source_path" in image:
+                _rebuild_derived(image)
+            else:
+                image.reload()
+            reloaded += 1
+            logger.info("Watcher: reloaded '%s'", name)
+        if time.perf_counter() >= deadline:
+            break
+    if reloaded:
+        diagnostics.count("watch.reloads", reloaded)
+    return reloaded
+
+
+def _rebuild_derived(image):
+    """A derived copy whose source changed: convert or transcode it again."""
+    # Só quando usado: utils -> preferences -> watcher
+    from . import utils
+    from . import image_analysis
+    from . import transcode
+
+    if "tml_source_hash" in image:
+        transcode.restore_source(image) # Aponta para a fonte nova
+        image.reload()
+        prefs = utils.get_addon_preferences(bpy.context)
+        if prefs and prefs.transcode_cache:
+            transcode.queue_image(image, prefs)
+    else:
+        image_analysis.regenerate_derived(image)
+
+
+def _tick():
+    global _future
+    if not _enabled:
+        return None
+
+    if time.monotonic() - _last_refresh >= REFRESH_INTERVAL:
+        _refresh_watched()
+
+    if _future is None:
+        if _watched_dirs:
+            _future = _get_pool().submit(scan_signatures, dict(_watched_dirs))
+    elif _future.done():
+        try:
+            _compare(_future.result())
+        except Exception as e:
+            logger.error("Watcher: scan failed: %s", e)
+        _future = None
+
+    _reload_pending(TICK_BUDGET)
+    return _interval
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ThreadPoolExecutor # Só quando usado
+        _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tml_watcher")
+    return _pool
+
+
+def set_enabled(enabled, interval=None):
+    """Starts or stops watching (called from the preferences)."""
+    global _enabled, _interval, _last_refresh
+    if interval is not None:
+        _interval = max(0.1, interval)
+    if enabled == _enabled:
+        return
+    _enabled = enabled
+    if enabled:
+        _last_refresh = 0.0 # Força a coleta no primeiro tick
+        if _on_load_post not in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.append(_on_load_post)
+        if not bpy.app.timers.is_registered(_tick):
+            bpy.app.timers.register(_tick, first_interval=_interval, persistent=True)
+        logger.info("Watcher: started (every %.2fs)", _interval)
+    else:
+        stop()
+
+
+def stop():
+    global _enabled, _pool, _future
+    _enabled = False
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.unregister(_tick)
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+        _pool = None
+    _future = None
+    _watched.clear()
+    _watched_dirs.clear()
+    _baseline.clear()
+    _changed.clear()
+    _pending.clear()
+
+
+def is_enabled():
+    return _enabled
+
+
+def get_watched_count():
+    return len(_watched)
+
+
+@persistent
+def _on_load_post(*args):
+    global _last_refresh
+    _last_refresh = 0.0 # Outro arquivo: recoletar as imagens
+
+
+def unregister():
+    stop()